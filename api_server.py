@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+🔌 Multi-MT Term Comparison Tool - HTTP/JSON API
+Headless server for machine clients (CAT tools, scripts), without the Gradio stack.
+
+Endpoints:
+    GET  /health                     Liveness plus registered engines
+    GET  /engines                    Engines with their current health
+    POST /translate                  One-shot comparison, JSON response
+    POST /translate/stream           One NDJSON line per engine as it finishes
+                                     (SSE instead with "Accept: text/event-stream")
+    POST /translate/matrix           One term into several targets ("targets": [...]), JSON matrix
+    POST /translate/document         Longer text, sentence by sentence, plus recurring term candidates
+
+Request body (GET also accepts the same fields as query parameters):
+    {"text": "碳中和", "source": "auto", "target": "en", "engines": ["google", "bing"], "timeout": 10}
+
+Usage:
+    python run.py --api --api-port 8000
+    curl -s localhost:8000/translate -d '{"text": "碳中和", "target": "en"}'
+    curl -sN localhost:8000/translate/stream -d '{"text": "碳中和", "target": "en"}'
+"""
+
+import asyncio
+import contextvars
+import json
+import math
+import multiprocessing
+import signal
+import socket
+import time
+from typing import AsyncIterator, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from mt_term_tool import MultiMTTranslator, PRIORITY_INTERACTIVE, SUPPORTED_LANGUAGES, TranslationResult, call_priority
+
+MAX_TIMEOUT = 600.0  # seconds; longer "timeout" values are capped
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 408: "Request Timeout",
+           411: "Length Required", 413: "Payload Too Large", 431: "Request Header Fields Too Large",
+           500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _result_payload(key: str, result: TranslationResult) -> dict:
+    return {
+        "engine": key, "name": result.engine, "name_zh": result.engine_zh,
+        "translation": result.translated_text, "success": result.success,
+        "status": result.status, "error": result.error_message,
+        "time": round(result.translation_time, 3), "cached": result.cached, "note": result.note,
+    }
+
+# ============================================================
+# SERVER
+# ============================================================
+
+class APIServer:
+    """Minimal HTTP/1.1 server on asyncio streams.
+
+    Connections are kept alive between requests (idle ones are closed after
+    ``keepalive_timeout`` seconds), bodies over ``max_body`` bytes are refused
+    with 413, and shutdown() stops accepting, lets in-flight requests finish for
+    up to ``shutdown_grace`` seconds, then closes every connection.
+
+    With ``sock``, the server accepts on that already-listening socket instead of
+    binding host/port itself (serve_workers shares one socket between processes).
+    """
+
+    def __init__(self, translator: MultiMTTranslator, host: str = "127.0.0.1", port: int = 8000,
+                 max_body: int = 64 * 1024, max_header: int = 16 * 1024, keepalive_timeout: float = 15.0,
+                 shutdown_grace: float = 10.0, default_timeout: Optional[float] = 30.0,
+                 sock: Optional[socket.socket] = None):
+        self.translator = translator
+        self.sock = sock
+        self.host = host
+        self.port = port
+        self.max_body = max_body
+        self.max_header = max_header
+        self.keepalive_timeout = keepalive_timeout
+        self.shutdown_grace = shutdown_grace
+        self.default_timeout = default_timeout
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Dict[asyncio.StreamWriter, bool] = {}  # writer -> busy with a request
+        self._closing = False
+        self._idle = asyncio.Event()
+
+    async def start(self):
+        if self.sock is not None:
+            self._server = await asyncio.start_server(self._handle_connection, sock=self.sock, limit=self.max_header)
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, self.host, self.port, limit=self.max_header)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            try:
+                await self._server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+
+    async def shutdown(self):
+        """Stop accepting, wait for in-flight requests (up to shutdown_grace), close connections."""
+        self._closing = True
+        if self._server is not None:
+            self._server.close()
+        for writer, busy in list(self._connections.items()):
+            if not busy:
+                writer.close()
+        if any(self._connections.values()):
+            self._idle.clear()
+            try:
+                await asyncio.wait_for(self._idle.wait(), self.shutdown_grace)
+            except asyncio.TimeoutError:
+                pass
+        for writer in list(self._connections):
+            writer.close()
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    def _set_busy(self, writer: asyncio.StreamWriter, busy: bool):
+        self._connections[writer] = busy
+        if not busy and not any(self._connections.values()):
+            self._idle.set()
+
+    # ------------------------------------------------------------
+    # Connections and parsing
+    # ------------------------------------------------------------
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._connections[writer] = False
+        try:
+            while not self._closing:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), self.keepalive_timeout)
+                except (asyncio.TimeoutError, ConnectionError):
+                    break
+                except (asyncio.LimitOverrunError, ValueError):
+                    await self._send_json(writer, 431, {"error": "Request line too long"}, keep_alive=False)
+                    break
+                if not request_line.strip():
+                    break
+                self._set_busy(writer, True)
+                try:
+                    keep_alive = await self._handle_request(request_line, reader, writer)
+                finally:
+                    self._set_busy(writer, False)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.pop(writer, None)
+            if not any(self._connections.values()):
+                self._idle.set()
+            writer.close()
+
+    async def _read_headers(self, reader: asyncio.StreamReader) -> Dict[str, str]:
+        headers, size = {}, 0
+        while True:
+            line = await asyncio.wait_for(reader.readline(), self.keepalive_timeout)
+            size += len(line)
+            if size > self.max_header:
+                raise HTTPError(431, "Request headers too large")
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    async def _handle_request(self, request_line: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        """Serve one request; return whether the connection stays open."""
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            await self._send_json(writer, 400, {"error": "Malformed request line"}, keep_alive=False)
+            return False
+
+        try:
+            headers = await self._read_headers(reader)
+        except (HTTPError, asyncio.LimitOverrunError, ValueError) as e:
+            await self._send_json(writer, getattr(e, "status", 431), {"error": "Request headers too large"}, keep_alive=False)
+            return False
+        except asyncio.TimeoutError:
+            return False
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        keep_alive = keep_alive and not self._closing
+
+        try:
+            body = await self._read_body(reader, headers)
+        except HTTPError as e:
+            # The unread body is still on the wire, so this connection cannot be reused.
+            await self._send_json(writer, e.status, {"error": str(e)}, keep_alive=False)
+            return False
+        except asyncio.TimeoutError:
+            await self._send_json(writer, 408, {"error": "Timed out reading the request body"}, keep_alive=False)
+            return False
+
+        url = urlsplit(target)
+        # Engine calls are queued fairly per client: the X-Client-Id header, else the peer address.
+        peer = writer.get_extra_info("peername")
+        client_id = headers.get("x-client-id") or (peer[0] if isinstance(peer, tuple) else "")
+        try:
+            with call_priority(PRIORITY_INTERACTIVE, client_id):
+                return await self._route(method, url.path, url.query, headers, body, writer, keep_alive)
+        except HTTPError as e:
+            await self._send_json(writer, e.status, {"error": str(e)}, keep_alive)
+            return keep_alive
+        except (ConnectionError, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            await self._send_json(writer, 500, {"error": str(e)[:200]}, keep_alive)
+            return keep_alive
+
+    async def _read_body(self, reader: asyncio.StreamReader, headers: Dict[str, str]) -> bytes:
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HTTPError(411, "Chunked request bodies are not supported; send Content-Length")
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length < 0:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > self.max_body:
+            raise HTTPError(413, f"Request body over {self.max_body} bytes")
+        if not length:
+            return b""
+        return await asyncio.wait_for(reader.readexactly(length), self.keepalive_timeout)
+
+    # ------------------------------------------------------------
+    # Responses
+    # ------------------------------------------------------------
+
+    @staticmethod
+    def _head(status: int, content_type: str, keep_alive: bool, length: Optional[int] = None) -> bytes:
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", f"Content-Type: {content_type}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}", "Cache-Control: no-store"]
+        lines.append(f"Content-Length: {length}" if length is not None else "Transfer-Encoding: chunked")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        keep_alive = keep_alive and not self._closing
+        writer.write(self._head(status, "application/json; charset=utf-8", keep_alive, len(body)) + body)
+        await writer.drain()
+
+    async def _send_stream(self, writer: asyncio.StreamWriter, content_type: str, keep_alive: bool,
+                           chunks: AsyncIterator[bytes]):
+        writer.write(self._head(200, content_type, keep_alive and not self._closing))
+        try:
+            async for chunk in chunks:
+                writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                await writer.drain()
+        finally:
+            await chunks.aclose()  # cancels engines still running if the client went away
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    # ------------------------------------------------------------
+    # Routes
+    # ------------------------------------------------------------
+
+    async def _route(self, method: str, path: str, query: str, headers: Dict[str, str], body: bytes,
+                     writer: asyncio.StreamWriter, keep_alive: bool) -> bool:
+        path = path.rstrip("/") or "/"
+        if path == "/health":
+            self._require(method, "GET")
+            engines = self.translator.get_available_engines()
+            await self._send_json(writer, 200, {"status": "closing" if self._closing else "ok", "engines": engines}, keep_alive)
+        elif path == "/engines":
+            self._require(method, "GET")
+            health = self.translator.get_engine_health()  # best-ranked first
+            engines = [{"engine": key, "name": info["name"], "name_zh": info["name_zh"], "state": snap["state"],
+                        "down": snap["down"], "p50": snap["p50"]}
+                       for key, snap, info in ((k, s, self.translator.engines[k]) for k, s in health.items())]
+            await self._send_json(writer, 200, {"engines": engines}, keep_alive)
+        elif path == "/translate":
+            self._require(method, "GET", "POST")
+            text, source, target, engines, timeout = self._parse_job(self._params(query, body))
+            start = time.time()
+            results = [None] * len(engines)
+            async for i, result in self.translator.translate_async_indexed(text, source, target, engines, timeout):
+                results[i] = _result_payload(engines[i], result)
+            await self._send_json(writer, 200, {
+                "text": text, "source": source, "target": target,
+                "results": results, "time": round(time.time() - start, 3),
+            }, keep_alive)
+        elif path == "/translate/matrix":
+            self._require(method, "GET", "POST")
+            params = self._params(query, body)
+            text, source, _, engines, timeout = self._parse_job(params)
+            targets = self._parse_targets(params)
+            loop = asyncio.get_running_loop()
+            matrix = await loop.run_in_executor(None, contextvars.copy_context().run, self.translator.translate_matrix,
+                                                text, source, targets, engines, None, None, timeout)
+            await self._send_json(writer, 200, matrix, keep_alive)
+        elif path == "/translate/document":
+            self._require(method, "POST")
+            text, source, target, engines, timeout = self._parse_job(self._params(query, body))
+            loop = asyncio.get_running_loop()
+            doc = await loop.run_in_executor(None, contextvars.copy_context().run, self.translator.translate_document,
+                                             text, source, target, engines, None, 15, None, timeout)
+            await self._send_json(writer, 200, doc, keep_alive)
+        elif path == "/translate/stream":
+            self._require(method, "GET", "POST")
+            job = self._parse_job(self._params(query, body))
+            sse = "text/event-stream" in headers.get("accept", "")
+            content_type = "text/event-stream; charset=utf-8" if sse else "application/x-ndjson; charset=utf-8"
+            await self._send_stream(writer, content_type, keep_alive, self._events(*job, sse=sse))
+        else:
+            raise HTTPError(404, f"No route for {path}")
+        return keep_alive
+
+    @staticmethod
+    def _require(method: str, *allowed: str):
+        if method not in allowed:
+            raise HTTPError(405, f"Use {' or '.join(allowed)}")
+
+    @staticmethod
+    def _params(query: str, body: bytes) -> dict:
+        """Request fields from the JSON body, or from the query string when there is none."""
+        if body:
+            try:
+                params = json.loads(body.decode("utf-8"))
+            except (UnicodeDecodeError, ValueError):
+                raise HTTPError(400, "Body must be a JSON object")
+            if not isinstance(params, dict):
+                raise HTTPError(400, "Body must be a JSON object")
+            return params
+        params = {k: v[-1] for k, v in parse_qs(query).items()}
+        for name in ("engines", "targets"):
+            if name in params:
+                params[name] = [e for e in params[name].split(",") if e]
+        return params
+
+    def _parse_job(self, params: dict) -> Tuple[str, str, str, list, Optional[float]]:
+        text = params.get("text")
+        if not isinstance(text, str) or not text.strip():
+            raise HTTPError(400, "'text' is required")
+        source, target = params.get("source", "auto"), params.get("target", "en")
+        if source != "auto" and source not in SUPPORTED_LANGUAGES:
+            raise HTTPError(400, f"Unsupported source language: {source}")
+        if target not in SUPPORTED_LANGUAGES:
+            raise HTTPError(400, f"Unsupported target language: {target}")
+
+        available = self.translator.get_available_engines()
+        engines = params.get("engines") or available
+        if not isinstance(engines, list) or not all(isinstance(e, str) for e in engines):
+            raise HTTPError(400, "'engines' must be a list of engine keys")
+        unknown = [e for e in engines if e not in self.translator.engines]
+        if unknown:
+            raise HTTPError(400, f"Unknown engines: {', '.join(unknown)}; available: {', '.join(available)}")
+
+        timeout = params.get("timeout", self.default_timeout)
+        if timeout is not None:
+            try:
+                timeout = float(timeout) if not isinstance(timeout, bool) else math.nan
+            except (TypeError, ValueError):
+                timeout = math.nan
+            if not math.isfinite(timeout) or timeout <= 0:
+                raise HTTPError(400, "'timeout' must be a positive number of seconds")
+            timeout = min(timeout, MAX_TIMEOUT)
+        return text.strip(), source, target, list(dict.fromkeys(engines)), timeout
+
+    @staticmethod
+    def _parse_targets(params: dict) -> list:
+        targets = params.get("targets")
+        if not isinstance(targets, list) or not targets or not all(isinstance(t, str) for t in targets):
+            raise HTTPError(400, "'targets' must be a non-empty list of language codes")
+        unknown = [t for t in targets if t not in SUPPORTED_LANGUAGES]
+        if unknown:
+            raise HTTPError(400, f"Unsupported target languages: {', '.join(map(str, unknown))}")
+        return targets
+
+    async def _events(self, text: str, source: str, target: str, engines: list, timeout: Optional[float],
+                      sse: bool = False) -> AsyncIterator[bytes]:
+        """One event per engine in completion order, then a final "done" event."""
+        def encode(event: str, payload: dict) -> bytes:
+            data = json.dumps(payload, ensure_ascii=False)
+            if sse:
+                return f"event: {event}\ndata: {data}\n\n".encode("utf-8")
+            return (json.dumps({"event": event, **payload}, ensure_ascii=False) + "\n").encode("utf-8")
+
+        start = time.time()
+        succeeded = 0
+        async for i, result in self.translator.translate_async_indexed(text, source, target, engines, timeout):
+            succeeded += result.success
+            yield encode("result", _result_payload(engines[i], result))
+        yield encode("done", {"engines": len(engines), "succeeded": succeeded, "time": round(time.time() - start, 3)})
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def run_api_server(translator: MultiMTTranslator, host: str = "127.0.0.1", port: int = 8000, **options):
+    """Serve until SIGINT/SIGTERM, then shut down gracefully."""
+    async def main():
+        server = APIServer(translator, host, port, **options)
+        await server.start()
+        if server.sock is None:
+            print(f"🔌 API listening on http://{host}:{server.port} (POST /translate, /translate/stream)")
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # e.g. Windows; Ctrl+C then raises KeyboardInterrupt instead
+
+        serving = asyncio.ensure_future(server.serve_forever())
+        try:
+            await stop.wait()
+        finally:
+            print("\n⏹️ Shutting down: finishing in-flight requests... 正在關閉...")
+            await server.shutdown()
+            serving.cancel()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+def serve_workers(target, target_args: tuple, workers: int, host: str = "127.0.0.1", port: int = 8000):
+    """Run ``workers`` API processes that accept connections on one shared port.
+
+    The parent binds the listening socket and spawns each worker as
+    ``target(*target_args, sock, index)``; the target builds its own translator
+    and calls run_api_server(..., sock=sock). Workers that die are restarted;
+    SIGINT/SIGTERM stops them all gracefully.
+    """
+    context = multiprocessing.get_context("spawn")  # no forking of a threaded parent
+    sock = socket.create_server((host, port), backlog=1024)
+    processes: Dict[int, multiprocessing.Process] = {}
+    stopping = False
+
+    def spawn(index: int):
+        process = context.Process(target=target, args=target_args + (sock, index), name=f"mt-api-{index}")
+        process.start()
+        processes[index] = process
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()  # SIGTERM: the worker finishes in-flight requests first
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, stop)
+    for index in range(workers):
+        spawn(index)
+    print(f"🔌 API listening on http://{host}:{sock.getsockname()[1]} with {workers} workers "
+          f"(pids {', '.join(str(p.pid) for p in processes.values())})")
+
+    started = {index: time.time() for index in processes}
+    while processes:
+        for index, process in list(processes.items()):
+            process.join(timeout=0.5)
+            if process.is_alive():
+                continue
+            del processes[index]
+            if not stopping:
+                print(f"⚠️ Worker {index} (pid {process.pid}) exited with {process.exitcode}; restarting 重新啟動")
+                if time.time() - started[index] < 5:
+                    time.sleep(1)  # don't spin on a worker that fails at startup
+                spawn(index)
+                started[index] = time.time()
+    sock.close()
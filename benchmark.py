@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+📏 Multi-MT Term Comparison Tool - Benchmarks
+Offline micro-benchmarks for the translator and its rendering paths.
+
+Usage:
+    python benchmark.py render              # Bytes sent and render time per comparison
+    python benchmark.py render --engines 8 --runs 500
+    python benchmark.py pool                # Per-call latency saved by client/connection pooling
+    python benchmark.py load                # Concurrent sessions against local stub engines
+    python benchmark.py memory --rows 1000000   # Memory per stored result: objects vs columns
+    python benchmark.py --json load.json load --sessions 50 --engines 8 --error-rate 0.05
+"""
+
+import argparse
+import dataclasses
+import itertools
+import json
+import math
+import os
+import random
+import statistics
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import mt_term_tool
+from mt_term_tool import (JsonRenderer, MultiMTTranslator, RateLimit, ResultColumns, TranslationResult,
+                          StatusRenderer, create_status_html)
+
+# ============================================================
+# HELPERS
+# ============================================================
+
+def _comparison_frames(n_engines: int):
+    """Replay the frames of one comparison in which engines finish one after another."""
+    results = [
+        TranslationResult(engine=f"Engine {i}", engine_zh=f"引擎 {i}", source_lang="auto", target_lang="en",
+                          source_text="衞生署衞生防護中心", translated_text="", success=False, status="pending")
+        for i in range(n_engines)
+    ]
+    yield results, "Starting... 開始翻譯..."
+    for r in results:
+        r.status = "running"
+    yield results, ", ".join(r.engine for r in results)
+    for i, r in enumerate(results):
+        r.status, r.success = "success", True
+        r.translated_text, r.translation_time = "Centre for Health Protection", 0.5 + i / 10
+        yield results, ", ".join(x.engine for x in results if x.status == "running")
+    yield results, ""
+
+
+class _StubEngineHandler(BaseHTTPRequestHandler):
+    """Local stand-in for a web MT endpoint, answering with Google-style result markup."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    handshake_delay = 0.0
+
+    def setup(self):
+        # Each new connection pays a simulated TCP + TLS handshake.
+        time.sleep(self.handshake_delay)
+        super().setup()
+
+    def do_GET(self):
+        body = b'<div class="result-container">stub translation</div>'
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_stub_server(handshake_delay: float) -> ThreadingHTTPServer:
+    handler = type("StubHandler", (_StubEngineHandler,), {"handshake_delay": handshake_delay})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_stub_engine(median_ms: float, sigma: float = 0.5, error_rate: float = 0.0, timeout_rate: float = 0.0,
+                     seed: int = 0):
+    """A register_engine function with log-normal latency that sometimes fails or hangs.
+
+    A hanging call sleeps past the deadline it was given, so it shows up as a timeout.
+    """
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    def translate(text, source, target, timeout):
+        with lock:
+            roll, delay = rng.random(), rng.lognormvariate(math.log(median_ms / 1000), sigma)
+        if roll < timeout_rate:
+            time.sleep((timeout or 1.0) + 0.5)
+            return ""
+        time.sleep(delay)
+        if roll < timeout_rate + error_rate:
+            raise ConnectionError("stub engine error")
+        return f"{text} → {target}"
+
+    return translate
+
+
+def _percentiles(samples: list) -> dict:
+    if not samples:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 1)
+
+    return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+
+def _latency_summary(samples: list) -> dict:
+    return {"mean_ms": round(statistics.mean(samples) * 1000, 3), "p50_ms": round(statistics.median(samples) * 1000, 3)}
+
+
+def _print_report(title: str, report: dict):
+    print(f"\n📏 {title}")
+    for key, value in report.items():
+        print(f"   {key:<28} {value}")
+
+# ============================================================
+# BENCHMARKS
+# ============================================================
+
+def bench_render(n_engines: int = 8, runs: int = 200) -> dict:
+    """Compare full-page frames (CSS + every row) with the incremental renderer."""
+    full_bytes = sum(len(create_status_html(results, current).encode()) for results, current in _comparison_frames(n_engines))
+
+    renderer = StatusRenderer()
+    frames = _comparison_frames(n_engines)
+    results, current = next(frames)
+    incremental_bytes = len(renderer.full(results, current).encode())
+    incremental_bytes += sum(len(json.dumps(renderer.delta(results, current), ensure_ascii=False).encode())
+                             for results, current in frames)
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        for results, current in _comparison_frames(n_engines):
+            create_status_html(results, current)
+    full_time = (time.perf_counter() - start) / runs
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        renderer = StatusRenderer()
+        frames = _comparison_frames(n_engines)
+        renderer.full(*next(frames))
+        for results, current in frames:
+            json.dumps(renderer.delta(results, current), ensure_ascii=False)
+    incremental_time = (time.perf_counter() - start) / runs
+
+    return {
+        "engines": n_engines,
+        "frames": n_engines + 3,
+        "full_bytes": full_bytes,
+        "incremental_bytes": incremental_bytes,
+        "bytes_saved_pct": round(100 * (1 - incremental_bytes / full_bytes), 1),
+        "full_render_ms": round(full_time * 1000, 3),
+        "incremental_render_ms": round(incremental_time * 1000, 3),
+    }
+
+
+def bench_pool(calls: int = 200, handshake_ms: float = 20.0) -> dict:
+    """Per-call latency of a fresh client + connection per term versus the pooled path.
+
+    Runs against a local stub HTTP server; ``handshake_ms`` simulates the cost of
+    opening a connection to a real (TLS) endpoint. With deep_translator installed
+    the real GoogleTranslator client is pointed at the stub; otherwise only the
+    HTTP layer is compared.
+    """
+    import requests
+
+    server = _start_stub_server(handshake_ms / 1000)
+    url = f"http://127.0.0.1:{server.server_address[1]}/m"
+    try:
+        try:
+            import deep_translator.google as google_module
+            from deep_translator.constants import BASE_URLS
+        except ImportError:
+            google_module = None
+
+        if google_module is None:
+            mode = "http"
+
+            def fresh_call(i):
+                requests.get(url, params={"q": f"term {i}"}).close()
+
+            def pooled_call(i):
+                mt_term_tool.HTTP_POOL.get(url, params={"q": f"term {i}"}).close()
+        else:
+            mode = "deep_translator"
+            BASE_URLS["GOOGLE_TRANSLATE"] = url
+            translator = MultiMTTranslator(verbose=False)
+            engine_info = {"name": "Google Translate", "name_zh": "谷歌翻譯", "class_name": "GoogleTranslator"}
+            mt_term_tool.load_backend("deep_translator")
+
+            def fresh_call(i):
+                # What every call did before pooling: new client, bare requests.get.
+                google_module.requests = requests
+                try:
+                    google_module.GoogleTranslator(source="en", target="zh-TW").translate(f"term {i}")
+                finally:
+                    google_module.requests = mt_term_tool.HTTP_POOL
+
+            def pooled_call(i):
+                translator._translate_deep_translator(f"term {i}", "en", "zh-TW", engine_info, timeout=5)
+
+        samples = {}
+        for name, call in (("fresh", fresh_call), ("pooled", pooled_call)):
+            call(-1)  # warm-up
+            timings = []
+            for i in range(calls):
+                start = time.perf_counter()
+                call(i)
+                timings.append(time.perf_counter() - start)
+            samples[name] = timings
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    fresh, pooled = _latency_summary(samples["fresh"]), _latency_summary(samples["pooled"])
+    return {
+        "mode": mode,
+        "calls": calls,
+        "simulated_handshake_ms": handshake_ms,
+        "fresh_mean_ms": fresh["mean_ms"],
+        "fresh_p50_ms": fresh["p50_ms"],
+        "pooled_mean_ms": pooled["mean_ms"],
+        "pooled_p50_ms": pooled["p50_ms"],
+        "saved_per_call_ms": round(fresh["mean_ms"] - pooled["mean_ms"], 3),
+    }
+
+def bench_load(sessions: int = 20, requests_per_session: int = 5, n_engines: int = 8, median_ms: float = 200.0,
+               sigma: float = 0.5, error_rate: float = 0.0, timeout_rate: float = 0.0, timeout: float = 2.0,
+               handler: str = "ui", max_workers: int = 16, distinct_terms: int = 0, seed: int = 0) -> dict:
+    """Drive concurrent comparison sessions against local stub engines.
+
+    Every session runs requests_per_session comparisons back to back, each with all
+    n_engines stubs. handler "ui" replays the web handler's per-frame work
+    (StatusRenderer deltas plus the JSON panel); "streaming" consumes
+    translate_streaming's full HTML frames. Time to first result is measured to the
+    first frame with a finished engine. distinct_terms > 0 draws terms from a pool of
+    that size so the caches and request coalescing get hits; 0 makes every term unique.
+    Peak memory is tracemalloc's peak over the run (tracing slows the run a little).
+    """
+    translator = MultiMTTranslator(verbose=False, max_workers=max_workers, max_timeout=timeout,
+                                   builtin_engines=False, coalesce=distinct_terms > 0,
+                                   recent_size=1024 if distinct_terms > 0 else 0)
+    unlimited = RateLimit(rate=1e9, burst=10 ** 9, max_concurrent=10 ** 6, max_queue=10 ** 6)
+    engine_names = []
+    for i in range(n_engines):
+        key = f"stub{i}"
+        mt_term_tool.get_rate_limiter(key, unlimited)
+        translator.register_engine(key, f"Stub {i}", f"模擬 {i}",
+                                   make_stub_engine(median_ms, sigma, error_rate, timeout_rate, seed + i))
+        engine_names.append(key)
+
+    def run_ui(term):
+        renderer, json_renderer = StatusRenderer(), JsonRenderer()
+        frames = translator.translate_results_streaming(term, "auto", "en", engine_names)
+        renderer.full(*next(frames))
+        for results, current in frames:
+            finished = any(r.status not in ('pending', 'running') for r in results)
+            json.dumps(renderer.delta(results, current), ensure_ascii=False)
+            yield finished, translator._to_json(results, json_renderer) if finished else ""
+
+    def run_streaming(term):
+        for _, json_out in translator.translate_streaming(term, "auto", "en", engine_names):
+            yield bool(json_out), json_out
+
+    run = run_ui if handler == "ui" else run_streaming
+    first_result, complete, failed_calls = [], [], [0]
+    lock = threading.Lock()
+
+    def session(index):
+        rng = random.Random(seed * 7919 + index)
+        for n in range(requests_per_session):
+            term = f"術語 {rng.randrange(distinct_terms)}" if distinct_terms else f"術語 {index}-{n}"
+            start = time.perf_counter()
+            ttfr, json_out = None, ""
+            for finished, json_out in run(term):
+                if finished and ttfr is None:
+                    ttfr = time.perf_counter() - start
+            elapsed = time.perf_counter() - start
+            succeeded = len(json.loads(json_out)) if json_out else 0  # the JSON panel lists successes only
+            with lock:
+                complete.append(elapsed)
+                if ttfr is not None:
+                    first_result.append(ttfr)
+                failed_calls[0] += n_engines - succeeded
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    comparisons = len(complete)
+    return {
+        "handler": handler,
+        "sessions": sessions,
+        "comparisons": comparisons,
+        "engines": n_engines,
+        "stub_median_ms": median_ms,
+        "error_rate": error_rate,
+        "timeout_rate": timeout_rate,
+        "wall_s": round(wall, 3),
+        "comparisons_per_s": round(comparisons / wall, 2),
+        "engine_calls_per_s": round(comparisons * n_engines / wall, 2),
+        "failed_engine_calls": failed_calls[0],
+        "ttfr": _percentiles(first_result),
+        "complete": _percentiles(complete),
+        "peak_traced_mb": round(peak / 2 ** 20, 2),
+    }
+
+def bench_memory(rows: int = 200000, n_engines: int = 8) -> dict:
+    """Memory held by `rows` stored results: plain dataclasses, slotted TranslationResults, ResultColumns.
+
+    Rows look like a batch run: one source term shared by n_engines results,
+    a distinct translation per row, engine and language names shared.
+    """
+    plain_result = dataclasses.make_dataclass("PlainResult", [f.name for f in dataclasses.fields(TranslationResult)])
+    engines = [(f"Stub Engine {i}", f"模擬引擎 {i}") for i in range(n_engines)]
+
+    def generate(factory):
+        for term_index in range(rows // n_engines + 1):
+            term = f"術語 {term_index}"
+            for engine, engine_zh in engines:
+                yield factory(engine, engine_zh, "zh-TW", "en", term, f"term {term_index} via {engine}",
+                              True, "", 0.25, "success", False, "")
+
+    def measure(build):
+        tracemalloc.start()
+        start = time.perf_counter()
+        store = build()
+        elapsed = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del store
+        return {"bytes_per_row": round(current / rows, 1), "total_mb": round(current / 2 ** 20, 1),
+                "peak_mb": round(peak / 2 ** 20, 1), "build_s": round(elapsed, 2)}
+
+    report = {
+        "rows": rows,
+        "dataclass": measure(lambda: list(itertools.islice(generate(plain_result), rows))),
+        "slots_dataclass": measure(lambda: list(itertools.islice(generate(TranslationResult), rows))),
+        "columns": measure(lambda: ResultColumns(itertools.islice(generate(TranslationResult), rows))),
+    }
+
+    columns = ResultColumns(itertools.islice(generate(TranslationResult), rows))
+    start = time.perf_counter()
+    with open(os.devnull, "w", encoding="utf-8") as f:
+        columns.to_jsonl(f)
+    report["columns"]["jsonl_export_s"] = round(time.perf_counter() - start, 2)
+    report["columns"]["nbytes_mb"] = round(columns.nbytes() / 2 ** 20, 1)
+    return report
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-MT Term Comparison Tool benchmarks")
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this JSON file")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    render = subparsers.add_parser("render", help="Bytes sent and render time per comparison")
+    render.add_argument("--engines", type=int, default=8, help="Engines per comparison")
+    render.add_argument("--runs", type=int, default=200, help="Comparisons to time")
+
+    pool = subparsers.add_parser("pool", help="Per-call latency saved by client/connection pooling")
+    pool.add_argument("--calls", type=int, default=200, help="Calls per variant")
+    pool.add_argument("--handshake-ms", type=float, default=20.0, help="Simulated connection setup cost")
+
+    load = subparsers.add_parser("load", help="Concurrent comparison sessions against local stub engines")
+    load.add_argument("--sessions", type=int, default=20, help="Concurrent simulated users")
+    load.add_argument("--requests", type=int, default=5, help="Comparisons per session, run back to back")
+    load.add_argument("--engines", type=int, default=8, help="Stub engines per comparison")
+    load.add_argument("--latency-ms", type=float, default=200.0, help="Median stub latency")
+    load.add_argument("--sigma", type=float, default=0.5, help="Log-normal spread of stub latency")
+    load.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub calls that raise")
+    load.add_argument("--timeout-rate", type=float, default=0.0, help="Fraction of stub calls that hang past the deadline")
+    load.add_argument("--timeout", type=float, default=2.0, help="Upstream deadline (translator max_timeout)")
+    load.add_argument("--handler", choices=("ui", "streaming"), default="ui",
+                      help="ui: web handler's incremental frames; streaming: translate_streaming's full frames")
+    load.add_argument("--workers", type=int, default=16, help="Translator worker pool size")
+    load.add_argument("--distinct-terms", type=int, default=0, help="Draw terms from a pool this size (0: all unique)")
+    load.add_argument("--seed", type=int, default=0, help="Seed for stub latency and term choice")
+
+    memory = subparsers.add_parser("memory", help="Memory per stored result: dataclasses vs columnar store")
+    memory.add_argument("--rows", type=int, default=200000, help="Results to store")
+    memory.add_argument("--engines", type=int, default=8, help="Results per source term")
+
+    args = parser.parse_args()
+
+    if args.benchmark == "render":
+        report = bench_render(args.engines, args.runs)
+        _print_report("Status rendering per comparison 每次比較的渲染成本", report)
+    elif args.benchmark == "pool":
+        report = bench_pool(args.calls, args.handshake_ms)
+        _print_report("Client & connection pooling 連線池效能", report)
+    elif args.benchmark == "load":
+        report = bench_load(args.sessions, args.requests, args.engines, args.latency_ms, args.sigma,
+                            args.error_rate, args.timeout_rate, args.timeout, args.handler, args.workers,
+                            args.distinct_terms, args.seed)
+        _print_report("Load test with stub engines 模擬引擎負載測試", report)
+    elif args.benchmark == "memory":
+        report = bench_memory(args.rows, args.engines)
+        _print_report("Result storage memory 結果儲存記憶體用量", report)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"benchmark": args.benchmark, "report": report}, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
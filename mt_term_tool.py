@@ -6,42 +6,73 @@ Compare terminology translations across multiple MT engines.
 import warnings
 warnings.filterwarnings('ignore')
 
+import os
+import re
+import sys
+import csv
+import array
+import importlib
+import importlib.util
 import time
 import json
-from typing import List, Generator
-from dataclasses import dataclass
+import sqlite3
+import tempfile
+import uuid
+import asyncio
+import contextvars
+import weakref
+import bisect
+import threading
+import functools
+import itertools
+import unicodedata
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import List, Dict, Generator, AsyncIterator, Optional, Iterable, Iterator, Tuple, Callable, TYPE_CHECKING
+from dataclasses import dataclass, field, replace
+from concurrent.futures import ThreadPoolExecutor, Future, FIRST_COMPLETED, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import xml.etree.ElementTree as ET
 
 # ============================================================
 # IMPORTS
 # ============================================================
 
-DEEP_TRANSLATOR_AVAILABLE = False
-TRANSLATORS_AVAILABLE = False
-GRADIO_AVAILABLE = False
+# Engine backends are imported on first use (`translators` alone is slow to
+# import); availability is checked without importing anything.
+DEEP_TRANSLATOR_AVAILABLE = importlib.util.find_spec("deep_translator") is not None
+TRANSLATORS_AVAILABLE = importlib.util.find_spec("translators") is not None
+GRADIO_AVAILABLE = importlib.util.find_spec("gradio") is not None
+PYARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+if TYPE_CHECKING:
+    import pyarrow
 
-try:
-    from deep_translator import GoogleTranslator, MyMemoryTranslator
-    DEEP_TRANSLATOR_AVAILABLE = True
-except ImportError:
-    pass
+_BACKENDS = {}
+_BACKENDS_LOCK = threading.Lock()
 
-try:
-    import translators as ts
-    TRANSLATORS_AVAILABLE = True
-except ImportError:
-    pass
 
-try:
-    import gradio as gr
-    GRADIO_AVAILABLE = True
-except ImportError:
-    pass
+def load_backend(name: str):
+    """Import an engine backend module ("deep_translator" or "translators") once, on first use."""
+    module = _BACKENDS.get(name)
+    if module is None:
+        with _BACKENDS_LOCK:
+            module = _BACKENDS.get(name)
+            if module is None:
+                module = importlib.import_module(name)
+                if name == "deep_translator":
+                    _install_pooled_http()
+                _BACKENDS[name] = module
+    return module
 
 # ============================================================
 # DATA CLASSES
 # ============================================================
 
-@dataclass
+# Slotted dataclasses (no per-instance __dict__) need Python 3.10+.
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
 class TranslationResult:
     """Single translation result from one engine."""
     engine: str
@@ -54,6 +85,210 @@ class TranslationResult:
     error_message: str = ""
     translation_time: float = 0.0
     status: str = "pending"
+    cached: bool = False
+    note: str = ""  # e.g. the match type and score of a Term Memory result
+
+# ============================================================
+# RESULT STORE
+# ============================================================
+
+class _Interner:
+    """Map repeated strings to small ints (and back)."""
+    __slots__ = ("ids", "values")
+    
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.values: List[str] = []
+    
+    def __call__(self, value: str) -> int:
+        index = self.ids.get(value)
+        if index is None:
+            index = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+
+class ResultColumns:
+    """Columnar store for large numbers of TranslationResults (batch runs).
+
+    Engines, languages, statuses, errors and notes are interned as small ints,
+    source and translated texts are kept as UTF-8 in contiguous buffers, and the
+    remaining fields in typed arrays: about 35 bytes per row plus the text.
+    Consecutive rows with the same source text (one term, many engines) share it.
+    For a million batch-like rows that is ~65 MB against ~215 MB as
+    TranslationResults (python benchmark.py memory).
+
+    Indexing and iteration rebuild TranslationResults on demand; to_jsonl and
+    to_parquet export in chunks without materializing them.
+    """
+    
+    def __init__(self, results: Iterable[TranslationResult] = ()):
+        self._engines = _Interner()  # "name\tname_zh"
+        self._langs = _Interner()
+        self._statuses = _Interner()
+        self._errors = _Interner()
+        self._notes = _Interner()
+        self.engine = array.array('H')
+        self.source_lang = array.array('H')
+        self.target_lang = array.array('H')
+        self.status = array.array('B')
+        self.error = array.array('I')
+        self.note = array.array('I')
+        self.source = array.array('I')  # index into the source texts
+        self.time = array.array('f')
+        self.success = array.array('B')
+        self.cached = array.array('B')
+        self._source_offsets = array.array('q', [0])
+        self._source_data = bytearray()
+        self._last_source: Optional[str] = None
+        self._text_offsets = array.array('q', [0])
+        self._text_data = bytearray()
+        self.extend(results)
+    
+    def append(self, result: TranslationResult):
+        if result.source_text != self._last_source:
+            self._last_source = result.source_text
+            self._source_data += result.source_text.encode('utf-8')
+            self._source_offsets.append(len(self._source_data))
+        self.source.append(len(self._source_offsets) - 2)
+        self.engine.append(self._engines(f"{result.engine}\t{result.engine_zh}"))
+        self.source_lang.append(self._langs(result.source_lang))
+        self.target_lang.append(self._langs(result.target_lang))
+        self.status.append(self._statuses(result.status))
+        self.error.append(self._errors(result.error_message))
+        self.note.append(self._notes(result.note))
+        self.time.append(result.translation_time)
+        self.success.append(result.success)
+        self.cached.append(result.cached)
+        self._text_data += result.translated_text.encode('utf-8')
+        self._text_offsets.append(len(self._text_data))
+    
+    def extend(self, results: Iterable[TranslationResult]):
+        for result in results:
+            self.append(result)
+    
+    def __len__(self) -> int:
+        return len(self.engine)
+    
+    @staticmethod
+    def _slice(data: bytearray, offsets: array.array, index: int) -> str:
+        return data[offsets[index]:offsets[index + 1]].decode('utf-8')
+    
+    def __getitem__(self, index: int) -> TranslationResult:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ResultColumns index out of range")
+        engine, engine_zh = self._engines.values[self.engine[index]].split("\t", 1)
+        return TranslationResult(
+            engine=engine, engine_zh=engine_zh,
+            source_lang=self._langs.values[self.source_lang[index]],
+            target_lang=self._langs.values[self.target_lang[index]],
+            source_text=self._slice(self._source_data, self._source_offsets, self.source[index]),
+            translated_text=self._slice(self._text_data, self._text_offsets, index),
+            success=bool(self.success[index]), error_message=self._errors.values[self.error[index]],
+            translation_time=self.time[index], status=self._statuses.values[self.status[index]],
+            cached=bool(self.cached[index]), note=self._notes.values[self.note[index]],
+        )
+    
+    def __iter__(self) -> Iterator[TranslationResult]:
+        return (self[i] for i in range(len(self)))
+    
+    def nbytes(self) -> int:
+        """Approximate memory held by the store, interned strings included."""
+        arrays = (self.engine, self.source_lang, self.target_lang, self.status, self.error, self.note,
+                  self.source, self.time, self.success, self.cached, self._source_offsets, self._text_offsets)
+        total = sum(a.itemsize * len(a) for a in arrays) + len(self._source_data) + len(self._text_data)
+        for interner in (self._engines, self._langs, self._statuses, self._errors, self._notes):
+            total += sum(sys.getsizeof(value) for value in interner.values)
+        return total
+    
+    def to_jsonl(self, file, start: int = 0) -> int:
+        """Write rows from start on as JSON lines (TranslationResult field names); returns the rows written.
+
+        file is a path (appended to) or an open text file. Passing the previous
+        return value as start exports only rows added since then.
+        """
+        if isinstance(file, str):
+            with open(file, 'a', encoding='utf-8') as f:
+                return self.to_jsonl(f, start)
+        engines = [value.split("\t", 1) for value in self._engines.values]
+        langs, statuses, errors, notes = (self._langs.values, self._statuses.values,
+                                          self._errors.values, self._notes.values)
+        for i in range(start, len(self)):
+            engine, engine_zh = engines[self.engine[i]]
+            file.write(json.dumps({
+                "engine": engine, "engine_zh": engine_zh,
+                "source_lang": langs[self.source_lang[i]], "target_lang": langs[self.target_lang[i]],
+                "source_text": self._slice(self._source_data, self._source_offsets, self.source[i]),
+                "translated_text": self._slice(self._text_data, self._text_offsets, i),
+                "success": bool(self.success[i]), "error_message": errors[self.error[i]],
+                "translation_time": round(self.time[i], 3), "status": statuses[self.status[i]],
+                "cached": bool(self.cached[i]), "note": notes[self.note[i]],
+            }, ensure_ascii=False) + '\n')
+        return len(self) - start
+    
+    def arrow_batches(self, batch_size: int = 65536) -> Iterator["pyarrow.RecordBatch"]:
+        """Yield the rows as Arrow record batches (requires pyarrow).
+
+        Fixed-width columns and translated texts are wrapped without copying, so
+        do not append to the store while a batch is still referenced.
+        """
+        import pyarrow as pa
+        
+        def column(kind, values: array.array, offset: int, length: int):
+            return pa.Array.from_buffers(kind, length, [None, pa.py_buffer(values)], offset=offset)
+        
+        def dictionary(kind, ids: array.array, values: List[str], offset: int, length: int):
+            return pa.DictionaryArray.from_arrays(column(kind, ids, offset, length), pa.array(values, pa.string()))
+        
+        engines = [value.split("\t", 1) for value in self._engines.values]
+        names, names_zh = [e[0] for e in engines], [e[1] for e in engines]
+        sources = pa.Array.from_buffers(pa.large_string(), len(self._source_offsets) - 1,
+                                        [None, pa.py_buffer(self._source_offsets), pa.py_buffer(self._source_data)])
+        texts = pa.Array.from_buffers(pa.large_string(), len(self),
+                                      [None, pa.py_buffer(self._text_offsets), pa.py_buffer(self._text_data)])
+        for start in range(0, len(self), batch_size):
+            n = min(batch_size, len(self) - start)
+            yield pa.RecordBatch.from_arrays([
+                dictionary(pa.uint16(), self.engine, names, start, n),
+                dictionary(pa.uint16(), self.engine, names_zh, start, n),
+                dictionary(pa.uint16(), self.source_lang, self._langs.values, start, n),
+                dictionary(pa.uint16(), self.target_lang, self._langs.values, start, n),
+                sources.take(column(pa.uint32(), self.source, start, n)),
+                texts.slice(start, n),
+                column(pa.uint8(), self.success, start, n).cast(pa.bool_()),
+                dictionary(pa.uint32(), self.error, self._errors.values, start, n),
+                column(pa.float32(), self.time, start, n),
+                dictionary(pa.uint8(), self.status, self._statuses.values, start, n),
+                column(pa.uint8(), self.cached, start, n).cast(pa.bool_()),
+                dictionary(pa.uint32(), self.note, self._notes.values, start, n),
+            ], schema=self.arrow_schema())
+    
+    @staticmethod
+    def arrow_schema() -> "pyarrow.Schema":
+        import pyarrow as pa
+        labels = pa.dictionary(pa.uint16(), pa.string())
+        return pa.schema([
+            ("engine", labels), ("engine_zh", labels), ("source_lang", labels), ("target_lang", labels),
+            ("source_text", pa.large_string()), ("translated_text", pa.large_string()), ("success", pa.bool_()),
+            ("error_message", pa.dictionary(pa.uint32(), pa.string())), ("translation_time", pa.float32()),
+            ("status", pa.dictionary(pa.uint8(), pa.string())), ("cached", pa.bool_()),
+            ("note", pa.dictionary(pa.uint32(), pa.string())),
+        ])
+    
+    def to_arrow(self) -> "pyarrow.Table":
+        import pyarrow as pa
+        return pa.Table.from_batches(list(self.arrow_batches()), self.arrow_schema())
+    
+    def to_parquet(self, path: str, row_group_size: int = 65536):
+        """Write the rows to a Parquet file one row group at a time (requires pyarrow)."""
+        if not PYARROW_AVAILABLE:
+            raise ImportError("Parquet export needs pyarrow (pip install pyarrow)")
+        import pyarrow.parquet as pq
+        with pq.ParquetWriter(path, self.arrow_schema()) as writer:
+            for batch in self.arrow_batches(row_group_size):
+                writer.write_batch(batch)
 
 # ============================================================
 # LANGUAGE CONFIGS
@@ -96,108 +331,2187 @@ GOOGLE_LANG_MAP = {
     'ru': 'ru', 'ar': 'ar', 'hi': 'hi', 'th': 'th', 'vi': 'vi',
 }
 
+# ============================================================
+# ENGINES
+# ============================================================
+
+# (key, name, name_zh, backend, backend engine id, priority). The backend engine id is
+# the deep_translator class name or the `translators` engine name.
+ENGINE_DESCRIPTORS = [
+    ("google", "Google Translate", "谷歌翻譯", "deep_translator", "GoogleTranslator", 1),
+    ("bing", "Microsoft Bing", "微軟必應翻譯", "translators", "bing", 2),
+    ("alibaba", "Alibaba Translate", "阿里翻譯", "translators", "alibaba", 3),
+    ("sogou", "Sogou Translate", "搜狗翻譯", "translators", "sogou", 4),
+    ("youdao", "Youdao Translate", "有道翻譯", "translators", "youdao", 5),
+    ("tencent", "Tencent Translate", "騰訊翻譯", "translators", "qqTranSmart", 6),
+    ("lingvanex", "Lingvanex", "Lingvanex 翻譯", "translators", "lingvanex", 7),
+    ("mymemory", "MyMemory", "MyMemory 翻譯記憶庫", "deep_translator", "MyMemoryTranslator", 8),
+]
+
 # ============================================================
 # HELPER FUNCTIONS
 # ============================================================
 
+# Characters written differently in Traditional and Simplified Chinese, as
+# (Traditional, Simplified) pairs. Only characters that are specific to one
+# script are listed, so their counts tell the two apart; pairs like 並/并 or
+# 準/准, whose "simplified" form is also everyday Traditional, are left out.
+_HANT_HANS_PAIRS = """
+國国 學学 體体 會会 來来 時时 個个 們们 說说 這这 對对 發发 經经 動动 開开 關关 長长 問问
+間间 電电 實实 現现 進进 與与 機机 業业 產产 當当 種种 點点 從从 據据 應应 質质 還还 員员
+處处 數数 義义 變变 條条 難难 區区 歷历 總总 級级 將将 華华 東东 書书 車车 馬马 鳥鸟 魚鱼
+語语 認认 識识 話话 讀读 記记 論论 議议 計计 設设 許许 證证 試试 請请 調调 護护 衛卫 衞卫
+醫医 藥药 療疗 險险 環环 權权 濟济 貨货 幣币 銀银 錢钱 價价 買买 賣卖 場场 廠厂 網网 絡络
+軟软 腦脑 習习 術术 藝艺 師师 聽听 聲声 氣气 溫温 熱热 態态 務务 導导 協协 團团 際际 組组
+織织 傳传 統统 資资 訊讯 號号 報报 紙纸 張张 節节 農农 陽阳 陰阴 飛飞 風风 觀观 視视 親亲
+愛爱 歡欢 樂乐 邊边 線线 圖图 廣广 島岛 灣湾 嗎吗 為为 無无 兒儿 頭头 離离 壓压
+隊队 顯显 顧顾 預预 領领 題题 類类 黨党 齊齐 龍龙 鐘钟 鐵铁 錄录 鏈链 塊块 綠绿 紅红 結结
+給给 績绩 續续 維维 構构 礎础 積积 確确 築筑 穩稳 聯联 複复 雜杂 異异 屬属 殺杀 狀状
+寬宽 擬拟 衝冲 碼码 雙双 勞劳 獎奖 歲岁 舊旧 雞鸡 飯饭 貓猫 測测 標标 驗验 檢检 舉举
+""".split()
+HANT_CHARS = "".join(pair[0] for pair in _HANT_HANS_PAIRS)
+HANS_CHARS = "".join(pair[1] for pair in _HANT_HANS_PAIRS)
+
+# Codepoint ranges per script.
+SCRIPT_RANGES = {
+    'han': [(0x3400, 0x4DBF), (0x4E00, 0x9FFF), (0xF900, 0xFAFF)],
+    'kana': [(0x3040, 0x309F), (0x30A0, 0x30FF), (0xFF66, 0xFF9F)],
+    'hangul': [(0x1100, 0x11FF), (0x3130, 0x318F), (0xAC00, 0xD7AF)],
+    'thai': [(0x0E00, 0x0E7F)],
+    'arabic': [(0x0600, 0x06FF), (0x0750, 0x077F)],
+    'devanagari': [(0x0900, 0x097F)],
+    'cyrillic': [(0x0400, 0x052F)],
+}
+
+
+def _char_class(ranges: List[Tuple[int, int]], exclude: str = "") -> str:
+    """Regex character class covering ranges minus the characters in exclude."""
+    excluded = sorted({ord(c) for c in exclude})
+    parts = []
+    for start, end in ranges:
+        for cut in [cp for cp in excluded if start <= cp <= end] + [end + 1]:
+            if cut - 1 > start:
+                parts.append(f"{chr(start)}-{chr(cut - 1)}")
+            elif cut - 1 == start:
+                parts.append(chr(start))
+            start = cut + 1
+    return "[" + "".join(parts) + "]"
+
+
+# One alternation over all scripts, so a single regex scan yields runs of each
+# script. Han excludes the Traditional/Simplified-specific characters, which
+# have their own groups.
+_SCRIPT_RE = re.compile("|".join(
+    [f"(?P<hant>[{HANT_CHARS}]+)", f"(?P<hans>[{HANS_CHARS}]+)",
+     f"(?P<han>{_char_class(SCRIPT_RANGES['han'], HANT_CHARS + HANS_CHARS)}+)"]
+    + [f"(?P<{script}>{_char_class(ranges)}+)" for script, ranges in SCRIPT_RANGES.items() if script != 'han']
+))
+
+# Scripts that identify a language once they make up more than 10% of the text.
+_SCRIPT_LANGUAGES = [('hangul', 'ko'), ('han', None), ('thai', 'th'), ('arabic', 'ar'),
+                     ('devanagari', 'hi'), ('cyrillic', 'ru')]
+
+# Scripts whose count includes that of _SCRIPT_RE groups split off from them.
+_SCRIPT_GROUPS = {'han': ('han', 'hant', 'hans')}
+
+
+@dataclass(frozen=True)
+class ScriptProfile:
+    """Script histogram of a text and the language it suggests."""
+    counts: Tuple[Tuple[str, int], ...]
+    total: int
+    language: str
+    by_script: Dict[str, int] = field(default_factory=dict, compare=False, repr=False)  # counts plus _SCRIPT_GROUPS
+    
+    def count(self, script: str) -> int:
+        """Characters of a script; 'han' includes the Traditional/Simplified-specific ones."""
+        return self.by_script.get(script, 0)
+
+
+@functools.lru_cache(maxsize=4096)
+def classify_scripts(text: str) -> ScriptProfile:
+    """Build the script histogram of text in one regex pass and pick a language.
+
+    Memoized, so every engine handling the same request reuses one result.
+    """
+    counts = {}
+    for match in _SCRIPT_RE.finditer(text):
+        counts[match.lastgroup] = counts.get(match.lastgroup, 0) + match.end() - match.start()
+    
+    total = len(text)
+    by_script = dict(counts)
+    for script, groups in _SCRIPT_GROUPS.items():
+        by_script[script] = sum(counts.get(group, 0) for group in groups)
+    language = 'en'
+    if total and counts.get('kana'):
+        language = 'ja'
+    elif total:
+        for script, code in _SCRIPT_LANGUAGES:
+            if by_script.get(script, 0) / total > 0.1:
+                language = code or ('zh-TW' if counts.get('hant', 0) > counts.get('hans', 0) else 'zh-CN')
+                break
+    return ScriptProfile(counts=tuple(sorted(counts.items())), total=total, language=language, by_script=by_script)
+
+
 def detect_language_simple(text: str) -> str:
     """Simple language detection based on character ranges."""
-    chinese_chars = sum(1 for c in text if '\u4e00' <= c <= '\u9fff')
-    japanese_chars = sum(1 for c in text if '\u3040' <= c <= '\u309f' or '\u30a0' <= c <= '\u30ff')
-    korean_chars = sum(1 for c in text if '\uac00' <= c <= '\ud7af')
+    return classify_scripts(text).language
+
+
+def _has_han(text: str) -> bool:
+    return classify_scripts(text).count('han') > 0
+
+
+def _echoes_source(text: str, translated: str, target: str) -> bool:
+    """True for a Chinese term "translated" into English that comes back unchanged."""
+    return bool(translated) and translated.strip() == text.strip() and _has_han(text) and target == 'en'
+
+
+STATUS_CSS = """
+    .mt-container { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; }
+    .mt-header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 15px 20px; border-radius: 10px 10px 0 0; margin-bottom: 0; }
+    .mt-header h3 { margin: 0; font-size: 18px; }
+    .mt-item { border: 1px solid #e0e0e0; border-top: none; padding: 15px 20px; background: white; transition: all 0.3s ease; }
+    .mt-item:last-child { border-radius: 0 0 10px 10px; }
+    .mt-item:hover { background: #f8f9fa; }
+    .mt-item.running { background: #fff8e1; border-left: 4px solid #ffc107; animation: pulse 1.5s infinite; }
+    .mt-item.success { background: #e8f5e9; border-left: 4px solid #4caf50; }
+    .mt-item.error { background: #ffebee; border-left: 4px solid #f44336; }
+    .mt-item.pending { background: #fafafa; border-left: 4px solid #9e9e9e; opacity: 0.7; }
+    .mt-item.skipped { background: #f5f5f5; border-left: 4px solid #bdbdbd; opacity: 0.8; }
+    .engine-name { font-weight: 600; font-size: 15px; color: #333; display: flex; align-items: center; gap: 8px; }
+    .engine-zh { color: #666; font-weight: normal; font-size: 13px; }
+    .translation { margin-top: 10px; font-size: 15px; color: #1a1a1a; line-height: 1.6; padding: 10px; background: #f5f5f5; border-radius: 6px; }
+    .translation.empty { color: #999; font-style: italic; }
+    .meta { margin-top: 8px; font-size: 12px; color: #888; display: flex; gap: 15px; }
+    .status-icon { font-size: 18px; }
+    .spinner { display: inline-block; width: 18px; height: 18px; border: 2px solid #ffc107; border-radius: 50%; border-top-color: transparent; animation: spin 1s linear infinite; }
+    @keyframes spin { to { transform: rotate(360deg); } }
+    @keyframes pulse { 0%, 100% { opacity: 1; } 50% { opacity: 0.7; } }
+    .loading-banner { background: linear-gradient(90deg, #667eea, #764ba2, #667eea); background-size: 200% 100%; animation: shimmer 2s infinite; color: white; padding: 15px 20px; border-radius: 10px; margin-bottom: 15px; text-align: center; font-size: 16px; }
+    @keyframes shimmer { 0% { background-position: 200% 0; } 100% { background-position: -200% 0; } }
+    .progress-text { font-size: 14px; margin-top: 5px; opacity: 0.9; }
+"""
+
+
+def _render_banner(results: List[TranslationResult], current_engine: str = "", unit: str = "engines") -> str:
+    completed = sum(1 for r in results if r.status in ['success', 'error', 'skipped'])
+    total = len(results)
+    success_count = sum(1 for r in results if r.status == 'success')
+    
+    if current_engine:
+        return f"""
+        <div class="loading-banner">
+            <div>🔄 <strong>Translating Term... 術語翻譯中...</strong></div>
+            <div class="progress-text">Processing: {current_engine} ({completed}/{total} completed)</div>
+        </div>
+        """
+    if completed > 0 and completed == total:
+        report = quorum_report(results)
+        summary = f"{success_count}/{total} {unit} successful"
+        if report["agreed"]:
+            summary = f"{', '.join(report['agreed'])} agreed 共識: <strong>{report['translation']}</strong>"
+        if report["cut_off"]:
+            summary += f" · {report['reason']}, cut off 已停止: {', '.join(report['cut_off'])}"
+        return f"""
+        <div style="background: #4caf50; color: white; padding: 12px 20px; border-radius: 10px; margin-bottom: 15px; text-align: center;">
+            ✅ <strong>Complete! 完成!</strong> {summary}
+        </div>
+        """
+    return ""
+
+
+def _render_row(result: TranslationResult, row_id: str) -> str:
+    if result.status == 'running':
+        status_icon = '<span class="spinner"></span>'
+    elif result.status == 'success':
+        status_icon = '<span class="status-icon">✅</span>'
+    elif result.status == 'error':
+        status_icon = '<span class="status-icon">❌</span>'
+    elif result.status == 'skipped':
+        status_icon = '<span class="status-icon">⏭️</span>'
+    else:
+        status_icon = '<span class="status-icon">⏳</span>'
+    
+    html = f'<div class="mt-item {result.status}" id="{row_id}">'
+    html += f'<div class="engine-name">{status_icon} {result.engine} <span class="engine-zh">({result.engine_zh})</span></div>'
+    
+    if result.status == 'running':
+        html += '<div class="translation empty">⏳ Translating... 翻譯中...</div>'
+    elif result.status == 'success':
+        html += f'<div class="translation">{result.translated_text}</div>'
+        cached_tag = '<span>⚡ cached 快取</span>' if result.cached else ''
+        note_tag = f'<span>📖 {result.note}</span>' if result.note else ''
+        html += f'<div class="meta"><span>⏱️ {result.translation_time:.2f}s</span>{cached_tag}{note_tag}</div>'
+    elif result.status in ('error', 'skipped'):
+        error_msg = result.error_message if result.error_message else "Service unavailable 服務暫時無法使用"
+        html += f'<div class="translation empty">⚠️ {error_msg}</div>'
+    else:
+        html += '<div class="translation empty">Waiting... 等待中...</div>'
+    
+    html += '</div>'
+    return html
+
+
+def create_status_html(results: List[TranslationResult], current_engine: str = "", include_css: bool = True) -> str:
+    """Create HTML showing translation progress.
+
+    Pass include_css=False when STATUS_CSS is already on the page (e.g. via the
+    Blocks ``css``), so frames only carry markup.
+    """
+    with trace_span("render.status_html", rows=len(results)):
+        html = f"<style>{STATUS_CSS}</style>" if include_css else ""
+        html += f'<div id="mt-banner">{_render_banner(results, current_engine)}</div>'
+        html += '<div class="mt-container">'
+        html += '<div class="mt-header"><h3>📊 Term Translation Results 術語翻譯結果</h3></div>'
+        for i, result in enumerate(results):
+            html += _render_row(result, f"mt-row-{i}")
+        html += '</div>'
+        return html
+
+
+class StatusRenderer:
+    """Incremental status rendering for one comparison.
+
+    The first frame is the full markup (without CSS); after that ``delta``
+    returns only the banner and rows whose markup changed since the last frame,
+    keyed by their stable element ids, for STATUS_PATCH_JS to apply in the page.
+    Subclasses lay out other pages by overriding the four rendering hooks.
+    """
+    
+    banner_id = "mt-banner"
+    
+    def __init__(self):
+        self._banner = None
+        self._signatures: Dict[str, tuple] = {}
+        self._seq = 0
+        self.run_id = uuid.uuid4().hex[:8]
+    
+    def _page(self, results: List[TranslationResult], current_engine: str) -> str:
+        return create_status_html(results, current_engine, include_css=False)
+    
+    def _banner_html(self, results: List[TranslationResult], current_engine: str) -> str:
+        return _render_banner(results, current_engine)
+    
+    def _items(self, results: List[TranslationResult]) -> Iterator[Tuple[str, TranslationResult]]:
+        return ((f"mt-row-{i}", result) for i, result in enumerate(results))
+    
+    def _render_item(self, result: TranslationResult, item_id: str) -> str:
+        return _render_row(result, item_id)
+    
+    def full(self, results: List[TranslationResult], current_engine: str = "") -> str:
+        self._banner = self._banner_html(results, current_engine)
+        self._signatures = {}
+        self.delta(results, current_engine)
+        self._seq = 0
+        # The run id makes every comparison's first frame differ, so the page always re-renders
+        # it instead of keeping rows patched during the previous run.
+        return f'<div data-run="{self.run_id}">{self._page(results, current_engine)}</div>'
+    
+    def delta(self, results: List[TranslationResult], current_engine: str = "") -> dict:
+        self._seq += 1
+        patch = {"seq": self._seq, "rows": {}}
+        banner = self._banner_html(results, current_engine)
+        if banner != self._banner:
+            patch["banner"] = self._banner = banner
+            patch["banner_id"] = self.banner_id
+        for row_id, result in self._items(results):
+            signature = (result.status, result.engine, result.translated_text, result.error_message,
+                         round(result.translation_time, 2), result.cached, result.note)
+            if self._signatures.get(row_id) != signature:
+                self._signatures[row_id] = signature
+                patch["rows"][row_id] = self._render_item(result, row_id)
+        return patch
+
+
+# ------------------------------------------------------------
+# Multi-target matrix (targets x engines)
+# ------------------------------------------------------------
+
+MATRIX_CSS = """
+    .mx-table { width: 100%; border-collapse: collapse; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; font-size: 14px; }
+    .mx-table th { background: #667eea; color: white; padding: 8px 10px; text-align: left; font-weight: 600; }
+    .mx-table th .engine-zh { color: #e8eaf6; }
+    .mx-table td { border: 1px solid #e0e0e0; padding: 8px 10px; vertical-align: top; }
+    .mx-table td.mx-lang { font-weight: 600; background: #f5f5f5; white-space: nowrap; }
+    .mx-cell.success { background: #e8f5e9; }
+    .mx-cell.error { background: #ffebee; color: #999; }
+    .mx-cell.skipped { background: #f5f5f5; color: #999; }
+    .mx-cell.running { background: #fff8e1; }
+    .mx-cell.pending { background: #fafafa; color: #bbb; }
+    .mx-cell .meta { margin-top: 4px; }
+"""
+
+
+def _matrix_shape(results: List[TranslationResult]) -> Tuple[List[str], int]:
+    """Targets in row order and engines per row of a target-major matrix."""
+    targets = list(dict.fromkeys(r.target_lang for r in results))
+    return targets, (len(results) // len(targets) if targets else 0)
+
+
+def _render_cell(result: TranslationResult, cell_id: str) -> str:
+    if result.status == 'success':
+        cached_tag = ' · ⚡' if result.cached else ''
+        note_tag = f' · 📖 {result.note}' if result.note else ''
+        content = f'{result.translated_text}<div class="meta">⏱️ {result.translation_time:.2f}s{cached_tag}{note_tag}</div>'
+    elif result.status == 'running':
+        content = '<span class="spinner"></span>'
+    elif result.status in ('error', 'skipped'):
+        error_msg = (result.error_message or "Service unavailable 服務暫時無法使用").replace('"', "&quot;")
+        icon = "⏭️" if result.status == "skipped" else "⚠️"
+        content = f'<span title="{error_msg}">{icon}</span>'
+    else:
+        content = '⏳'
+    return f'<td class="mx-cell {result.status}" id="{cell_id}">{content}</td>'
+
+
+def create_matrix_html(results: List[TranslationResult], current: str = "", include_css: bool = True) -> str:
+    """HTML grid of a multi-target comparison: one row per target language, one column per engine."""
+    targets, n_engines = _matrix_shape(results)
+    html = f"<style>{STATUS_CSS}{MATRIX_CSS}</style>" if include_css else ""
+    html += f'<div id="mx-banner">{_render_banner(results, current, unit="cells")}</div>'
+    html += '<table class="mx-table"><tr><th>Target 目標語言</th>'
+    for r in results[:n_engines]:
+        html += f'<th>{r.engine} <span class="engine-zh">{r.engine_zh}</span></th>'
+    html += '</tr>'
+    for t, target in enumerate(targets):
+        html += f'<tr><td class="mx-lang">{SUPPORTED_LANGUAGES.get(target, target)}</td>'
+        for e in range(n_engines):
+            html += _render_cell(results[t * n_engines + e], f"mx-cell-{t}-{e}")
+        html += '</tr>'
+    html += '</table>'
+    return html
+
+
+class MatrixRenderer(StatusRenderer):
+    """StatusRenderer for the multi-target grid; patches individual cells."""
+    
+    banner_id = "mx-banner"
+    
+    def _page(self, results: List[TranslationResult], current_engine: str) -> str:
+        return create_matrix_html(results, current_engine, include_css=False)
+    
+    def _banner_html(self, results: List[TranslationResult], current_engine: str) -> str:
+        return _render_banner(results, current_engine, unit="cells")
+    
+    def _items(self, results: List[TranslationResult]) -> Iterator[Tuple[str, TranslationResult]]:
+        _, n_engines = _matrix_shape(results)
+        return ((f"mx-cell-{i // n_engines}-{i % n_engines}", result) for i, result in enumerate(results))
+    
+    def _render_item(self, result: TranslationResult, item_id: str) -> str:
+        return _render_cell(result, item_id)
+
+
+class JsonRenderer:
+    """Renders the results JSON for successive frames of one comparison.
+
+    Each successful result is serialized once and its fragment reused while it
+    stays unchanged, so a frame costs one join instead of re-encoding every
+    earlier result. The output is identical to json.dumps(..., indent=2).
+    """
+    
+    def __init__(self):
+        self._fragments: Dict[int, Tuple[tuple, str]] = {}
+        self._last: Optional[Tuple[tuple, str]] = None
+    
+    @staticmethod
+    def _item(result: TranslationResult) -> dict:
+        item = {"engine": result.engine, "engine_zh": result.engine_zh, "translation": result.translated_text,
+                "time": f"{result.translation_time:.2f}s", "cached": result.cached}
+        if result.note:
+            item["note"] = result.note
+        return item
+    
+    def render(self, results: List[TranslationResult]) -> str:
+        fragments = []
+        for i, result in enumerate(results):
+            if not result.success:
+                continue
+            signature = (result.engine, result.translated_text, result.translation_time, result.cached, result.note)
+            known = self._fragments.get(i)
+            if known is None or known[0] != signature:
+                text = json.dumps(self._item(result), ensure_ascii=False, indent=2)
+                known = self._fragments[i] = (signature, "  " + text.replace("\n", "\n  "))
+            fragments.append(known[1])
+        key = tuple(fragments)
+        if self._last is None or self._last[0] != key:
+            self._last = (key, "[\n" + ",\n".join(fragments) + "\n]" if fragments else "[]")
+        return self._last[1]
+
+
+# Applies a StatusRenderer.delta patch to the rendered results page.
+STATUS_PATCH_JS = """
+(patch) => {
+    if (!patch || !patch.rows) return;
+    if (patch.banner !== undefined) {
+        const banner = document.getElementById(patch.banner_id || 'mt-banner');
+        if (banner) banner.innerHTML = patch.banner;
+    }
+    for (const [id, html] of Object.entries(patch.rows)) {
+        const row = document.getElementById(id);
+        if (row) row.outerHTML = html;
+    }
+}
+"""
+
+# ============================================================
+# TRANSLATION CACHE
+# ============================================================
+
+def normalize_term(text: str) -> str:
+    """Normalize a term for cache keys: NFC form, trimmed, inner whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class TranslationCache:
+    """Persistent SQLite cache of engine results with TTL and LRU size eviction.
+
+    Entries are keyed on (engine key, resolved source lang, target lang,
+    normalized text). The database runs in WAL mode so several processes can
+    share one cache file.
+    """
+    
+    # Access times are only rewritten when older than this, keeping hits read-only.
+    TOUCH_INTERVAL = 60.0
+    
+    def __init__(self, path: str = "mt_cache.sqlite3", ttl: Optional[float] = 7 * 24 * 3600,
+                 max_entries: int = 100_000, cache_errors: bool = False):
+        """
+        Args:
+            path: SQLite database file (":memory:" for a throwaway cache).
+            ttl: Seconds an entry stays valid; None keeps entries until evicted.
+            max_entries: Least recently used entries are evicted beyond this size.
+            cache_errors: Also cache failed results (e.g. unsupported language pairs,
+                unchanged echoes); MultiMTTranslator never stores TRANSIENT_ERRORS.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.cache_errors = cache_errors
+        self.hits = 0
+        self.misses = 0
+        self._writes_since_evict = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS translations (
+                engine TEXT NOT NULL, source_lang TEXT NOT NULL, target_lang TEXT NOT NULL,
+                text TEXT NOT NULL, translated_text TEXT NOT NULL, success INTEGER NOT NULL,
+                error_message TEXT NOT NULL, translation_time REAL NOT NULL,
+                created_at REAL NOT NULL, accessed_at REAL NOT NULL,
+                PRIMARY KEY (engine, source_lang, target_lang, text)
+            ) WITHOUT ROWID
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_accessed ON translations (accessed_at)")
+    
+    def get(self, engine: str, source_lang: str, target_lang: str, text: str) -> Optional[dict]:
+        """Return the cached entry as a dict, or None on a miss or expired entry."""
+        key = (engine, source_lang, target_lang, normalize_term(text))
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT translated_text, success, error_message, translation_time, created_at, accessed_at "
+                "FROM translations WHERE engine=? AND source_lang=? AND target_lang=? AND text=?", key
+            ).fetchone()
+            if row is None or (self.ttl is not None and now - row[4] > self.ttl):
+                self.misses += 1
+                return None
+            if now - row[5] > self.TOUCH_INTERVAL:
+                self._conn.execute(
+                    "UPDATE translations SET accessed_at=? "
+                    "WHERE engine=? AND source_lang=? AND target_lang=? AND text=?", (now,) + key
+                )
+            self.hits += 1
+        return {"translated_text": row[0], "success": bool(row[1]), "error_message": row[2], "translation_time": row[3]}
+    
+    def put(self, engine: str, source_lang: str, target_lang: str, text: str, result: TranslationResult):
+        """Store a result; failed results are skipped unless cache_errors is set."""
+        if not result.success and not self.cache_errors:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (engine, source_lang, target_lang, normalize_term(text), result.translated_text,
+                 int(result.success), result.error_message, result.translation_time, now, now)
+            )
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= max(1, self.max_entries // 100):
+                self._evict()
+    
+    def _evict(self):
+        """Drop expired entries, then the least recently used ones beyond max_entries."""
+        self._writes_since_evict = 0
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM translations WHERE created_at < ?", (time.time() - self.ttl,))
+        count = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM translations WHERE (engine, source_lang, target_lang, text) IN "
+                "(SELECT engine, source_lang, target_lang, text FROM translations ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,)
+            )
+    
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM translations")
+            self.hits = self.misses = 0
+    
+    def stats(self) -> dict:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        return {"entries": size, "hits": self.hits, "misses": self.misses}
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+# ============================================================
+# REQUEST COALESCING
+# ============================================================
+
+class SingleFlight:
+    """Share one in-flight call among concurrent callers asking for the same key."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[tuple, Future] = {}
+    
+    def do(self, key: tuple, fn: Callable[[], TranslationResult]) -> Tuple[TranslationResult, bool]:
+        """Run fn() unless a call for key is already in flight, then wait for that one.
+
+        Returns (result, shared) where shared is True for callers that waited on
+        another caller's call instead of running fn themselves.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result(), True
+        
+        try:
+            result = fn()
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+    
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class RecentResults:
+    """Thread-safe in-memory LRU of recent results with a short TTL."""
+    
+    def __init__(self, max_size: int = 1024, ttl: float = 30.0):
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, Tuple[float, dict]]" = OrderedDict()
+    
+    def get(self, key: tuple) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+    
+    def put(self, key: tuple, result: TranslationResult):
+        if not result.success:
+            return
+        with self._lock:
+            self._entries[key] = (time.time(), {
+                "translated_text": result.translated_text, "success": result.success,
+                "error_message": result.error_message, "translation_time": result.translation_time,
+            })
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+# ============================================================
+# ENGINE HEALTH
+# ============================================================
+
+class EngineHealth:
+    """Rolling latency/error statistics, adaptive timeout and circuit breaker for one engine.
+
+    The breaker opens after ``failure_threshold`` consecutive failures and
+    fast-fails requests for ``cooldown`` seconds. It then lets a single probe
+    request through (half-open): success closes it, failure re-opens it.
+    """
+    
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+    
+    def __init__(self, window: int = 50, failure_threshold: int = 5, cooldown: float = 30.0,
+                 min_timeout: float = 2.0, max_timeout: float = 15.0, timeout_factor: float = 2.0,
+                 min_samples: int = 5):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_factor = timeout_factor
+        self.min_samples = min_samples
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.last_sample_at = 0.0
+        self._probe_in_flight = False
+        self._samples = deque(maxlen=window)  # (latency, ok)
+        self._lock = threading.Lock()
+    
+    def allow_request(self) -> bool:
+        """Whether a call may go upstream now; claims the probe slot when half-open."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.time() - self.opened_at < self.cooldown:
+                    return False
+                self.state = self.HALF_OPEN
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+    
+    def record(self, latency: float, ok: bool):
+        """Record the outcome of an upstream call."""
+        with self._lock:
+            self._samples.append((latency, ok))
+            self.last_sample_at = time.time()
+            if self.state == self.HALF_OPEN:
+                self._probe_in_flight = False
+            if ok:
+                self.consecutive_failures = 0
+                self.state = self.CLOSED
+                return
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.time()
+    
+    def _latency_percentile(self, pct: float) -> Optional[float]:
+        latencies = sorted(latency for latency, ok in self._samples if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(pct / 100 * len(latencies)))]
+    
+    def timeout(self) -> float:
+        """Upstream timeout derived from observed p95 latency, within [min_timeout, max_timeout]."""
+        with self._lock:
+            if sum(1 for _, ok in self._samples if ok) < self.min_samples:
+                return self.max_timeout
+            p95 = self._latency_percentile(95)
+        return min(self.max_timeout, max(self.min_timeout, p95 * self.timeout_factor))
+    
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = len(self._samples)
+            errors = sum(1 for _, ok in self._samples if not ok)
+            p50, p95 = self._latency_percentile(50), self._latency_percentile(95)
+            state = self.state
+            if state == self.OPEN and time.time() - self.opened_at >= self.cooldown:
+                state = self.HALF_OPEN
+        return {
+            "state": state, "samples": samples, "error_rate": errors / samples if samples else 0.0,
+            "p50": p50, "p95": p95, "timeout": self.timeout(),
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+# ============================================================
+# HEALTH PROBING
+# ============================================================
+
+PROBE_CANARY = ("information", "en", "zh-TW")  # (text, source, target)
+
+
+class EngineProber:
+    """Background thread that translates a canary term with each engine now and then.
+
+    Every ``interval`` seconds it probes at most ``budget`` engines, the ones
+    with the stalest health data first, skipping engines that real requests
+    measured during the last interval or whose rate limiter has callers waiting
+    (probes never queue for a token). Probe calls go upstream through
+    _call_engine, so they feed the same EngineHealth latency/breaker state that
+    orders get_available_engines, and count in the metrics like any other call.
+    """
+    
+    PROBED_TYPES = ("deep_translator", "translators", "custom")
+    
+    def __init__(self, translator: "MultiMTTranslator", interval: float = 300.0, budget: int = 4,
+                 canary: Tuple[str, str, str] = PROBE_CANARY):
+        self.translator = translator
+        self.interval = max(1.0, interval)
+        self.budget = max(1, budget)
+        self.canary = canary
+        self.results: Dict[str, dict] = {}  # engine -> last probe {"ok", "latency", "at", "error"}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> "EngineProber":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="mt-prober", daemon=True)
+            self._thread.start()
+        return self
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+    
+    def _run(self):
+        while not self._stop.is_set():
+            self.probe_round()
+            self._stop.wait(self.interval)
+    
+    def due(self) -> List[str]:
+        """Engines to probe next, stalest first, at most budget of them."""
+        now = time.time()
+        candidates = []
+        for name, info in self.translator.engines.items():
+            if info.get("type") not in self.PROBED_TYPES:
+                continue
+            last = self.translator.engine_health(name).last_sample_at
+            if now - last >= self.interval:
+                candidates.append((last, name))
+        return [name for _, name in sorted(candidates)[:self.budget]]
+    
+    def probe_round(self) -> Dict[str, dict]:
+        """Probe the due engines once (in this thread); returns their results."""
+        text, source, target = self.canary
+        probed = {}
+        for name in self.due():
+            if self._stop.is_set():
+                break
+            if get_rate_limiter(name).queued():
+                continue
+            with trace_span("probe", engine=name):
+                result = self.translator._call_engine(text, source, target, name, max_wait=0.0,
+                                                      priority=PRIORITY_PROBE, client_id="prober")
+            if result.status == "skipped" and self.translator.engine_health(name).state == EngineHealth.CLOSED:
+                continue  # no token free right now; try again next round
+            probed[name] = self.results[name] = {
+                "ok": result.success, "latency": round(result.translation_time, 3),
+                "at": time.time(), "error": result.error_message,
+            }
+        return probed
+
+# ============================================================
+# METRICS
+# ============================================================
+
+# Upper bounds (seconds) of the latency and queue-wait histogram buckets.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0, 30.0)
+QUEUE_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram; not thread-safe on its own (TranslatorMetrics locks around it)."""
+    
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+    
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th observation (None if empty or beyond the last bucket)."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return None
+    
+    def summary(self) -> dict:
+        return {"count": self.count, "mean": self.sum / self.count if self.count else None,
+                "p50": self.quantile(0.5), "p95": self.quantile(0.95), "p99": self.quantile(0.99)}
+
+
+UNAVAILABLE_PREFIX = "unavailable: "
+_UNAVAILABLE_ERRORS = {"ConnectionError", "RequestError", "TooManyRequests", "ChunkedEncodingError", "ProtocolError"}
+_UNAVAILABLE_CODES = {"ERR_TOO_MANY_REQUESTS", "ERR_INTERNAL_SERVER_ERROR", "ERR_SERVICE_NOT_AVAIBLE"}
+
+
+def _is_unavailable(error: Exception) -> bool:
+    """Whether an engine exception means the service was unreachable or overloaded (not the term's fault).
+
+    Connection errors, HTTP 429/5xx responses and deep_translator's equivalents
+    count; anything else (unsupported language, invalid payload, ...) does not.
+    """
+    if any(cls.__name__ in _UNAVAILABLE_ERRORS for cls in type(error).__mro__):
+        return True
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None) or getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return bool(error.args) and error.args[0] in _UNAVAILABLE_CODES
+
+
+def _error_class(result: TranslationResult) -> str:
+    """Short, low-cardinality label for why a call failed."""
+    message = result.error_message
+    if result.status == "skipped":
+        return "circuit_open" if "circuit open" in message else "rate_limited"
+    if message.startswith("Timed out"):
+        return "timeout"
+    if message.startswith(UNAVAILABLE_PREFIX):
+        return "unavailable"
+    if "unchanged" in message:
+        return "unchanged_text"
+    if not message:
+        return "empty_response"
+    return "exception"
+
+
+class TranslatorMetrics:
+    """Counters, gauges and histograms for one MultiMTTranslator.
+
+    Engine calls are counted by outcome (success, error, timeout, skipped), failures
+    by error class, cache lookups by where they were answered, and upstream latency
+    and rate-limit queue wait go into per-engine histograms (queue wait also per
+    priority class).
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: Dict[Tuple[str, str], int] = {}         # (engine, outcome) -> count
+        self.errors: Dict[Tuple[str, str], int] = {}        # (engine, error class) -> count
+        self.lookups: Dict[Tuple[str, str], int] = {}       # (engine, recent|disk|coalesced|miss) -> count
+        self.latency: Dict[str, Histogram] = {}
+        self.queue_wait: Dict[str, Histogram] = {}
+        self.priority_wait: Dict[str, Histogram] = {}       # priority class -> queue wait
+        self.in_flight: Dict[str, int] = {}
+        self.comparisons_in_flight = 0
+        self.comparisons_total = 0
+        self.started = time.time()
+    
+    @staticmethod
+    def _inc(counter: dict, key, amount: int = 1):
+        counter[key] = counter.get(key, 0) + amount
+    
+    def record_lookup(self, engine: str, where: str):
+        with self._lock:
+            self._inc(self.lookups, (engine, where))
+    
+    def record_queue_wait(self, engine: str, seconds: float, priority: Optional[str] = None):
+        with self._lock:
+            self.queue_wait.setdefault(engine, Histogram(QUEUE_WAIT_BUCKETS)).observe(seconds)
+            self.priority_wait.setdefault(priority or PRIORITY_INTERACTIVE, Histogram(QUEUE_WAIT_BUCKETS)).observe(seconds)
+    
+    def record_call(self, engine: str, result: TranslationResult, upstream: bool = True):
+        """Count one engine call; upstream calls also feed the latency histogram."""
+        if result.success:
+            outcome = "success"
+        else:
+            error_class = _error_class(result)
+            outcome = {"timeout": "timeout", "circuit_open": "skipped", "rate_limited": "skipped"}.get(error_class, "error")
+        with self._lock:
+            self._inc(self.calls, (engine, outcome))
+            if not result.success:
+                self._inc(self.errors, (engine, error_class))
+            if upstream:
+                self.latency.setdefault(engine, Histogram()).observe(result.translation_time)
+    
+    def call_started(self, engine: str, delta: int = 1):
+        with self._lock:
+            self._inc(self.in_flight, engine, delta)
+    
+    def comparison_started(self, delta: int = 1):
+        with self._lock:
+            self.comparisons_in_flight += delta
+            if delta > 0:
+                self.comparisons_total += delta
+    
+    def snapshot(self) -> dict:
+        """Per-engine statistics plus totals, as plain data."""
+        with self._lock:
+            engines = {engine for engine, _ in itertools.chain(self.calls, self.errors, self.lookups)}
+            engines |= set(self.latency) | set(self.queue_wait) | set(self.in_flight)
+            per_engine = {}
+            for engine in sorted(engines):
+                lookups = {where: n for (e, where), n in self.lookups.items() if e == engine}
+                answered = sum(n for where, n in lookups.items() if where != "miss")
+                total_lookups = answered + lookups.get("miss", 0)
+                calls = {outcome: n for (e, outcome), n in self.calls.items() if e == engine}
+                total_calls = sum(calls.values())
+                per_engine[engine] = {
+                    "calls": calls,
+                    "errors": {cls: n for (e, cls), n in self.errors.items() if e == engine},
+                    "error_rate": 1 - calls.get("success", 0) / total_calls if total_calls else 0.0,
+                    "lookups": lookups,
+                    "cache_hit_ratio": answered / total_lookups if total_lookups else 0.0,
+                    "latency": self.latency[engine].summary() if engine in self.latency else None,
+                    "queue_wait": self.queue_wait[engine].summary() if engine in self.queue_wait else None,
+                    "in_flight": self.in_flight.get(engine, 0),
+                }
+            return {
+                "uptime": time.time() - self.started,
+                "comparisons_total": self.comparisons_total,
+                "comparisons_in_flight": self.comparisons_in_flight,
+                "queue_wait_by_priority": {p: h.summary() for p, h in sorted(self.priority_wait.items())},
+                "engines": per_engine,
+            }
+    
+    def prometheus(self, health: Optional[Dict[str, dict]] = None, limiters: Optional[Dict[str, "EngineLimiter"]] = None) -> str:
+        """Render the metrics in Prometheus text exposition format (0.0.4)."""
+        def labels(**values) -> str:
+            return "{" + ",".join(f'{k}="{_prometheus_escape(str(v))}"' for k, v in values.items()) + "}"
+        
+        lines = []
+        
+        def family(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+        
+        def histograms(name: str, histos: Dict[str, Histogram], key: str = "engine"):
+            for value, histo in sorted(histos.items()):
+                cumulative = 0
+                for bound, n in zip(histo.buckets + (float("inf"),), histo.counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{labels(**{key: value, 'le': le})} {cumulative}")
+                lines.append(f"{name}_sum{labels(**{key: value})} {histo.sum}")
+                lines.append(f"{name}_count{labels(**{key: value})} {histo.count}")
+        
+        with self._lock:
+            family("mt_engine_calls_total", "counter", "Engine calls by outcome (success, error, timeout, skipped).")
+            for (engine, outcome), n in sorted(self.calls.items()):
+                lines.append(f"mt_engine_calls_total{labels(engine=engine, outcome=outcome)} {n}")
+            family("mt_engine_errors_total", "counter", "Failed engine calls by error class.")
+            for (engine, cls), n in sorted(self.errors.items()):
+                lines.append(f"mt_engine_errors_total{labels(engine=engine, error_class=cls)} {n}")
+            family("mt_cache_lookups_total", "counter", "Lookups by where they were answered (recent, disk, coalesced, miss).")
+            for (engine, where), n in sorted(self.lookups.items()):
+                lines.append(f"mt_cache_lookups_total{labels(engine=engine, result=where)} {n}")
+            family("mt_engine_latency_seconds", "histogram", "Upstream engine call latency.")
+            histograms("mt_engine_latency_seconds", self.latency)
+            family("mt_engine_queue_wait_seconds", "histogram", "Time spent waiting for the engine's rate limiter.")
+            histograms("mt_engine_queue_wait_seconds", self.queue_wait)
+            family("mt_priority_queue_wait_seconds", "histogram", "Rate-limiter wait by priority class (interactive, batch, probe).")
+            histograms("mt_priority_queue_wait_seconds", self.priority_wait, key="priority")
+            family("mt_engine_in_flight", "gauge", "Upstream engine calls currently running.")
+            for engine, n in sorted(self.in_flight.items()):
+                lines.append(f"mt_engine_in_flight{labels(engine=engine)} {n}")
+            family("mt_comparisons_in_flight", "gauge", "Comparisons currently streaming.")
+            lines.append(f"mt_comparisons_in_flight {self.comparisons_in_flight}")
+            family("mt_comparisons_total", "counter", "Comparisons started.")
+            lines.append(f"mt_comparisons_total {self.comparisons_total}")
+        
+        if health:
+            family("mt_engine_circuit_open", "gauge", "1 while the engine's circuit breaker is not closed.")
+            for engine, snap in sorted(health.items()):
+                lines.append(f"mt_engine_circuit_open{labels(engine=engine)} {int(snap['state'] != EngineHealth.CLOSED)}")
+            family("mt_engine_down", "gauge", "1 while the engine is considered down (breaker open or failed probe).")
+            for engine, snap in sorted(health.items()):
+                lines.append(f"mt_engine_down{labels(engine=engine)} {int(snap.get('down', False))}")
+            family("mt_engine_timeout_seconds", "gauge", "Current adaptive upstream timeout.")
+            for engine, snap in sorted(health.items()):
+                lines.append(f"mt_engine_timeout_seconds{labels(engine=engine)} {snap['timeout']}")
+        if limiters:
+            family("mt_engine_queued", "gauge", "Callers waiting for the engine's rate limiter.")
+            for engine, limiter in sorted(limiters.items()):
+                lines.append(f"mt_engine_queued{labels(engine=engine)} {limiter.queued()}")
+            family("mt_engine_rate_limited_total", "counter", "Calls rejected by the engine's rate limiter (process-wide).")
+            for engine, limiter in sorted(limiters.items()):
+                lines.append(f"mt_engine_rate_limited_total{labels(engine=engine)} {limiter.rejected}")
+        return "\n".join(lines) + "\n"
+
+
+def _prometheus_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def start_metrics_server(translator: "MultiMTTranslator", port: int, host: str = "0.0.0.0"):
+    """Serve /metrics (Prometheus text) and /stats (JSON) from a background thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path == "/metrics":
+                body, content_type = translator.metrics_text().encode(), "text/plain; version=0.0.4; charset=utf-8"
+            elif path == "/stats":
+                body, content_type = json.dumps(translator.get_stats(), ensure_ascii=False).encode(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mt-metrics", daemon=True).start()
+    return server
+
+# ============================================================
+# TRACING & PROFILING
+# ============================================================
+
+@dataclass
+class Span:
+    """One timed stage of a request. Times are Unix epoch nanoseconds."""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str = ""
+    start: int = 0
+    end: int = 0
+    attributes: dict = field(default_factory=dict)
+    error: str = ""
+    
+    @property
+    def duration(self) -> float:
+        return (self.end - self.start) / 1e9
+    
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+    
+    def to_otlp(self) -> dict:
+        """The span as an OTLP/JSON span object."""
+        def value(v):
+            if isinstance(v, bool):
+                return {"boolValue": v}
+            if isinstance(v, int):
+                return {"intValue": str(v)}
+            if isinstance(v, float):
+                return {"doubleValue": v}
+            return {"stringValue": str(v)}
+        
+        return {
+            "traceId": self.trace_id, "spanId": self.span_id, "parentSpanId": self.parent_id,
+            "name": self.name, "kind": 1,
+            "startTimeUnixNano": str(self.start), "endTimeUnixNano": str(self.end),
+            "attributes": [{"key": k, "value": value(v)} for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 0},
+        }
+
+
+class JsonLinesSpanExporter:
+    """Appends finished spans to a file, one OTLP/JSON ``resourceSpans`` document per line.
+
+    Each line can be replayed into an OpenTelemetry collector's OTLP/HTTP endpoint
+    or read directly with jq.
+    """
+    
+    def __init__(self, path: str, service_name: str = "multi-mt-term-tool"):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+    
+    def export(self, span: Span):
+        document = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{"scope": {"name": "mt_term_tool"}, "spans": [span.to_otlp()]}],
+        }]}
+        line = json.dumps(document, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            if not span.parent_id:
+                self._file.flush()
+    
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class SlowRequestProfiler:
+    """Sampling profiler that keeps stacks only for requests slower than ``threshold`` seconds.
+
+    While a top-level span is open, a background thread samples the stacks of every
+    thread working on that trace every ``interval`` seconds. When the span ends
+    after more than ``threshold`` seconds, the samples are written to
+    ``<directory>/<trace id>.folded`` in collapsed-stack format (one
+    ``frame;frame;frame count`` line per stack), ready for flamegraph.pl or
+    speedscope; otherwise they are dropped.
+    """
+    
+    def __init__(self, directory: str, threshold: float = 2.0, interval: float = 0.005):
+        self.directory = directory
+        self.threshold = threshold
+        self.interval = interval
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._threads: Dict[int, List[Span]] = {}   # thread ident -> open spans, innermost last
+        self._samples: Dict[str, Dict[str, int]] = {}  # trace id -> collapsed stack -> count
+        self._sampler = None
+    
+    def enter(self, span: Span):
+        with self._lock:
+            self._threads.setdefault(threading.get_ident(), []).append(span)
+            if not span.parent_id:
+                self._samples[span.trace_id] = {}
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._run, name="mt-profiler", daemon=True)
+                self._sampler.start()
+    
+    def exit(self, span: Span):
+        ident = threading.get_ident()
+        with self._lock:
+            stack = self._threads.get(ident, [])
+            if span in stack:
+                stack.remove(span)
+            if not stack:
+                self._threads.pop(ident, None)
+            samples = self._samples.pop(span.trace_id, None) if not span.parent_id else None
+        if samples and span.duration > self.threshold:
+            self._dump(span, samples)
+    
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, stack in self._threads.items():
+                    if ident == me or not stack or ident not in frames:
+                        continue
+                    samples = self._samples.get(stack[-1].trace_id)
+                    if samples is not None:
+                        key = self._collapse(frames[ident])
+                        samples[key] = samples.get(key, 0) + 1
+    
+    @staticmethod
+    def _collapse(frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+    
+    def _dump(self, span: Span, samples: Dict[str, int]):
+        path = os.path.join(self.directory, f"{span.trace_id}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(samples.items()):
+                f.write(f"{stack} {count}\n")
+
+
+# The span that is current in this thread / asyncio task.
+_CURRENT_SPAN = contextvars.ContextVar("mt_current_span", default=None)
+
+
+class _NoSpan:
+    """Yielded by a disabled tracer so callers can set attributes unconditionally."""
+    
+    def set(self, **attributes):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Tracer:
+    """Context-manager span API. Spans cost almost nothing while no exporter or profiler is set."""
+    
+    def __init__(self, exporter: Optional[JsonLinesSpanExporter] = None, profiler: Optional[SlowRequestProfiler] = None):
+        self.exporter = exporter
+        self.profiler = profiler
+    
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None or self.profiler is not None
+    
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Time the enclosed block as a child of the current span (or a new trace)."""
+        if not self.enabled:
+            yield _NO_SPAN
+            return
+        parent = _CURRENT_SPAN.get()
+        span = Span(
+            name=name, trace_id=parent.trace_id if parent else uuid.uuid4().hex,
+            span_id=uuid.uuid4().hex[:16], parent_id=parent.span_id if parent else "",
+            start=time.time_ns(), attributes=attributes,
+        )
+        token = _CURRENT_SPAN.set(span)
+        if self.profiler:
+            self.profiler.enter(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"[:200]
+            raise
+        finally:
+            span.end = time.time_ns()
+            _CURRENT_SPAN.reset(token)
+            if self.profiler:
+                self.profiler.exit(span)
+            if self.exporter:
+                self.exporter.export(span)
+
+
+_TRACER = Tracer()
+
+
+def set_tracer(tracer: Tracer):
+    """Install the process-wide tracer used by the translator and renderers."""
+    global _TRACER
+    _TRACER = tracer
+
+
+def configure_tracing(trace_path: Optional[str] = None, profile_dir: Optional[str] = None,
+                      slow_threshold: float = 2.0) -> Tracer:
+    """Write spans to trace_path and/or flame-graph stacks of slow requests to profile_dir."""
+    tracer = Tracer(
+        exporter=JsonLinesSpanExporter(trace_path) if trace_path else None,
+        profiler=SlowRequestProfiler(profile_dir, slow_threshold) if profile_dir else None,
+    )
+    set_tracer(tracer)
+    return tracer
+
+
+def trace_span(name: str, **attributes):
+    return _TRACER.span(name, **attributes)
+
+
+def _in_current_context(fn: Callable) -> Callable:
+    """Bind fn to the caller's context so spans started in a worker thread keep their parent."""
+    return functools.partial(contextvars.copy_context().run, fn)
+
+# ============================================================
+# RATE LIMITING
+# ============================================================
+
+@dataclass
+class RateLimit:
+    """Per-engine request budget."""
+    rate: float = 5.0          # sustained requests per second
+    burst: int = 5             # requests allowed back to back
+    max_concurrent: int = 4    # upstream calls in flight at once
+    max_queue: int = 100       # callers allowed to wait ahead of a new one (same or higher priority)
+    max_wait: float = 10.0     # give up instead of waiting longer than this (seconds)
+    background_share: float = 0.5  # share of max_concurrent and burst batch/probe calls may use
+
+
+# Free endpoints that throttle aggressively get a smaller budget.
+DEFAULT_RATE_LIMITS = {
+    "google": RateLimit(rate=5.0, burst=10, max_concurrent=6),
+    "bing": RateLimit(rate=3.0, burst=5),
+    "alibaba": RateLimit(rate=3.0, burst=5),
+    "sogou": RateLimit(rate=2.0, burst=4),
+    "youdao": RateLimit(rate=2.0, burst=4),
+    "tencent": RateLimit(rate=2.0, burst=4),
+    "lingvanex": RateLimit(rate=2.0, burst=4),
+    "mymemory": RateLimit(rate=1.0, burst=3, max_concurrent=2),
+}
+
+# Priority classes of engine calls, most urgent first. Calls are interactive
+# unless made under another class (see call_priority and _fan_out(priority=)).
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BATCH = "batch"
+PRIORITY_PROBE = "probe"
+PRIORITY_CLASSES = (PRIORITY_INTERACTIVE, PRIORITY_BATCH, PRIORITY_PROBE)
+
+# (priority, client id) of the engine calls made in this context.
+_CALL_CLASS = contextvars.ContextVar("mt_call_class", default=(PRIORITY_INTERACTIVE, ""))
+
+
+@contextmanager
+def call_priority(priority: str, client_id: str = ""):
+    """Make the engine calls inside the block (and pools it fans out to) as (priority, client_id)."""
+    if priority not in PRIORITY_CLASSES:
+        raise ValueError(f"Unknown priority {priority!r}; use one of {', '.join(PRIORITY_CLASSES)}")
+    token = _CALL_CLASS.set((priority, client_id))
+    try:
+        yield
+    finally:
+        _CALL_CLASS.reset(token)
+
+
+def _in_call_class(fn: Callable, priority: str, client_id: str) -> Callable:
+    """Like _in_current_context, but with engine calls made as (priority, client_id)."""
+    context = contextvars.copy_context()
+    context.run(_CALL_CLASS.set, (priority, client_id))
+    return functools.partial(context.run, fn)
+
+
+class EngineLimiter:
+    """Token bucket plus concurrency quota, with a bounded priority wait queue.
+
+    This is where every upstream call of an engine is scheduled. Waiters are
+    served by priority class (PRIORITY_CLASSES order), so an interactive lookup
+    overtakes any batch or probe call still queued; within a class, clients take
+    turns (start-time fair queuing: a client's n-th queued call is served after
+    every other client's n-th), so one big job cannot push a second one back.
+    Background (batch/probe) calls are also capped at ``background_share`` of the
+    concurrency quota, and only take a token while more than the rest of the
+    burst is left, which keeps headroom for interactive calls at any time.
+    Calls already running are never interrupted. Batch calls wait as long as it
+    takes (also for room in a full queue) rather than being turned away, so
+    queue pressure slows a batch job down instead of leaving failed rows.
+
+    With a ProcessCoordinator set (set_coordinator), a caller that gets through
+    also takes a token from the engine's bucket shared with other processes;
+    priorities apply within each process.
+    """
+    
+    def __init__(self, limit: RateLimit, name: str = ""):
+        self.name = name
+        self.limit = limit
+        self.active = 0
+        self.background_active = 0
+        self.rejected = 0
+        self._tokens = float(limit.burst)
+        self._updated = time.monotonic()
+        self._queue: List[tuple] = []          # (class rank, fair tag, seq, priority), sorted
+        self._finish: Dict[tuple, float] = {}  # (class rank, client) -> tag of its last queued call
+        self._virtual = [0.0] * len(PRIORITY_CLASSES)  # per class: tag of the call served last
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+    
+    @property
+    def background_slots(self) -> int:
+        return max(1, int(self.limit.max_concurrent * self.limit.background_share))
+    
+    @property
+    def background_reserve(self) -> float:
+        """Tokens a background call must leave in the bucket for interactive ones."""
+        return float(self.limit.burst - max(1, int(self.limit.burst * self.limit.background_share)))
+    
+    def _refill(self, now: float):
+        self._tokens = min(float(self.limit.burst), self._tokens + (now - self._updated) * self.limit.rate)
+        self._updated = now
+    
+    def acquire(self, max_wait: Optional[float] = None, priority: str = PRIORITY_INTERACTIVE, client_id: str = "") -> bool:
+        """Wait for a token and a concurrency slot; False if that would take longer than max_wait.
+
+        max_wait defaults to the limit's max_wait, and to no limit at all for batch
+        calls. A caller whose estimated wait (its queue position at the sustained
+        rate) already exceeds the deadline is rejected immediately instead of
+        waiting for it to expire.
+        """
+        if max_wait is None:
+            max_wait = float("inf") if priority == PRIORITY_BATCH else self.limit.max_wait
+        deadline = time.monotonic() + max_wait
+        if not self._acquire_local(deadline, priority, client_id):
+            return False
+        coordinator = _COORDINATOR
+        while coordinator is not None:
+            wait = coordinator.take_token(self.name, self.limit)
+            if wait <= 0:
+                break
+            if time.monotonic() + wait > deadline:
+                self.release(priority)
+                with self._cond:
+                    self.rejected += 1
+                return False
+            time.sleep(wait)
+        return True
+    
+    def _enqueue(self, priority: str, client_id: str) -> tuple:
+        rank = PRIORITY_CLASSES.index(priority)
+        tag = max(self._virtual[rank], self._finish.get((rank, client_id), 0.0)) + 1.0
+        self._finish[(rank, client_id)] = tag
+        if len(self._finish) > 4096:  # forget clients with nothing queued
+            self._finish = {k: v for k, v in self._finish.items() if v > self._virtual[k[0]]}
+        ticket = (rank, tag, next(self._seq), priority)
+        bisect.insort(self._queue, ticket)
+        return ticket
+    
+    def _acquire_local(self, deadline: float, priority: str = PRIORITY_INTERACTIVE, client_id: str = "") -> bool:
+        background = priority != PRIORITY_INTERACTIVE
+        with self._cond:
+            # max_queue bounds the callers that would be served first, so queued batch
+            # calls never crowd out interactive ones. Batch calls wait for room;
+            # anyone else fails fast.
+            rank = PRIORITY_CLASSES.index(priority)
+            while sum(1 for waiting in self._queue if waiting[0] <= rank) >= self.limit.max_queue:
+                if priority != PRIORITY_BATCH or time.monotonic() >= deadline:
+                    self.rejected += 1
+                    return False
+                self._cond.wait(min(deadline - time.monotonic(), 1.0))
+            ticket = self._enqueue(priority, client_id)
+            reserve = self.background_reserve if background else 0.0
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if (self._queue[0] is ticket and self._tokens >= 1 + reserve
+                            and self.active < self.limit.max_concurrent
+                            and not (background and self.background_active >= self.background_slots)):
+                        self._tokens -= 1
+                        self.active += 1
+                        self.background_active += background
+                        self._virtual[ticket[0]] = ticket[1]
+                        return True
+                    position = self._queue.index(ticket)
+                    token_wait = max(0.0, position + 1 + reserve - self._tokens) / self.limit.rate
+                    if now + token_wait > deadline or now >= deadline:
+                        self.rejected += 1
+                        return False
+                    # Woken early by release() or by the caller ahead of us leaving the queue.
+                    self._cond.wait(min(deadline - now, max(token_wait, 0.005)))
+            finally:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+    
+    def release(self, priority: str = PRIORITY_INTERACTIVE):
+        with self._cond:
+            self.active -= 1
+            self.background_active -= priority != PRIORITY_INTERACTIVE
+            self._cond.notify_all()
+    
+    def queued(self) -> int:
+        with self._cond:
+            return len(self._queue)
+    
+    def queued_by_class(self) -> Dict[str, int]:
+        with self._cond:
+            counts = dict.fromkeys(PRIORITY_CLASSES, 0)
+            for ticket in self._queue:
+                counts[ticket[3]] += 1
+            return counts
+
+
+_LIMITERS: Dict[str, EngineLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(engine_name: str, limit: Optional[RateLimit] = None) -> EngineLimiter:
+    """Process-wide limiter for an engine, shared by every translator instance.
+
+    Passing ``limit`` replaces the engine's budget; otherwise the first call
+    creates the limiter from DEFAULT_RATE_LIMITS.
+    """
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(engine_name)
+        if limiter is None:
+            limiter = _LIMITERS[engine_name] = EngineLimiter(limit or DEFAULT_RATE_LIMITS.get(engine_name, RateLimit()), engine_name)
+        elif limit is not None:
+            with limiter._cond:
+                limiter.limit = limit
+                limiter._tokens = min(limiter._tokens, float(limit.burst))
+                limiter._cond.notify_all()
+        return limiter
+
+# ============================================================
+# MULTI-PROCESS COORDINATION
+# ============================================================
+
+class ProcessCoordinator:
+    """State shared by several processes on one machine through a SQLite file.
+
+    Used by the API workers (run.py --api --workers N) and any other process
+    pointed at the same file, so running more processes does not multiply
+    upstream traffic:
+
+    - Shared token buckets: each engine's RateLimit rate/burst is enforced
+      across all processes (EngineLimiter takes a shared token after its local one).
+    - Leases on in-flight calls: only one process calls upstream for a given
+      (engine, languages, term); the others wait for its result to appear in the
+      shared TranslationCache. A lease held by a crashed process expires after
+      ``lease_ttl`` seconds.
+
+    Concurrency quotas, circuit breakers and health stay per process.
+    """
+    
+    def __init__(self, path: str = "mt_coord.sqlite3", lease_ttl: float = 30.0):
+        self.path = path
+        self.lease_ttl = lease_ttl
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._claims = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS buckets (engine TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)")
+    
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+    
+    def take_token(self, engine: str, limit: RateLimit) -> float:
+        """Take one of the engine's shared tokens: 0.0 if taken, else the seconds until one is due."""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE engine=?", (engine,)).fetchone()
+            tokens = float(limit.burst) if row is None else min(float(limit.burst), row[0] + max(0.0, now - row[1]) * limit.rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / limit.rate
+            if wait == 0.0:
+                tokens -= 1
+            conn.execute("INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)", (engine, tokens, now))
+        return wait
+    
+    @staticmethod
+    def _lease_key(key: tuple) -> str:
+        return "\x1f".join(key)
+    
+    def claim(self, key: tuple) -> bool:
+        """Take the lease on an in-flight call unless another live process holds it."""
+        now = time.time()
+        with self._transaction() as conn:
+            self._claims += 1
+            if self._claims % 1000 == 0:
+                conn.execute("DELETE FROM leases WHERE expires < ?", (now,))
+            row = conn.execute("SELECT owner, expires FROM leases WHERE key=?", (self._lease_key(key),)).fetchone()
+            if row is not None and row[1] >= now and row[0] != self._owner:
+                return False
+            conn.execute("INSERT OR REPLACE INTO leases VALUES (?, ?, ?)", (self._lease_key(key), self._owner, now + self.lease_ttl))
+        return True
+    
+    def release(self, key: tuple):
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE key=? AND owner=?", (self._lease_key(key), self._owner))
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_COORDINATOR: Optional[ProcessCoordinator] = None
+
+
+def set_coordinator(coordinator: Optional[ProcessCoordinator]):
+    """Share rate limits and in-flight calls with other processes (None: this process only)."""
+    global _COORDINATOR
+    _COORDINATOR = coordinator
+
+
+def get_coordinator() -> Optional[ProcessCoordinator]:
+    return _COORDINATOR
+
+# ============================================================
+# CONNECTION & CLIENT POOLING
+# ============================================================
+
+# Timeout for the HTTP call made by the current thread's deep_translator client.
+_HTTP_TIMEOUT = threading.local()
+
+
+class PooledHTTP:
+    """Stand-in for the ``requests`` module inside deep_translator, reusing keep-alive connections.
+
+    deep_translator calls ``requests.get`` for every translation, which opens a
+    new connection (and TLS handshake) each time. Routing those calls through
+    one shared Session keeps connections alive between terms. The session is
+    recycled every ``max_age`` seconds, and the calling engine's timeout is
+    applied since deep_translator sets none.
+    """
+    
+    def __init__(self, pool_size: int = 32, max_age: float = 600.0):
+        self.pool_size = pool_size
+        self.max_age = max_age
+        self._session = None
+        self._created = 0.0
+        self._lock = threading.Lock()
+    
+    def session(self):
+        with self._lock:
+            if self._session is None or time.time() - self._created > self.max_age:
+                requests = importlib.import_module("requests")
+                old, self._session = self._session, requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=self.pool_size)
+                self._session.mount("https://", adapter)
+                self._session.mount("http://", adapter)
+                self._created = time.time()
+                if old is not None:
+                    old.close()
+            return self._session
+    
+    def request(self, method: str, url: str, **kwargs):
+        kwargs.setdefault("timeout", getattr(_HTTP_TIMEOUT, "value", None))
+        with trace_span("http.request", method=method, url=url.split("?")[0]) as span:
+            response = self.session().request(method, url, **kwargs)
+            span.set(status_code=response.status_code)
+            return response
+    
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+    
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+    
+    def __getattr__(self, name):
+        # Exceptions and anything else deep_translator looks up on `requests`.
+        return getattr(importlib.import_module("requests"), name)
+
+
+HTTP_POOL = PooledHTTP()
+
+
+def _install_pooled_http():
+    """Point deep_translator's engine modules at HTTP_POOL instead of bare ``requests``."""
+    for module_name in ("deep_translator.google", "deep_translator.mymemory"):
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            continue
+        if hasattr(module, "requests"):
+            module.requests = HTTP_POOL
+
+
+class ClientPool:
+    """Bounded, thread-safe pool of reusable translator clients keyed by (engine, source, target).
+
+    Clients keep per-call state, so each is leased to one caller at a time.
+    Returned clients are parked for reuse; those unused for ``idle_timeout``
+    seconds, or beyond ``max_idle`` parked clients, are dropped oldest first.
+    """
+    
+    def __init__(self, max_idle: int = 64, idle_timeout: float = 300.0):
+        self.max_idle = max(1, max_idle)
+        self.idle_timeout = idle_timeout
+        self.created = 0
+        self.reused = 0
+        self._idle: "OrderedDict[tuple, list]" = OrderedDict()  # key -> [(returned_at, client)]
+        self._idle_count = 0
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def lease(self, key: tuple, factory: Callable[[], object]):
+        client = self._checkout(key)
+        if client is None:
+            client = factory()
+            with self._lock:
+                self.created += 1
+        yield client
+        # Only reached when the call succeeded; a client that raised is discarded.
+        self._checkin(key, client)
+    
+    def _checkout(self, key: tuple):
+        with self._lock:
+            self._evict_idle(time.time())
+            clients = self._idle.get(key)
+            if not clients:
+                return None
+            _, client = clients.pop()
+            if not clients:
+                del self._idle[key]
+            self._idle_count -= 1
+            self.reused += 1
+            return client
+    
+    def _checkin(self, key: tuple, client):
+        with self._lock:
+            self._idle.setdefault(key, []).append((time.time(), client))
+            self._idle.move_to_end(key)
+            self._idle_count += 1
+            while self._idle_count > self.max_idle:
+                oldest_key = next(iter(self._idle))
+                clients = self._idle[oldest_key]
+                clients.pop(0)
+                self._idle_count -= 1
+                if not clients:
+                    del self._idle[oldest_key]
+    
+    def _evict_idle(self, now: float):
+        for key in list(self._idle):
+            clients = self._idle[key]
+            fresh = [entry for entry in clients if now - entry[0] <= self.idle_timeout]
+            self._idle_count -= len(clients) - len(fresh)
+            if fresh:
+                self._idle[key] = fresh
+            else:
+                del self._idle[key]
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {"idle": self._idle_count, "created": self.created, "reused": self.reused}
+
+# ============================================================
+# BATCH GLOSSARY
+# ============================================================
+
+GLOSSARY_FORMATS = ('.csv', '.tsv', '.txt', '.tbx')
+BATCH_OUTPUT_FORMATS = ('.csv', '.jsonl')
+
+
+def _xml_local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _read_tbx_terms(path: str, source_lang: str = 'auto') -> Iterator[str]:
+    """Stream the source term of each TBX entry without loading the whole file."""
+    lang_attr = '{http://www.w3.org/XML/1998/namespace}lang'
+    want = source_lang.lower() if source_lang != 'auto' else None
+    for _, elem in ET.iterparse(path, events=('end',)):
+        if _xml_local_name(elem.tag) not in ('termEntry', 'conceptEntry'):
+            continue
+        chosen = None
+        for lang_set in elem.iter():
+            if _xml_local_name(lang_set.tag) != 'langSet':
+                continue
+            lang = (lang_set.get(lang_attr) or lang_set.get('lang') or '').lower()
+            term = next((t.text for t in lang_set.iter() if _xml_local_name(t.tag) == 'term' and t.text), None)
+            if term is None:
+                continue
+            if want is None or lang == want or lang.split('-')[0] == want.split('-')[0]:
+                chosen = term
+                break
+        if chosen and chosen.strip():
+            yield chosen.strip()
+        elem.clear()
+
+
+def read_glossary(path: str, column=0, has_header: bool = False, source_lang: str = 'auto') -> Iterator[str]:
+    """Stream terms from a CSV, TSV, plain-text or TBX glossary.
+
+    Args:
+        path: Glossary file; the format is taken from the extension.
+        column: Column index, or header name (implies has_header), for CSV/TSV.
+        has_header: Skip the first CSV/TSV row.
+        source_lang: TBX only - pick the term from this language's langSet.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.tbx':
+        yield from _read_tbx_terms(path, source_lang)
+        return
+    
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f, delimiter='\t' if ext in ('.tsv', '.txt') else ',')
+        index = column
+        if isinstance(column, str):
+            header = next(reader, [])
+            if column not in header:
+                raise ValueError(f"Column '{column}' not found in {path} header")
+            index = header.index(column)
+        elif has_header:
+            next(reader, None)
+        for row in reader:
+            if len(row) > index and row[index].strip():
+                yield row[index].strip()
+
+
+@dataclass
+class BatchProgress:
+    """Progress snapshot of a running batch job."""
+    terms_done: int = 0
+    terms_skipped: int = 0
+    errors: int = 0
+    retry_pending: int = 0     # rows written with a transient failure; rerun the job to redo them
+    elapsed: float = 0.0
+    finished: bool = False
+    
+    @property
+    def terms_per_sec(self) -> float:
+        return self.terms_done / self.elapsed if self.elapsed > 0 else 0.0
+    
+    def describe(self) -> str:
+        state = "✅ Done 完成" if self.finished else "🔄 Running 執行中"
+        resumed = f", {self.terms_skipped} resumed" if self.terms_skipped else ""
+        retry = f", {self.retry_pending} to retry (rerun to resume 重新執行以續傳)" if self.retry_pending else ""
+        return (f"{state}: {self.terms_done} terms{resumed}, {self.errors} engine errors{retry}, "
+                f"{self.elapsed:.1f}s, {self.terms_per_sec:.1f} terms/s")
+
+
+# Failures that say nothing about the term (engine busy, down or unreachable).
+# A batch job retries them a few times, then stops its checkpoint before the
+# first row still holding one, so rerunning the job redoes that row. Any other
+# exception is taken as the engine's final answer for the term.
+TRANSIENT_ERRORS = ("rate_limited", "circuit_open", "timeout", "unavailable")
+BATCH_RETRIES = 3
+BATCH_RETRY_DELAY = 1.0  # seconds, doubled on every retry
+
+
+def _is_transient(result: TranslationResult) -> bool:
+    return not result.success and _error_class(result) in TRANSIENT_ERRORS
+
+
+class _BatchWriter:
+    """Append per-term rows to a CSV or JSONL file, tracking the byte offset written."""
+    
+    def __init__(self, path: str, engine_names: List[str], engines: dict, offset: Optional[int] = None):
+        self.ext = os.path.splitext(path)[1].lower()
+        if self.ext not in BATCH_OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format '{self.ext}' (use {', '.join(BATCH_OUTPUT_FORMATS)})")
+        self.engine_names = engine_names
+        if offset is None:
+            self.file = open(path, 'w', newline='', encoding='utf-8')
+            if self.ext == '.csv':
+                csv.writer(self.file).writerow(['term'] + [engines[name]["name"] for name in engine_names])
+        else:
+            # Drop anything written after the last checkpoint, then keep appending.
+            with open(path, 'r+b') as f:
+                f.truncate(offset)
+            self.file = open(path, 'a', newline='', encoding='utf-8')
+        self._csv = csv.writer(self.file) if self.ext == '.csv' else None
+    
+    def write(self, term: str, results: List[TranslationResult]):
+        if self._csv:
+            self._csv.writerow([term] + [r.translated_text if r.success else f"[error] {r.error_message}" for r in results])
+        else:
+            self.file.write(json.dumps({
+                "term": term,
+                "results": {
+                    name: {"translation": r.translated_text, "success": r.success, "error": r.error_message,
+                           "time": round(r.translation_time, 3), "cached": r.cached}
+                    for name, r in zip(self.engine_names, results)
+                },
+            }, ensure_ascii=False) + '\n')
+    
+    def offset(self) -> int:
+        self.file.flush()
+        return self.file.tell()
+    
+    def close(self):
+        self.file.close()
+
+
+def _load_checkpoint(path: str, signature: dict) -> Optional[dict]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if checkpoint.get("job") != signature:
+        raise ValueError(f"Checkpoint {path} belongs to a different batch job; remove it to start over")
+    return checkpoint
+
+
+def _save_checkpoint(path: str, signature: dict, rows_done: int, offset: int):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({"job": signature, "rows_done": rows_done, "output_bytes": offset}, f)
+    os.replace(tmp, path)
+
+# ============================================================
+# TERM PACKING
+# ============================================================
+
+# Max characters per packed request. Engines missing here are always called one
+# term at a time. Limits stay well under each endpoint's own cap, since the
+# numbering adds a few characters per term.
+PACKING_LIMITS = {
+    "google": 4000,
+    "bing": 900,
+    "alibaba": 900,
+    "sogou": 900,
+    "youdao": 900,
+    "tencent": 900,
+    "lingvanex": 900,
+    "mymemory": 450,
+}
+
+# "3. term" — engines translate the term and keep the number; some turn the
+# period into a full-width or CJK mark.
+_PACKED_LINE_RE = re.compile(r'^\s*(\d+)\s*[.．。、)）:：]\s*(.*?)\s*$')
+
+
+def pack_terms(terms: List[str], max_chars: int) -> Iterator[List[int]]:
+    """Group term indices into chunks whose numbered text stays within max_chars."""
+    chunk, size = [], 0
+    for i, term in enumerate(terms):
+        line = len(term) + len(str(len(chunk) + 1)) + 3  # "N. " + newline
+        if chunk and size + line > max_chars:
+            yield chunk
+            chunk, size = [], 0
+            line = len(term) + 4
+        chunk.append(i)
+        size += line
+    if chunk:
+        yield chunk
+
+
+def format_packed(terms: List[str]) -> str:
+    return "\n".join(f"{i}. {term}" for i, term in enumerate(terms, 1))
+
+
+def split_packed(text: str, count: int) -> List[Optional[str]]:
+    """Split an engine's answer to format_packed() back into one translation per term.
+
+    A term whose numbered line is missing, duplicated or empty comes back as None
+    so the caller can retry it on its own.
+    """
+    lines: Dict[int, Optional[str]] = {}
+    for line in text.splitlines():
+        match = _PACKED_LINE_RE.match(line)
+        if not match:
+            continue
+        number = int(match.group(1))
+        if 1 <= number <= count:
+            lines[number] = None if number in lines else (match.group(2) or None)
+    return [lines.get(i) for i in range(1, count + 1)]
+
+
+# ============================================================
+# DOCUMENT MODE
+# ============================================================
+
+# Longer text is split into sentences and each sentence is translated on its
+# own (see MultiMTTranslator.translate_document_streaming). A sentence longer
+# than the smallest limit among the selected engines (PACKING_LIMITS, else
+# DEFAULT_SEGMENT_LIMIT) is cut at clause marks, and as a last resort at spaces.
+DEFAULT_SEGMENT_LIMIT = 900
+
+_CLOSERS = "」』”’\"')）】》\\]"
+# A sentence ends at CJK 。！？；… anywhere, at western .!? only before a space,
+# closer or the end of the text, and at every line break. Closing quotes and
+# brackets stay with their sentence; the whitespace after it is the separator.
+_SENTENCE_END_RE = re.compile(
+    rf"(?:[。！？；…]+|(?<=\S)[.!?]+(?=[\s{_CLOSERS}]|$))[{_CLOSERS}]*\s*|\n\s*"
+)
+_CLAUSE_RE = re.compile(r"[^，、：；,:;]*(?:[，、：；,:;]+\s*|$)")
+# "e.g. this", "Dr. Wu", "J. Smith" are not sentence ends.
+_ABBREVIATIONS = {"e.g", "i.e", "etc", "vs", "cf", "mr", "mrs", "ms", "dr", "prof", "st", "no", "fig", "inc", "ltd", "co"}
+_LAST_WORD_RE = re.compile(r"([\w.]+)\.$")
+
+# Targets written without spaces between sentences.
+_UNSPACED_TARGETS = ("zh-TW", "zh-CN", "ja")
+
+
+def split_sentences(text: str) -> List[Tuple[str, str]]:
+    """Split text into (sentence, separator) pairs; joining them gives back the text."""
+    pairs, start = [], 0
+    for match in _SENTENCE_END_RE.finditer(text):
+        body_end = match.start() + len(match.group().rstrip())
+        if body_end <= start:
+            if pairs:  # blank lines belong to the previous separator
+                pairs[-1] = (pairs[-1][0], pairs[-1][1] + text[start:match.end()])
+            start = match.end()
+            continue
+        word = _LAST_WORD_RE.search(text[start:body_end])
+        if word and "\n" not in match.group() and body_end < len(text.rstrip()) and (
+                word.group(1).casefold() in _ABBREVIATIONS or len(word.group(1)) == 1):
+            continue
+        pairs.append((text[start:body_end], text[body_end:match.end()]))
+        start = match.end()
+    if text[start:].strip():
+        pairs.append((text[start:].rstrip(), text[len(text.rstrip()):]))
+    return pairs
+
+
+def _split_long(sentence: str, max_chars: int) -> List[Tuple[str, str]]:
+    """Cut a sentence into pieces of at most max_chars, at clause marks where possible."""
+    pieces: List[Tuple[str, str]] = []
+    current, current_sep = "", ""
+    for part in _CLAUSE_RE.findall(sentence):
+        stripped = part.rstrip()
+        if not stripped:
+            continue
+        if current and len(current) + len(current_sep) + len(stripped) > max_chars:
+            pieces.append((current, current_sep))
+            current = ""
+        current = current + current_sep + stripped if current else stripped
+        current_sep = part[len(stripped):]
+        while len(current) > max_chars:
+            cut = current.rfind(" ", max_chars // 2, max_chars + 1)
+            if cut <= 0:
+                cut = max_chars
+            rest = current[cut:].lstrip()
+            pieces.append((current[:cut].rstrip(), current[cut:len(current) - len(rest)]))
+            current = rest
+    if current:
+        pieces.append((current, current_sep))
+    return pieces
+
+
+def segment_text(text: str, max_chars: int = DEFAULT_SEGMENT_LIMIT) -> List[Tuple[str, str]]:
+    """Sentences of text as (segment, separator) pairs, each segment at most max_chars long."""
+    segments = []
+    for sentence, separator in split_sentences(text):
+        if len(sentence) <= max_chars:
+            segments.append((sentence, separator))
+        else:
+            pieces = _split_long(sentence, max_chars)
+            pieces[-1] = (pieces[-1][0], separator)
+            segments.extend(pieces)
+    return segments
+
+
+def join_segments(parts: List[str], separators: List[str], target: str) -> str:
+    """Reassemble translated segments, keeping line breaks and spacing the target's way."""
+    out = []
+    for part, separator in zip(parts, separators):
+        out.append(part)
+        if "\n" in separator:
+            out.append(separator)
+        elif target not in _UNSPACED_TARGETS:
+            out.append(" ")
+    return "".join(out).rstrip()
+
+
+# ---------- term candidates ----------
+
+_CJK_RUN_RE = re.compile(_char_class(SCRIPT_RANGES['han'] + SCRIPT_RANGES['kana']) + "+")
+_WORD_RE = re.compile(r"[^\W\d_]+(?:[-'][^\W\d_]+)*")
+_PHRASE_BREAK_RE = re.compile(r"[^\w\s'-]+|\n")
+_STOPWORDS = frozenset("""
+a about after all also an and any are as at be been before both but by can could do does for from has have
+he her his how i if in into is it its may more most must no not of on only or other our over per she should
+so such than that the their them then there these they this those through to under up us via was we were
+what when where which while who will with would you your
+""".split())
+
+
+def extract_term_candidates(text: str, max_terms: int = 15, min_count: int = 2,
+                            max_words: int = 4, max_chars: int = 6) -> List[Tuple[str, int]]:
+    """Recurring n-grams of text that look like terms, as (term, count), best first.
+
+    Han/kana runs give character n-grams of 2..max_chars; other scripts give word
+    n-grams of 1..max_words that neither start nor end with a stopword. Phrases
+    never cross punctuation. An n-gram that only ever occurs inside a longer
+    candidate (same count) is dropped in favour of the longer one, so
+    "資訊安全" wins over "資訊" unless "資訊" also appears on its own. Candidates
+    are ranked by count × length in characters or words.
+    """
+    counts: Dict[tuple, int] = {}
+    surface: Dict[tuple, str] = {}
+    first_seen: Dict[tuple, int] = {}
+    
+    def add(key: tuple, form: str):
+        counts[key] = counts.get(key, 0) + 1
+        if key not in surface:
+            surface[key], first_seen[key] = form, len(first_seen)
+    
+    for phrase in _PHRASE_BREAK_RE.split(text):
+        for run in _CJK_RUN_RE.findall(phrase):
+            for n in range(2, min(max_chars, len(run)) + 1):
+                for i in range(len(run) - n + 1):
+                    add(("c",) + tuple(run[i:i + n]), run[i:i + n])
+        words = _WORD_RE.findall(_CJK_RUN_RE.sub(" ", phrase))
+        folded = [w.casefold() for w in words]
+        for n in range(1, max_words + 1):
+            for i in range(len(words) - n + 1):
+                gram = folded[i:i + n]
+                if gram[0] in _STOPWORDS or gram[-1] in _STOPWORDS or (n == 1 and len(gram[0]) < 3):
+                    continue
+                add(("w",) + tuple(gram), " ".join(words[i:i + n]))
+    
+    candidates = {key for key, count in counts.items() if count >= min_count}
+    subsumed = set()
+    for key in candidates:
+        units = key[1:]
+        for n in range(1, len(units)):
+            for i in range(len(units) - n + 1):
+                sub = key[:1] + units[i:i + n]
+                if sub in candidates and counts[sub] <= counts[key]:
+                    subsumed.add(sub)
+    ranked = sorted(candidates - subsumed, key=lambda k: (-counts[k] * (len(k) - 1), first_seen[k]))
+    return [(surface[key], counts[key]) for key in ranked[:max_terms]]
+
+
+@dataclass
+class DocumentTranslation:
+    """A document-mode run; translate_document_streaming updates it between frames."""
+    text: str
+    source_lang: str                                   # resolved, never 'auto'
+    target_lang: str
+    segments: List[Tuple[str, str]]                    # (segment, separator), see segment_text
+    results: List[TranslationResult]                   # one reassembled document per engine
+    parts: List[List[Optional[TranslationResult]]]     # per engine, per segment
+    terms: List[Tuple[str, int]] = field(default_factory=list)
+    term_results: List[Optional[List[TranslationResult]]] = field(default_factory=list)  # per engine, per term
     
-    total = len(text)
-    if total == 0:
-        return 'en'
-    if japanese_chars > 0:
-        return 'ja'
-    if korean_chars / total > 0.1:
-        return 'ko'
-    if chinese_chars / total > 0.1:
-        return 'zh-CN'
-    return 'en'
-
-
-def create_status_html(results: List[TranslationResult], current_engine: str = "") -> str:
-    """Create HTML showing translation progress."""
-    html = """
-    <style>
-        .mt-container { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; }
-        .mt-header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 15px 20px; border-radius: 10px 10px 0 0; margin-bottom: 0; }
-        .mt-header h3 { margin: 0; font-size: 18px; }
-        .mt-item { border: 1px solid #e0e0e0; border-top: none; padding: 15px 20px; background: white; transition: all 0.3s ease; }
-        .mt-item:last-child { border-radius: 0 0 10px 10px; }
-        .mt-item:hover { background: #f8f9fa; }
-        .mt-item.running { background: #fff8e1; border-left: 4px solid #ffc107; animation: pulse 1.5s infinite; }
-        .mt-item.success { background: #e8f5e9; border-left: 4px solid #4caf50; }
-        .mt-item.error { background: #ffebee; border-left: 4px solid #f44336; }
-        .mt-item.pending { background: #fafafa; border-left: 4px solid #9e9e9e; opacity: 0.7; }
-        .engine-name { font-weight: 600; font-size: 15px; color: #333; display: flex; align-items: center; gap: 8px; }
-        .engine-zh { color: #666; font-weight: normal; font-size: 13px; }
-        .translation { margin-top: 10px; font-size: 15px; color: #1a1a1a; line-height: 1.6; padding: 10px; background: #f5f5f5; border-radius: 6px; }
-        .translation.empty { color: #999; font-style: italic; }
-        .meta { margin-top: 8px; font-size: 12px; color: #888; display: flex; gap: 15px; }
-        .status-icon { font-size: 18px; }
-        .spinner { display: inline-block; width: 18px; height: 18px; border: 2px solid #ffc107; border-radius: 50%; border-top-color: transparent; animation: spin 1s linear infinite; }
-        @keyframes spin { to { transform: rotate(360deg); } }
-        @keyframes pulse { 0%, 100% { opacity: 1; } 50% { opacity: 0.7; } }
-        .loading-banner { background: linear-gradient(90deg, #667eea, #764ba2, #667eea); background-size: 200% 100%; animation: shimmer 2s infinite; color: white; padding: 15px 20px; border-radius: 10px; margin-bottom: 15px; text-align: center; font-size: 16px; }
-        @keyframes shimmer { 0% { background-position: 200% 0; } 100% { background-position: -200% 0; } }
-        .progress-text { font-size: 14px; margin-top: 5px; opacity: 0.9; }
-    </style>
-    """
+    def to_dict(self) -> dict:
+        engines = {}
+        for e, result in enumerate(self.results):
+            terms = self.term_results[e] if e < len(self.term_results) else None
+            engines[result.engine] = {
+                "translation": result.translated_text, "success": result.success, "status": result.status,
+                "error": result.error_message, "time": round(result.translation_time, 2),
+                "segments": [p.translated_text if p is not None and p.success else None for p in self.parts[e]],
+                "terms": {t.source_text: (t.translated_text if t.success else None) for t in terms or []},
+            }
+        return {
+            "source": self.source_lang, "target": self.target_lang,
+            "segments": [segment for segment, _ in self.segments],
+            "terms": [{"term": term, "count": count} for term, count in self.terms],
+            "engines": engines,
+        }
+
+
+class DocumentRenderer(StatusRenderer):
+    """StatusRenderer for document mode: one card per engine, under ids of its own."""
     
-    completed = sum(1 for r in results if r.status in ['success', 'error'])
-    total = len(results)
-    success_count = sum(1 for r in results if r.status == 'success')
+    banner_id = "doc-banner"
     
-    if current_engine:
-        html += f"""
-        <div class="loading-banner">
-            <div>🔄 <strong>Translating Term... 術語翻譯中...</strong></div>
-            <div class="progress-text">Processing: {current_engine} ({completed}/{total} completed)</div>
-        </div>
-        """
-    elif completed > 0 and completed == total:
-        html += f"""
-        <div style="background: #4caf50; color: white; padding: 12px 20px; border-radius: 10px; margin-bottom: 15px; text-align: center;">
-            ✅ <strong>Complete! 完成!</strong> {success_count}/{total} engines successful
-        </div>
-        """
+    def _page(self, results: List[TranslationResult], current_engine: str) -> str:
+        html = f'<div id="doc-banner">{self._banner_html(results, current_engine)}</div>'
+        html += '<div class="mt-container">'
+        html += '<div class="mt-header"><h3>📄 Document Translation Results 文件翻譯結果</h3></div>'
+        for row_id, result in self._items(results):
+            html += self._render_item(result, row_id)
+        return html + '</div>'
     
-    html += '<div class="mt-container">'
-    html += '<div class="mt-header"><h3>📊 Term Translation Results 術語翻譯結果</h3></div>'
-    
-    for result in results:
-        status_class = result.status
-        if result.status == 'running':
-            status_icon = '<span class="spinner"></span>'
-        elif result.status == 'success':
-            status_icon = '<span class="status-icon">✅</span>'
-        elif result.status == 'error':
-            status_icon = '<span class="status-icon">❌</span>'
-        else:
-            status_icon = '<span class="status-icon">⏳</span>'
-        
-        html += f'<div class="mt-item {status_class}">'
-        html += f'<div class="engine-name">{status_icon} {result.engine} <span class="engine-zh">({result.engine_zh})</span></div>'
-        
-        if result.status == 'running':
-            html += '<div class="translation empty">⏳ Translating... 翻譯中...</div>'
-        elif result.status == 'success':
-            html += f'<div class="translation">{result.translated_text}</div>'
-            html += f'<div class="meta"><span>⏱️ {result.translation_time:.2f}s</span></div>'
-        elif result.status == 'error':
-            error_msg = result.error_message if result.error_message else "Service unavailable 服務暫時無法使用"
-            html += f'<div class="translation empty">⚠️ {error_msg}</div>'
-        else:
-            html += '<div class="translation empty">Waiting... 等待中...</div>'
-        
-        html += '</div>'
+    def _items(self, results: List[TranslationResult]) -> Iterator[Tuple[str, TranslationResult]]:
+        return ((f"doc-row-{i}", result) for i, result in enumerate(results))
     
-    html += '</div>'
+    def _render_item(self, result: TranslationResult, item_id: str) -> str:
+        return _render_row(replace(result, translated_text=result.translated_text.replace("\n", "<br>")), item_id)
+
+
+def create_terms_html(doc: DocumentTranslation, include_css: bool = True) -> str:
+    """Term candidates × engines table for a document run."""
+    if not doc.terms:
+        return "<p>No recurring terms found 未找到重複出現的術語</p>"
+    html = f"<style>{STATUS_CSS}{MATRIX_CSS}</style>" if include_css else ""
+    html += '<table class="mx-table"><tr><th>Term 術語</th>'
+    for r in doc.results:
+        html += f'<th>{r.engine} <span class="engine-zh">{r.engine_zh}</span></th>'
+    html += '</tr>'
+    for t, (term, count) in enumerate(doc.terms):
+        html += f'<tr><td class="mx-lang">{term} <span class="meta">×{count}</span></td>'
+        for e, r in enumerate(doc.results):
+            terms = doc.term_results[e] if e < len(doc.term_results) else None
+            cell = terms[t] if terms else replace(r, status="pending", translated_text="", error_message="")
+            html += _render_cell(cell, f"tm-cell-{t}-{e}")
+        html += '</tr>'
+    html += '</table>'
     return html
 
+
+# ============================================================
+# QUORUM MODE
+# ============================================================
+
+# Quick lookups can stop once enough engines agree (or a deadline passes);
+# see MultiMTTranslator.translate_results_streaming(quorum=, deadline=).
+
+QUORUM_NOTE = "🤝 agreed 共識"
+CUT_OFF_PREFIX = "cut off: "
+
+
+def _agreement_key(text: str) -> str:
+    """Two translations agree if they match ignoring case, spacing and trailing punctuation."""
+    return normalize_term(text).casefold().rstrip(".。!！?？,，;；:：")
+
+
+def quorum_report(results: List[TranslationResult]) -> dict:
+    """Which engines agreed on which translation, and which were cut off (and why)."""
+    agreed = [r for r in results if r.success and QUORUM_NOTE in r.note]
+    cut_off = [r for r in results if r.status == "skipped" and r.error_message.startswith(CUT_OFF_PREFIX)]
+    return {
+        "translation": agreed[0].translated_text if agreed else "",
+        "agreed": [r.engine for r in agreed],
+        "cut_off": [r.engine for r in cut_off],
+        "reason": cut_off[0].error_message[len(CUT_OFF_PREFIX):] if cut_off else "",
+    }
+
 # ============================================================
 # MAIN TRANSLATOR CLASS
 # ============================================================
@@ -205,50 +2519,166 @@ def create_status_html(results: List[TranslationResult], current_engine: str = "
 class MultiMTTranslator:
     """Multi-engine Machine Translation for Term Comparison."""
     
-    def __init__(self, verbose: bool = True):
+    def __init__(self, verbose: bool = True, max_workers: int = 16, request_concurrency: int = 8,
+                 engine_concurrency: int = 4, cache: Optional[TranslationCache] = None,
+                 coalesce: bool = True, recent_size: int = 1024, recent_ttl: float = 30.0,
+                 failure_threshold: int = 5, breaker_cooldown: float = 30.0, max_timeout: float = 15.0,
+                 rate_limits: Optional[Dict[str, RateLimit]] = None,
+                 client_pool_size: int = 64, client_idle_timeout: float = 300.0, session_max_age: float = 600.0,
+                 builtin_engines: bool = True, term_memory=None, term_memory_min_score: float = 0.6,
+                 background_workers: Optional[int] = None):
+        """
+        Args:
+            verbose: Print engine initialization progress.
+            max_workers: Size of the worker pool shared by every request.
+            request_concurrency: Max engines a single request runs at once.
+            engine_concurrency: Max in-flight async calls per engine (async API only).
+            cache: Optional persistent cache consulted before calling an engine.
+            coalesce: Let concurrent identical requests share one upstream call.
+            recent_size: Entries kept in the in-memory recent-results LRU (0 disables it).
+            recent_ttl: Seconds a recent result is served from memory.
+            failure_threshold: Consecutive failures that open an engine's circuit breaker.
+            breaker_cooldown: Seconds an open breaker fast-fails before probing again.
+            max_timeout: Upper bound for the adaptive per-engine upstream timeout.
+            rate_limits: Per-engine budgets overriding DEFAULT_RATE_LIMITS. Limiters are
+                process-wide, so these apply to every translator in the process.
+            client_pool_size: Idle deep_translator clients kept for reuse across requests.
+            client_idle_timeout: Seconds an unused pooled client is kept.
+            session_max_age: Seconds before the `translators` engines open a fresh HTTP session.
+            builtin_engines: Register the engines from ENGINE_DESCRIPTORS. Turn off to use
+                only engines added with register_engine (e.g. local stubs for benchmarks).
+            term_memory: Optional term_memory.TermMemory of approved translations, listed
+                first as the "Term Memory" engine.
+            term_memory_min_score: Lowest fuzzy similarity (0-1) reported from the term memory.
+            background_workers: Size of the separate pool for batch work (default: half of
+                max_workers), so batch jobs cannot occupy the interactive pool.
+        """
         self.engines = {}
         self.verbose = verbose
-        self._init_engines()
+        self.cache = cache
+        self.coalesce = coalesce
+        self._inflight = SingleFlight()
+        self._recent = RecentResults(recent_size, recent_ttl) if recent_size > 0 else None
+        self.max_workers = max(1, max_workers)
+        self.request_concurrency = max(1, request_concurrency)
+        self.engine_concurrency = max(1, engine_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="mt-engine")
+        self.background_workers = max(1, background_workers or self.max_workers // 2)
+        self._background_executor = ThreadPoolExecutor(max_workers=self.background_workers, thread_name_prefix="mt-batch")
+        self.failure_threshold = failure_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.max_timeout = max_timeout
+        self._health: Dict[str, EngineHealth] = {}
+        self._health_lock = threading.Lock()
+        # deep_translator calls run here so callers stop waiting at the deadline even if the
+        # HTTP timeout applied through HTTP_POOL does not cover the whole call.
+        self._deadline_executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="mt-deadline")
+        # asyncio primitives belong to one event loop, so semaphores are kept per loop.
+        self._async_semaphores = weakref.WeakKeyDictionary()
+        self._clients = ClientPool(client_pool_size, client_idle_timeout)
+        self.session_max_age = session_max_age
+        self.metrics = TranslatorMetrics()
+        self.prober: Optional[EngineProber] = None
+        for engine_name, limit in (rate_limits or {}).items():
+            get_rate_limiter(engine_name, limit)
+        if builtin_engines:
+            self._init_engines()
+        self.term_memory = term_memory
+        self.term_memory_min_score = term_memory_min_score
+        if term_memory is not None:
+            self.engines["term_memory"] = {"name": "Term Memory", "name_zh": "術語庫", "type": "term_memory", "priority": 0}
     
     def _init_engines(self):
-        """Initialize available translation engines."""
+        """Register available translation engines from ENGINE_DESCRIPTORS.
+
+        Only package availability is checked here; each backend is imported the
+        first time one of its engines is used (or by warm_up).
+        """
         if self.verbose:
             print("\n🔍 Initializing translation engines...")
         
-        if DEEP_TRANSLATOR_AVAILABLE:
-            self.engines["google"] = {
-                "name": "Google Translate", "name_zh": "谷歌翻譯",
-                "type": "deep_translator", "class": GoogleTranslator, "priority": 1
-            }
-            self.engines["mymemory"] = {
-                "name": "MyMemory", "name_zh": "MyMemory 翻譯記憶庫",
-                "type": "deep_translator", "class": MyMemoryTranslator, "priority": 8
-            }
-            if self.verbose:
-                print("   ✅ Google Translate, MyMemory")
-        
-        if TRANSLATORS_AVAILABLE:
-            engines_config = [
-                ("bing", "Microsoft Bing", "微軟必應翻譯", "bing", 2),
-                ("alibaba", "Alibaba Translate", "阿里翻譯", "alibaba", 3),
-                ("sogou", "Sogou Translate", "搜狗翻譯", "sogou", 4),
-                ("youdao", "Youdao Translate", "有道翻譯", "youdao", 5),
-                ("tencent", "Tencent Translate", "騰訊翻譯", "qqTranSmart", 6),
-                ("lingvanex", "Lingvanex", "Lingvanex 翻譯", "lingvanex", 7),
-            ]
-            for key, name, name_zh, engine_name, priority in engines_config:
-                self.engines[key] = {
-                    "name": name, "name_zh": name_zh,
-                    "type": "translators", "engine_name": engine_name, "priority": priority
-                }
-            if self.verbose:
-                print("   ✅ Bing, Alibaba, Sogou, Youdao, Tencent, Lingvanex")
+        available = {"deep_translator": DEEP_TRANSLATOR_AVAILABLE, "translators": TRANSLATORS_AVAILABLE}
+        registered = {}
+        for key, name, name_zh, backend, backend_id, priority in ENGINE_DESCRIPTORS:
+            if not available[backend]:
+                continue
+            engine_info = {"name": name, "name_zh": name_zh, "type": backend, "priority": priority}
+            engine_info["class_name" if backend == "deep_translator" else "engine_name"] = backend_id
+            self.engines[key] = engine_info
+            registered.setdefault(backend, []).append(name)
         
         if self.verbose:
+            for names in registered.values():
+                print(f"   ✅ {', '.join(names)}")
             print(f"\n📊 Total engines available: {len(self.engines)}")
     
+    def register_engine(self, key: str, name: str, name_zh: str, function: Callable[[str, str, str, float], str],
+                        priority: int = 100):
+        """Add an engine backed by a plain function.
+
+        function(text, source, target, timeout) returns the translation (an empty
+        string counts as a failure) or raises. Calls get the same caching, rate
+        limiting, circuit breaking and deadline as the built-in engines.
+        """
+        self.engines[key] = {"name": name, "name_zh": name_zh, "type": "custom", "priority": priority, "function": function}
+    
+    def warm_up(self, background: bool = True) -> Optional[threading.Thread]:
+        """Import the backends of the registered engines ahead of the first request."""
+        backends = {info["type"] for info in self.engines.values()} & {"deep_translator", "translators"}
+        
+        def load_all():
+            for backend in sorted(backends):
+                try:
+                    load_backend(backend)
+                except Exception as e:
+                    if self.verbose:
+                        print(f"   ⚠️ Could not load {backend}: {e}")
+        
+        if not background:
+            load_all()
+            return None
+        thread = threading.Thread(target=load_all, name="mt-warm-up", daemon=True)
+        thread.start()
+        return thread
+    
     def get_available_engines(self) -> List[str]:
-        return sorted(self.engines.keys(), key=lambda x: self.engines[x].get('priority', 99))
+        """Engine keys, best first: local, then measured engines by expected latency, then
+        engines without data, then engines that are down; ties keep the static priority."""
+        return sorted(self.engines.keys(), key=self._engine_rank)
+    
+    def _engine_rank(self, engine_name: str) -> tuple:
+        info = self.engines[engine_name]
+        priority = info.get('priority', 99)
+        if info.get("type") == "term_memory":
+            return (0, 0, 0.0, priority)
+        health = self.engine_health(engine_name).snapshot()
+        if self.engine_down(engine_name, health):
+            return (3, 0, 0.0, priority)
+        if health["p50"] is None:
+            return (2, 1 if health["samples"] else 0, 0.0, priority)
+        # Time to a usable answer: median latency inflated by the recent error rate.
+        return (1, 0, round(health["p50"] / max(0.1, 1 - health["error_rate"]), 1), priority)
+    
+    def engine_down(self, engine_name: str, snapshot: Optional[dict] = None) -> bool:
+        """Whether an engine is failing now: its breaker is open, or its last probe
+        failed and no call has succeeded since."""
+        snapshot = snapshot or self.engine_health(engine_name).snapshot()
+        if snapshot["state"] != EngineHealth.CLOSED:
+            return True
+        probe = self.prober.results.get(engine_name) if self.prober else None
+        return bool(probe and not probe["ok"] and snapshot["consecutive_failures"] > 0)
+    
+    def default_engines(self, count: int = 6) -> List[str]:
+        """The count best-ranked MT engines that are not down (default UI selection)."""
+        return [name for name in self.get_available_engines()
+                if self.engines[name].get("type") != "term_memory" and not self.engine_down(name)][:count]
+    
+    def start_probing(self, interval: float = 300.0, budget: int = 4,
+                      canary: Tuple[str, str, str] = PROBE_CANARY) -> EngineProber:
+        """Start a background EngineProber (once) so engine order and health stay current without traffic."""
+        if self.prober is None:
+            self.prober = EngineProber(self, interval, budget, canary).start()
+        return self.prober
     
     def _translate_single(self, text: str, source: str, target: str, engine_name: str) -> TranslationResult:
         if engine_name not in self.engines:
@@ -257,55 +2687,318 @@ class MultiMTTranslator:
                 target_lang=target, source_text=text, translated_text="",
                 success=False, error_message="Engine not found", status="error"
             )
+        if self.engines[engine_name]["type"] == "term_memory":
+            return self._lookup_term_memory(text, source, target, self.engines[engine_name])
         
-        engine_info = self.engines[engine_name]
+        with trace_span("mt.translate_single", engine=engine_name, source=source, target=target, chars=len(text)) as span:
+            key, hit = self._lookup(text, source, target, engine_name)
+            if hit is not None:
+                span.set(cached=True, success=hit.success)
+                return hit
+            
+            result, shared = self._translate_missed(key, text, source, target, engine_name)
+            span.set(cached=False, coalesced=shared, success=result.success, status=result.status)
+            return result
+    
+    def _translate_missed(self, key: tuple, text: str, source: str, target: str,
+                          engine_name: str) -> Tuple[TranslationResult, bool]:
+        """Fetch a term whose cache lookup already missed; returns (result, shared with a call in flight)."""
+        fetch = functools.partial(self._fetch, key, text, source, target, engine_name)
+        if not self.coalesce:
+            return fetch(), False
+        result, shared = self._inflight.do(key, fetch)
+        if shared:
+            self.metrics.record_lookup(engine_name, "coalesced")
+            # Waiters get their own copy so callers can't mutate each other's result.
+            result = replace(result, source_text=text)
+        return result, shared
+    
+    def _lookup_term_memory(self, text: str, source: str, target: str, engine_info: dict) -> TranslationResult:
+        """Answer from the local term memory: the best exact or fuzzy match, never an engine call."""
+        start_time = time.time()
+        with trace_span("term_memory.lookup"):
+            matches = self.term_memory.lookup(text, source, target, limit=3, min_score=self.term_memory_min_score)
+        result = TranslationResult(
+            engine=engine_info["name"], engine_zh=engine_info["name_zh"], source_lang=source,
+            target_lang=target, source_text=text, translated_text="", success=False, status="error",
+            error_message="No match in term memory 術語庫中無匹配"
+        )
+        if matches:
+            best = matches[0]
+            note = "exact match 完全匹配" if best.exact else f"fuzzy {best.score:.0%} ≈ {best.source}"
+            others = [f"{m.target} ({m.score:.0%})" for m in matches[1:]]
+            if others:
+                note += " · also 其他: " + ", ".join(others)
+            result = replace(result, translated_text=best.target, success=True, status="success",
+                             error_message="", note=note)
+        result.translation_time = time.time() - start_time
+        return result
+    
+    def _lookup(self, text: str, source: str, target: str, engine_name: str) -> Tuple[tuple, Optional[TranslationResult]]:
+        """Return the cache key for a call and the cached result, if any."""
         start_time = time.time()
+        with trace_span("detect_language"):
+            resolved_source = detect_language_simple(text) if source == 'auto' else source
+        key = (engine_name, resolved_source, target, normalize_term(text))
+        
+        with trace_span("cache.lookup") as span:
+            hit = self._recent.get(key) if self._recent else None
+            where = "recent"
+            if hit is None and self.cache is not None:
+                hit, where = self.cache.get(*key), "disk"
+            span.set(result=where if hit is not None else "miss")
+        if hit is None:
+            self.metrics.record_lookup(engine_name, "miss")
+            return key, None
+        self.metrics.record_lookup(engine_name, where)
+        return key, self._cached_result(hit, text, source, target, engine_name, start_time)
+    
+    def _cached_result(self, hit: dict, text: str, source: str, target: str, engine_name: str,
+                       start_time: float) -> TranslationResult:
+        engine_info = self.engines[engine_name]
+        return TranslationResult(
+            engine=engine_info["name"], engine_zh=engine_info["name_zh"],
+            source_lang=source, target_lang=target, source_text=text,
+            translated_text=hit["translated_text"], success=hit["success"],
+            error_message=hit["error_message"], translation_time=time.time() - start_time,
+            status="success" if hit["success"] else "error", cached=True
+        )
+    
+    def _fetch(self, key: tuple, text: str, source: str, target: str, engine_name: str) -> TranslationResult:
+        """Call the engine and remember the result in the recent and persistent caches.
+
+        With a ProcessCoordinator and a cache, a call another process already has in
+        flight is not repeated: this waits for its result to reach the shared cache
+        (or for its lease to end, then calls the engine itself).
+        """
+        coordinator = _COORDINATOR
+        if coordinator is None or self.cache is None:
+            return self._remember(key, self._call_engine(text, source, target, engine_name))
         
+        start_time = time.time()
+        delay = 0.02
+        with trace_span("coordinator.lease") as span:
+            while not coordinator.claim(key):
+                time.sleep(delay)
+                delay = min(delay * 2, 0.25)
+                hit = self.cache.get(*key)
+                if hit is not None:
+                    span.set(shared=True)
+                    self.metrics.record_lookup(engine_name, "coalesced")
+                    return self._cached_result(hit, text, source, target, engine_name, start_time)
         try:
-            if engine_info["type"] == "deep_translator":
-                result = self._translate_deep_translator(text, source, target, engine_info)
+            # The previous holder may have finished between our lookup and the claim.
+            hit = self.cache.get(*key)
+            if hit is not None:
+                return self._cached_result(hit, text, source, target, engine_name, start_time)
+            return self._remember(key, self._call_engine(text, source, target, engine_name))
+        finally:
+            coordinator.release(key)
+    
+    def _remember(self, key: tuple, result: TranslationResult) -> TranslationResult:
+        # Outages and timeouts say nothing about the term; the next call should retry.
+        if result.status == "skipped" or _is_transient(result):
+            return result
+        if self._recent:
+            self._recent.put(key, result)
+        if self.cache is not None:
+            self.cache.put(*key, result)
+        return result
+    
+    def translate_packed(self, terms: List[str], source: str, target: str, engine_name: str) -> List[TranslationResult]:
+        """Translate many short terms with one engine, several terms per upstream request.
+
+        Uncached terms are numbered one per line ("1. term") and sent in chunks of at
+        most PACKING_LIMITS[engine_name] characters. The answer is split back on the
+        numbers; any term that does not line up or comes back unchanged (or the
+        whole chunk, if the call fails) is retried with a regular per-term call.
+        Each packed result reports its share of the chunk's time. Engines without a
+        packing limit, and single terms, simply go through _translate_single.
+        """
+        limit = PACKING_LIMITS.get(engine_name)
+        if engine_name not in self.engines or not limit or len(terms) < 2:
+            return [self._translate_single(term, source, target, engine_name) for term in terms]
+        
+        results: List[Optional[TranslationResult]] = [None] * len(terms)
+        groups: Dict[str, List[Tuple[int, tuple]]] = {}  # resolved source -> [(index, key)]
+        for i, term in enumerate(terms):
+            key, hit = self._lookup(term, source, target, engine_name)
+            if hit is not None:
+                results[i] = hit
+            elif "\n" in term or not term.strip():
+                results[i] = self._translate_missed(key, term, source, target, engine_name)[0]
             else:
-                result = self._translate_translators(text, source, target, engine_info)
+                groups.setdefault(key[1], []).append((i, key))
+        
+        # Under 'auto', only terms detected as the same language share a request, and
+        # the engine is told that language rather than detecting it on the packed text.
+        for resolved, members in groups.items():
+            chunk_terms = [terms[i] for i, _ in members]
+            for chunk in pack_terms(chunk_terms, limit):
+                packed = self._call_engine(format_packed([chunk_terms[j] for j in chunk]), resolved, target, engine_name)
+                parts = split_packed(packed.translated_text, len(chunk)) if packed.success else [None] * len(chunk)
+                share = packed.translation_time / len(chunk)
+                for j, part in zip(chunk, parts):
+                    i, key = members[j]
+                    if part is None or _echoes_source(terms[i], part, target):
+                        results[i] = self._translate_missed(key, terms[i], source, target, engine_name)[0]
+                    else:
+                        results[i] = self._remember(key, replace(packed, source_lang=source, source_text=terms[i],
+                                                                 translated_text=part, translation_time=share))
+        return results
+    
+    def engine_health(self, engine_name: str) -> EngineHealth:
+        with self._health_lock:
+            if engine_name not in self._health:
+                self._health[engine_name] = EngineHealth(
+                    failure_threshold=self.failure_threshold, cooldown=self.breaker_cooldown,
+                    max_timeout=self.max_timeout
+                )
+            return self._health[engine_name]
+    
+    def get_engine_health(self) -> Dict[str, dict]:
+        """Health snapshot (breaker state, latency percentiles, error rate, timeout, down,
+        last probe) per engine, best-ranked first."""
+        health = {}
+        for name in self.get_available_engines():
+            snapshot = self.engine_health(name).snapshot()
+            snapshot["down"] = self.engine_down(name, snapshot)
+            if self.prober and name in self.prober.results:
+                snapshot["probe"] = dict(self.prober.results[name])
+            health[name] = snapshot
+        return health
+    
+    def get_stats(self) -> dict:
+        """Call counts, error classes, latency and queue-wait summaries, cache ratios and health per engine."""
+        stats = self.metrics.snapshot()
+        for name, health in self.get_engine_health().items():
+            engine_stats = stats["engines"].setdefault(name, {})
+            engine_stats["health"] = health
+            engine_stats["queued"] = get_rate_limiter(name).queued()
+            engine_stats["queued_by_priority"] = get_rate_limiter(name).queued_by_class()
+        stats["client_pool"] = self._clients.stats()
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
+    
+    def metrics_text(self) -> str:
+        """Metrics, breaker state and rate-limiter queues in Prometheus text format, for scraping."""
+        engines = self.get_available_engines()
+        return self.metrics.prometheus(self.get_engine_health(), {name: get_rate_limiter(name) for name in engines})
+    
+    def _call_engine(self, text: str, source: str, target: str, engine_name: str,
+                     max_wait: Optional[float] = None, priority: Optional[str] = None,
+                     client_id: Optional[str] = None) -> TranslationResult:
+        """Call the engine itself, bypassing any cache, within its rate limit and circuit breaker.
+
+        max_wait overrides how long to queue for a rate-limit token (0: only if one is free).
+        priority and client_id place the call in the engine's queue (see EngineLimiter);
+        they default to the current call_priority.
+        """
+        engine_info = self.engines[engine_name]
+        limiter = get_rate_limiter(engine_name)
+        current_priority, current_client = _CALL_CLASS.get()
+        priority = priority or current_priority
+        client_id = current_client if client_id is None else client_id
+        queued_at = time.time()
+        with trace_span("ratelimit.wait", priority=priority) as span:
+            acquired = limiter.acquire(max_wait, priority, client_id)
+            span.set(acquired=acquired)
+        self.metrics.record_queue_wait(engine_name, time.time() - queued_at, priority)
+        if not acquired:
+            result = self._skipped_result(engine_info, text, source, target, "rate limited 請求過於頻繁")
+            self.metrics.record_call(engine_name, result, upstream=False)
+            return result
+        self.metrics.call_started(engine_name)
+        try:
+            result = self._call_engine_guarded(text, source, target, engine_name)
+            self.metrics.record_call(engine_name, result, upstream=result.status != "skipped")
+            return result
+        finally:
+            self.metrics.call_started(engine_name, -1)
+            limiter.release(priority)
+    
+    def _skipped_result(self, engine_info: dict, text: str, source: str, target: str, reason: str) -> TranslationResult:
+        return TranslationResult(
+            engine=engine_info["name"], engine_zh=engine_info["name_zh"],
+            source_lang=source, target_lang=target, source_text=text,
+            translated_text="", success=False, error_message=f"skipped: {reason}", status="skipped"
+        )
+    
+    def _call_engine_guarded(self, text: str, source: str, target: str, engine_name: str) -> TranslationResult:
+        engine_info = self.engines[engine_name]
+        health = self.engine_health(engine_name)
+        if not health.allow_request():
+            return self._skipped_result(engine_info, text, source, target, "circuit open 引擎暫停使用")
+        
+        timeout = health.timeout()
+        start_time = time.time()
+        try:
+            with trace_span("engine.call", engine=engine_name, backend=engine_info["type"], timeout=timeout):
+                if engine_info["type"] == "translators":
+                    result = self._translate_translators(text, source, target, engine_info, timeout)
+                else:
+                    call = self._translate_deep_translator if engine_info["type"] == "deep_translator" else self._translate_custom
+                    future = self._deadline_executor.submit(_in_current_context(call), text, source, target, engine_info, timeout)
+                    result = future.result(timeout=timeout)
             
             result.translation_time = time.time() - start_time
             result.status = "success" if result.success else "error"
+            # An engine that answers is healthy even if the answer is unusable (e.g. unchanged text).
+            health.record(result.translation_time, ok=bool(result.success or result.error_message))
             return result
         except Exception as e:
+            elapsed = time.time() - start_time
+            health.record(elapsed, ok=False)
+            timed_out = isinstance(e, (FutureTimeoutError, TimeoutError)) or 'timeout' in type(e).__name__.lower()
+            if timed_out:
+                message = f"Timed out after {timeout:.1f}s 逾時"
+            else:
+                message = (UNAVAILABLE_PREFIX if _is_unavailable(e) else "") + str(e)[:80]
             return TranslationResult(
                 engine=engine_info["name"], engine_zh=engine_info["name_zh"],
                 source_lang=source, target_lang=target, source_text=text,
-                translated_text="", success=False, error_message=str(e)[:80],
-                translation_time=time.time() - start_time, status="error"
+                translated_text="", success=False,
+                error_message=message,
+                translation_time=elapsed, status="error"
             )
     
-    def _translate_deep_translator(self, text: str, source: str, target: str, engine_info: dict) -> TranslationResult:
-        engine_class = engine_info["class"]
-        detected_source = detect_language_simple(text) if source == 'auto' else source
+    def _translate_deep_translator(self, text: str, source: str, target: str, engine_info: dict,
+                                   timeout: Optional[float] = None) -> TranslationResult:
+        class_name = engine_info["class_name"]
+        engine_class = getattr(load_backend("deep_translator"), class_name)
+        with trace_span("detect_language"):
+            detected_source = detect_language_simple(text) if source == 'auto' else source
         
-        if engine_class == MyMemoryTranslator:
+        if class_name == "MyMemoryTranslator":
             src = MYMEMORY_LANG_MAP.get(detected_source, detected_source)
             tgt = MYMEMORY_LANG_MAP.get(target, target)
-            translator = engine_class(source=src, target=tgt)
-        elif engine_class == GoogleTranslator:
+        elif class_name == "GoogleTranslator":
             src = GOOGLE_LANG_MAP.get(detected_source, detected_source)
             tgt = GOOGLE_LANG_MAP.get(target, target)
-            if source == 'auto' and detected_source.startswith('zh'):
-                translator = GoogleTranslator(source=src, target=tgt)
-            else:
-                translator = GoogleTranslator(source=src if source != 'auto' else 'auto', target=tgt)
+            if not (source == 'auto' and detected_source.startswith('zh')):
+                src = src if source != 'auto' else 'auto'
         else:
-            translator = engine_class(source='auto' if source == 'auto' else source, target=target)
+            src, tgt = ('auto' if source == 'auto' else source), target
         
-        result = translator.translate(text)
+        # Clients are reused per language pair; HTTP goes through HTTP_POOL's keep-alive session.
+        _HTTP_TIMEOUT.value = timeout
+        factory = functools.partial(engine_class, source=src, target=tgt)
+        # The lease span covers building a client when none is idle; the upstream span is the call itself.
+        with trace_span("client.lease", client=class_name):
+            with self._clients.lease((class_name, src, tgt), factory) as translator:
+                with trace_span("upstream.request", engine=class_name):
+                    result = translator.translate(text)
         
-        if result and result.strip() == text.strip():
-            if any('\u4e00' <= c <= '\u9fff' for c in text) and target == 'en':
-                return TranslationResult(
-                    engine=engine_info["name"], engine_zh=engine_info["name_zh"],
-                    source_lang=source, target_lang=target, source_text=text,
-                    translated_text="", success=False,
-                    error_message="Translation returned unchanged source text", status="error"
-                )
+        with trace_span("validate"):
+            unchanged = _echoes_source(text, result, target)
+        if unchanged:
+            return TranslationResult(
+                engine=engine_info["name"], engine_zh=engine_info["name_zh"],
+                source_lang=source, target_lang=target, source_text=text,
+                translated_text="", success=False,
+                error_message="Translation returned unchanged source text", status="error"
+            )
         
         return TranslationResult(
             engine=engine_info["name"], engine_zh=engine_info["name_zh"],
@@ -314,29 +3007,45 @@ class MultiMTTranslator:
             status="success" if result else "error"
         )
     
-    def _translate_translators(self, text: str, source: str, target: str, engine_info: dict) -> TranslationResult:
+    def _translate_custom(self, text: str, source: str, target: str, engine_info: dict,
+                          timeout: Optional[float] = None) -> TranslationResult:
+        translated = engine_info["function"](text, source, target, timeout)
+        return TranslationResult(
+            engine=engine_info["name"], engine_zh=engine_info["name_zh"],
+            source_lang=source, target_lang=target, source_text=text,
+            translated_text=translated or "", success=bool(translated),
+            status="success" if translated else "error"
+        )
+    
+    def _translate_translators(self, text: str, source: str, target: str, engine_info: dict,
+                               timeout: float = 15) -> TranslationResult:
         engine_name = engine_info["engine_name"]
-        detected_source = detect_language_simple(text) if source == 'auto' else source
+        with trace_span("detect_language"):
+            detected_source = detect_language_simple(text) if source == 'auto' else source
         
         src = TRANSLATORS_LANG_MAP.get(detected_source, detected_source) if source != 'auto' else 'auto'
         if source == 'auto' and detected_source.startswith('zh'):
             src = TRANSLATORS_LANG_MAP.get(detected_source, 'zh')
         tgt = TRANSLATORS_LANG_MAP.get(target, target)
         
-        result = ts.translate_text(
-            query_text=text, translator=engine_name,
-            from_language=src, to_language=tgt, timeout=15
-        )
-        translated = str(result) if result else ""
-        
-        if translated.strip() == text.strip():
-            if any('\u4e00' <= c <= '\u9fff' for c in text) and target == 'en':
-                return TranslationResult(
-                    engine=engine_info["name"], engine_zh=engine_info["name_zh"],
-                    source_lang=source, target_lang=target, source_text=text,
-                    translated_text="", success=False,
-                    error_message="Translation returned unchanged source text", status="error"
-                )
+        backend = load_backend("translators")
+        with trace_span("upstream.request", engine=engine_name):
+            result = backend.translate_text(
+                query_text=text, translator=engine_name,
+                from_language=src, to_language=tgt, timeout=timeout,
+                update_session_after_seconds=self.session_max_age
+            )
+        
+        with trace_span("validate"):
+            translated = str(result) if result else ""
+            unchanged = _echoes_source(text, translated, target)
+        if unchanged:
+            return TranslationResult(
+                engine=engine_info["name"], engine_zh=engine_info["name_zh"],
+                source_lang=source, target_lang=target, source_text=text,
+                translated_text="", success=False,
+                error_message="Translation returned unchanged source text", status="error"
+            )
         
         return TranslationResult(
             engine=engine_info["name"], engine_zh=engine_info["name_zh"],
@@ -345,48 +3054,621 @@ class MultiMTTranslator:
             status="success" if translated else "error"
         )
     
-    def translate_streaming(self, text: str, source_lang: str, target_lang: str, engine_names: List[str]) -> Generator:
+    def _fan_out(self, calls: Iterable[Tuple[Callable, tuple]], max_concurrency: Optional[int] = None,
+                 deadline: Optional[float] = None, priority: Optional[str] = None,
+                 client_id: Optional[str] = None) -> Iterator[Tuple[int, object]]:
+        """Run calls on the shared pool, yielding (index, outcome) in completion order.
+
+        At most ``max_concurrency`` calls are in flight at once; the next call is
+        submitted as soon as one finishes. ``outcome`` is the return value, or the
+        exception raised by the call. With ``deadline`` (a time.monotonic() value)
+        the generator stops once it passes, like closing it early: calls not yet
+        started are cancelled and running ones are left to finish unobserved.
+
+        priority and client_id (default: the current call_priority) say how the
+        engine calls are queued; batch and probe work runs on a separate, smaller
+        pool so it can never take the threads interactive requests need.
+        """
+        limit = max(1, max_concurrency or self.request_concurrency)
+        pending_calls = iter(enumerate(calls))
+        in_flight = {}
+        current_priority, current_client = _CALL_CLASS.get()
+        priority = priority or current_priority
+        client_id = current_client if client_id is None else client_id
+        executor = self._executor if priority == PRIORITY_INTERACTIVE else self._background_executor
+        
+        def submit_next() -> bool:
+            try:
+                index, (fn, args) = next(pending_calls)
+            except StopIteration:
+                return False
+            in_flight[executor.submit(_in_call_class(fn, priority, client_id), *args)] = index
+            return True
+        
+        try:
+            while len(in_flight) < limit and submit_next():
+                pass
+            while in_flight:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    return
+                for future in done:
+                    index = in_flight.pop(future)
+                    try:
+                        outcome = future.result()
+                    except Exception as e:
+                        outcome = e
+                    submit_next()
+                    yield index, outcome
+        finally:
+            for future in in_flight:
+                future.cancel()
+    
+    def translate_streaming(self, text: str, source_lang: str, target_lang: str, engine_names: List[str],
+                            max_concurrency: Optional[int] = None, quorum: Optional[int] = None,
+                            deadline: Optional[float] = None, client_id: Optional[str] = None) -> Generator:
+        """Translate with all selected engines at once, yielding (html, json) as each finishes.
+
+        quorum and deadline end the comparison early; see translate_results_streaming.
+        """
         if not text or not text.strip():
             yield "<p>❌ Please enter a term to translate. 請輸入要翻譯的術語。</p>", ""
             return
         
+        json_renderer = JsonRenderer()
+        for results, current in self.translate_results_streaming(text, source_lang, target_lang, engine_names, max_concurrency,
+                                                                 quorum, deadline, client_id):
+            finished = any(r.status not in ('pending', 'running') for r in results)
+            yield create_status_html(results, current), self._to_json(results, json_renderer) if finished else ""
+    
+    def translate_results_streaming(self, text: str, source_lang: str, target_lang: str, engine_names: List[str],
+                                    max_concurrency: Optional[int] = None, quorum: Optional[int] = None,
+                                    deadline: Optional[float] = None,
+                                    client_id: Optional[str] = None) -> Iterator[Tuple[List[TranslationResult], str]]:
+        """Yield (results, current engine label) frames as engines start and finish.
+
+        The same results list is updated between frames, so render each frame before
+        advancing. translate_streaming renders these frames as full HTML; renderers
+        such as StatusRenderer can send only what changed.
+
+        With quorum, the comparison ends as soon as that many engines return the
+        same translation (see _agreement_key); with deadline, once that many seconds
+        have passed. Engines still queued or running are then cut off: marked
+        "skipped" with a "cut off: ..." error, while the agreeing results get
+        QUORUM_NOTE. quorum_report(results) summarizes both. Cut-off calls that
+        already started finish in the background and still fill the cache.
+
+        client_id identifies the user for fair queuing among interactive callers
+        (see EngineLimiter); the same goes for the other translate_* methods.
+        """
         text = text.strip()
+        engine_names = [name for name in engine_names if name in self.engines]
         results = []
         for engine_name in engine_names:
-            if engine_name in self.engines:
-                info = self.engines[engine_name]
-                results.append(TranslationResult(
-                    engine=info["name"], engine_zh=info["name_zh"],
-                    source_lang=source_lang, target_lang=target_lang,
+            info = self.engines[engine_name]
+            results.append(TranslationResult(
+                engine=info["name"], engine_zh=info["name_zh"],
+                source_lang=source_lang, target_lang=target_lang,
+                source_text=text, translated_text="", success=False, status="pending"
+            ))
+        
+        self.metrics.comparison_started()
+        try:
+            yield results, "Starting... 開始翻譯..."
+            
+            limit = max(1, max_concurrency or self.request_concurrency)
+            for result in results[:limit]:
+                result.status = "running"
+            yield results, self._running_label(results)
+            
+            calls = [(self._translate_single, (text, source_lang, target_lang, name)) for name in engine_names]
+            frames = self._fan_out(calls, limit, time.monotonic() + deadline if deadline else None, client_id=client_id)
+            votes: Dict[str, List[int]] = {}
+            cut_off = ""
+            for i, outcome in frames:
+                if isinstance(outcome, Exception):
+                    results[i].success = False
+                    results[i].status = "error"
+                    results[i].error_message = str(outcome)[:80]
+                else:
+                    results[i] = outcome
+                
+                if quorum and results[i].success:
+                    voters = votes.setdefault(_agreement_key(results[i].translated_text), [])
+                    voters.append(i)
+                    if len(voters) >= quorum:
+                        for j in voters:
+                            note = f"{results[j].note} · {QUORUM_NOTE}" if results[j].note else QUORUM_NOTE
+                            results[j] = replace(results[j], note=note)
+                        cut_off = "quorum reached 已達共識"
+                        break
+                
+                # The pool has already started the next queued engine, if any.
+                for result in results:
+                    if result.status == "pending":
+                        result.status = "running"
+                        break
+                yield results, self._running_label(results)
+            else:
+                cut_off = "deadline passed 超過時限"
+            frames.close()
+            
+            for i, result in enumerate(results):
+                if result.status in ("pending", "running"):
+                    results[i] = replace(result, status="skipped", error_message=CUT_OFF_PREFIX + cut_off)
+            yield results, ""
+        finally:
+            self.metrics.comparison_started(-1)
+    
+    def _running_label(self, results: List[TranslationResult]) -> str:
+        return ", ".join(r.engine for r in results if r.status == "running")
+    
+    def matrix_targets(self, text: str, source_lang: str, target_langs: List[str]) -> List[str]:
+        """The requested targets minus the (detected) source language, in SUPPORTED_LANGUAGES order."""
+        source = detect_language_simple(text.strip()) if source_lang == 'auto' else source_lang
+        wanted = set(target_langs)
+        return [code for code in SUPPORTED_LANGUAGES if code in wanted and code != source]
+    
+    def translate_matrix_streaming(self, text: str, source_lang: str, target_langs: List[str], engine_names: List[str],
+                                   max_concurrency: Optional[int] = None, client_id: Optional[str] = None,
+                                   timeout: Optional[float] = None) -> Iterator[Tuple[List[TranslationResult], str]]:
+        """Translate one term into several target languages with several engines.
+
+        Yields (results, current label) frames like translate_results_streaming.
+        results is the whole (target x engine) matrix flattened target by target
+        (see create_matrix_html); every cell goes through the shared pool with at most
+        max_concurrency calls in flight. Cells are scheduled row by row, so
+        consecutive calls go to different engines. The source language is detected
+        once (detection is memoized) and targets equal to it are dropped. Cells not
+        done within timeout seconds are reported as timed out.
+        """
+        text = text.strip()
+        engine_names = [name for name in engine_names if name in self.engines]
+        targets = self.matrix_targets(text, source_lang, target_langs)
+        cells = [(target, name) for target in targets for name in engine_names]
+        results = []
+        for target, name in cells:
+            info = self.engines[name]
+            results.append(TranslationResult(
+                engine=info["name"], engine_zh=info["name_zh"], source_lang=source_lang,
+                target_lang=target, source_text=text, translated_text="", success=False, status="pending"
+            ))
+        
+        yield results, "Starting... 開始翻譯..."
+        
+        limit = max(1, max_concurrency or self.request_concurrency)
+        for result in results[:limit]:
+            result.status = "running"
+        yield results, self._matrix_label(results)
+        
+        calls = [(self._translate_single, (text, source_lang, target, name)) for target, name in cells]
+        deadline = time.monotonic() + timeout if timeout else None
+        for i, outcome in self._fan_out(calls, limit, deadline, client_id=client_id):
+            if isinstance(outcome, Exception):
+                outcome = self._error_result(cells[i][1], source_lang, cells[i][0], text, str(outcome)[:80])
+            results[i] = outcome
+            for result in results:
+                if result.status == "pending":
+                    result.status = "running"
+                    break
+            yield results, self._matrix_label(results)
+        
+        for i, result in enumerate(results):
+            if result.status in ("pending", "running"):
+                results[i] = self._error_result(cells[i][1], source_lang, cells[i][0], text,
+                                                f"Timed out after {timeout:g}s 逾時")
+        yield results, ""
+    
+    def translate_matrix(self, text: str, source_lang: str, target_langs: List[str], engine_names: List[str],
+                         max_concurrency: Optional[int] = None, client_id: Optional[str] = None,
+                         timeout: Optional[float] = None) -> dict:
+        """Blocking form of translate_matrix_streaming; returns the matrix as _matrix_data does."""
+        results = []
+        for results, _ in self.translate_matrix_streaming(text, source_lang, target_langs, engine_names, max_concurrency,
+                                                          client_id, timeout):
+            pass
+        return self._matrix_data(text, source_lang, results)
+    
+    def _matrix_label(self, results: List[TranslationResult]) -> str:
+        running = [f"{r.engine} → {r.target_lang}" for r in results if r.status == "running"]
+        return ", ".join(running[:4]) + (f" +{len(running) - 4}" if len(running) > 4 else "")
+    
+    def _matrix_data(self, text: str, source_lang: str, results: List[TranslationResult]) -> dict:
+        targets, n_engines = _matrix_shape(results)
+        matrix = {target: {} for target in targets}
+        for r in results:
+            matrix[r.target_lang][r.engine] = {
+                "translation": r.translated_text, "success": r.success, "error": r.error_message,
+                "time": round(r.translation_time, 2), "cached": r.cached,
+            }
+            if r.note:
+                matrix[r.target_lang][r.engine]["note"] = r.note
+        return {
+            "term": text.strip(), "source": source_lang,
+            "targets": targets, "engines": [r.engine for r in results[:n_engines]], "matrix": matrix,
+        }
+    
+    def _matrix_json(self, text: str, source_lang: str, results: List[TranslationResult]) -> str:
+        return json.dumps(self._matrix_data(text, source_lang, results), ensure_ascii=False, indent=2)
+    
+    def translate_document_streaming(self, text: str, source_lang: str, target_lang: str, engine_names: List[str],
+                                     max_concurrency: Optional[int] = None, max_terms: int = 15,
+                                     client_id: Optional[str] = None,
+                                     timeout: Optional[float] = None) -> Iterator[Tuple[DocumentTranslation, str]]:
+        """Translate a long text sentence by sentence, yielding (doc, current label) frames.
+
+        The text is cut with segment_text under the smallest segment limit of the
+        selected engines, and every (segment, engine) pair goes through
+        _translate_single on the shared pool, segment by segment so consecutive
+        calls go to different engines. With up to max_concurrency calls in flight
+        (default max_workers) each engine works on many segments at once, so a long
+        text costs roughly one segment's latency per engine; rate limits still apply.
+        An engine's doc.results entry is reassembled in order (join_segments) once
+        its last segment is back; any failed segment makes it an error.
+
+        Up to max_terms recurring term candidates (extract_term_candidates) are
+        translated by every engine with translate_packed on the same pool, for
+        doc.term_results. Term-memory engines only take part in that comparison.
+        The source language is detected once for the whole text. Segments and terms
+        not done within timeout seconds are reported as timed out.
+        """
+        text = text.strip()
+        engine_names = [name for name in engine_names if name in self.engines]
+        mt_names = [name for name in engine_names if self.engines[name]["type"] != "term_memory"]
+        source = detect_language_simple(text) if source_lang == 'auto' else source_lang
+        max_chars = min((PACKING_LIMITS.get(name, DEFAULT_SEGMENT_LIMIT) for name in mt_names),
+                        default=DEFAULT_SEGMENT_LIMIT)
+        segments = segment_text(text, max_chars)
+        doc = DocumentTranslation(
+            text=text, source_lang=source, target_lang=target_lang, segments=segments, results=[],
+            parts=[[None] * len(segments) for _ in engine_names],
+            terms=extract_term_candidates(text, max_terms) if max_terms else [],
+            term_results=[None] * len(engine_names),
+        )
+        for name in engine_names:
+            info = self.engines[name]
+            if name in mt_names:
+                doc.results.append(TranslationResult(
+                    engine=info["name"], engine_zh=info["name_zh"], source_lang=source, target_lang=target_lang,
                     source_text=text, translated_text="", success=False, status="pending"
                 ))
+            else:
+                doc.results.append(self._skipped_result(info, text, source, target_lang, "term lookups only 僅供術語查詢"))
         
-        yield create_status_html(results, "Starting... 開始翻譯..."), ""
-        
-        for i, engine_name in enumerate(engine_names):
-            if engine_name not in self.engines:
-                continue
+        self.metrics.comparison_started()
+        try:
+            yield doc, "Starting... 開始翻譯..."
             
-            info = self.engines[engine_name]
-            results[i].status = "running"
-            yield create_status_html(results, f"{info['name']} ({info['name_zh']})"), ""
+            start_time = time.time()
+            for result in doc.results:
+                if result.status == "pending":
+                    result.status = "running"
+            yield doc, self._document_label(doc)
             
-            try:
-                results[i] = self._translate_single(text, source_lang, target_lang, engine_name)
-            except Exception as e:
-                results[i].success = False
-                results[i].status = "error"
-                results[i].error_message = str(e)[:80]
+            columns = [engine_names.index(name) for name in mt_names]
+            calls = [(self._translate_single, (segment, source, target_lang, name))
+                     for segment, _ in segments for name in mt_names]
+            if doc.terms:
+                terms = [term for term, _ in doc.terms]
+                calls += [(self.translate_packed, (terms, source, target_lang, name)) for name in engine_names]
+            limit = max(1, max_concurrency or self.max_workers)
+            n_segment_calls = len(segments) * len(mt_names)
+            deadline = time.monotonic() + timeout if timeout else None
+            for i, outcome in self._fan_out(calls, limit, deadline, client_id=client_id):
+                if i >= n_segment_calls:
+                    e = i - n_segment_calls
+                    if isinstance(outcome, Exception):
+                        outcome = [self._error_result(engine_names[e], source, target_lang, term, str(outcome)[:80])
+                                   for term, _ in doc.terms]
+                    doc.term_results[e] = outcome
+                else:
+                    s, e = divmod(i, len(mt_names))
+                    e = columns[e]
+                    if isinstance(outcome, Exception):
+                        outcome = self._error_result(engine_names[e], source, target_lang, segments[s][0], str(outcome)[:80])
+                    doc.parts[e][s] = outcome
+                    if all(part is not None for part in doc.parts[e]):
+                        doc.results[e] = self._assemble_document(doc, e, time.time() - start_time)
+                yield doc, self._document_label(doc)
             
-            current = f"{info['name']}" if i < len(engine_names) - 1 else ""
-            yield create_status_html(results, current), self._to_json(results)
-            time.sleep(0.3)
+            message = f"Timed out after {timeout:g}s 逾時" if timeout else ""
+            for e, name in enumerate(engine_names):
+                if doc.term_results[e] is None and doc.terms:
+                    doc.term_results[e] = [self._error_result(name, source, target_lang, term, message)
+                                           for term, _ in doc.terms]
+                if doc.results[e].status == "running":
+                    doc.parts[e] = [part or self._error_result(name, source, target_lang, segment, message)
+                                    for part, (segment, _) in zip(doc.parts[e], segments)]
+                    doc.results[e] = self._assemble_document(doc, e, time.time() - start_time)
+            yield doc, ""
+        finally:
+            self.metrics.comparison_started(-1)
+    
+    def _assemble_document(self, doc: DocumentTranslation, e: int, elapsed: float) -> TranslationResult:
+        """Engine e's whole document from its segment results."""
+        parts = doc.parts[e]
+        failed = [part for part in parts if not part.success]
+        translated = join_segments([part.translated_text if part.success else segment
+                                    for part, (segment, _) in zip(parts, doc.segments)],
+                                   [separator for _, separator in doc.segments], doc.target_lang)
+        result = replace(doc.results[e], translated_text=translated, translation_time=elapsed,
+                         cached=all(part.cached for part in parts))
+        if failed:
+            return replace(result, success=False, status="error",
+                           error_message=f"{len(failed)}/{len(parts)} segments failed 段落失敗: {failed[0].error_message}")
+        return replace(result, success=True, status="success")
+    
+    def _document_label(self, doc: DocumentTranslation) -> str:
+        running = []
+        for result, parts in zip(doc.results, doc.parts):
+            if result.status == "running":
+                running.append(f"{result.engine} {sum(part is not None for part in parts)}/{len(parts)}")
+        return ", ".join(running)
+    
+    def translate_document(self, text: str, source_lang: str, target_lang: str, engine_names: List[str],
+                           max_concurrency: Optional[int] = None, max_terms: int = 15,
+                           client_id: Optional[str] = None, timeout: Optional[float] = None) -> dict:
+        """Blocking form of translate_document_streaming; returns DocumentTranslation.to_dict()."""
+        doc = None
+        for doc, _ in self.translate_document_streaming(text, source_lang, target_lang, engine_names,
+                                                        max_concurrency, max_terms, client_id, timeout):
+            pass
+        return doc.to_dict()
+    
+    def translate_batch(self, input_path: str, output_path: str, source_lang: str, target_lang: str,
+                        engine_names: List[str], checkpoint_path: Optional[str] = None,
+                        max_concurrency: Optional[int] = None, column=0, has_header: bool = False,
+                        checkpoint_every: int = 100, progress_every: float = 1.0,
+                        pack: bool = False, pack_size: int = 50,
+                        collect: Optional[ResultColumns] = None,
+                        client_id: Optional[str] = None) -> Iterator[BatchProgress]:
+        """Translate a whole glossary file with the selected engines.
+
+        Generator: iterate it to run the job. Terms are streamed from input_path and
+        every (term, engine) call goes through the shared pool with at most
+        max_concurrency calls in flight. Rows are appended to output_path (.csv or
+        .jsonl) in input order as soon as all engines have answered a term, so memory
+        stays flat regardless of glossary size. A BatchProgress is yielded about every
+        progress_every seconds and once more at the end.
+
+        With checkpoint_path, progress is saved every checkpoint_every terms and when
+        the job is interrupted; rerunning the same job resumes after the last saved
+        term. Calls that fail transiently (TRANSIENT_ERRORS, except an open circuit
+        breaker) are retried up to BATCH_RETRIES times with backoff; a row still
+        holding such a failure is written, but the checkpoint stays before it, so a
+        rerun redoes it and everything after it. The checkpoint is removed once the
+        job completes without such rows.
+
+        With pack, terms are read pack_size at a time and each block is sent to the
+        engines listed in PACKING_LIMITS through translate_packed, i.e. in a handful
+        of upstream requests instead of one per term.
+
+        With collect, every finished term's results are also appended to that
+        ResultColumns store (e.g. for a Parquet export afterwards).
+
+        Engine calls run at batch priority on the background pool: interactive
+        lookups overtake them in every engine's queue, and concurrent jobs share
+        the batch capacity fairly by client_id (default: the input file).
+        """
+        engine_names = [name for name in engine_names if name in self.engines]
+        if not engine_names:
+            raise ValueError("No known engines selected")
+        
+        signature = {
+            "input": os.path.abspath(input_path), "output": os.path.abspath(output_path),
+            "source": source_lang, "target": target_lang, "engines": engine_names,
+        }
+        checkpoint = _load_checkpoint(checkpoint_path, signature) if checkpoint_path else None
+        rows_skipped = checkpoint["rows_done"] if checkpoint else 0
+        writer = _BatchWriter(output_path, engine_names, self.engines, checkpoint["output_bytes"] if checkpoint else None)
+        terms = itertools.islice(read_glossary(input_path, column, has_header, source_lang), rows_skipped, None)
+        
+        n_engines = len(engine_names)
+        pending: Dict[int, list] = {}  # row -> [term, results per engine, engines remaining]
+        progress = BatchProgress(terms_skipped=rows_skipped)
+        next_row = 0
+        start = last_report = time.time()
+        
+        block_size = max(1, pack_size) if pack else 1
+        units: Dict[int, Tuple[int, int, int]] = {}  # call index -> (first row, rows, engine column)
+        unit_ids = itertools.count()
+        
+        def calls():
+            row = 0
+            for block in iter(lambda: list(itertools.islice(terms, block_size)), []):
+                for offset, term in enumerate(block):
+                    pending[row + offset] = [term, [None] * n_engines, n_engines]
+                for col, name in enumerate(engine_names):
+                    if len(block) > 1 and name in PACKING_LIMITS:
+                        units[next(unit_ids)] = (row, len(block), col)
+                        yield self._translate_with_retries, (block, source_lang, target_lang, name, True)
+                    else:
+                        for offset, term in enumerate(block):
+                            units[next(unit_ids)] = (row + offset, 1, col)
+                            yield self._translate_with_retries, ([term], source_lang, target_lang, name, False)
+                row += len(block)
+        
+        hold: Optional[Tuple[int, int]] = None  # (rows done, output bytes) before the first row to redo
+        
+        def save_checkpoint():
+            rows_done, offset = hold or (rows_skipped + next_row, writer.offset())
+            _save_checkpoint(checkpoint_path, signature, rows_done, offset)
+        
+        try:
+            for index, outcome in self._fan_out(calls(), max_concurrency, priority=PRIORITY_BATCH,
+                                                client_id=signature["input"] if client_id is None else client_id):
+                first, count, col = units.pop(index)
+                for row in range(first, first + count):
+                    entry = pending[row]
+                    if isinstance(outcome, Exception):
+                        result = self._error_result(engine_names[col], source_lang, target_lang, entry[0], str(outcome)[:80])
+                    else:
+                        result = outcome[row - first]
+                    entry[1][col] = result
+                    entry[2] -= 1
+                    if not result.success:
+                        progress.errors += 1
+                
+                while next_row in pending and pending[next_row][2] == 0:
+                    term, results, _ = pending.pop(next_row)
+                    if any(_is_transient(r) for r in results):
+                        progress.retry_pending += 1
+                        if hold is None and checkpoint_path:
+                            hold = (rows_skipped + next_row, writer.offset())
+                    writer.write(term, results)
+                    if collect is not None:
+                        collect.extend(results)
+                    next_row += 1
+                    progress.terms_done += 1
+                    if checkpoint_path and progress.terms_done % checkpoint_every == 0:
+                        save_checkpoint()
+                
+                now = time.time()
+                if now - last_report >= progress_every:
+                    last_report = now
+                    progress.elapsed = now - start
+                    yield replace(progress)
+            progress.finished = True
+        finally:
+            if checkpoint_path and (hold or not progress.finished):
+                save_checkpoint()
+            writer.close()
+        
+        if checkpoint_path and not hold and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        progress.elapsed = time.time() - start
+        yield progress
+    
+    def _translate_with_retries(self, terms: List[str], source: str, target: str, engine_name: str,
+                                packed: bool) -> List[TranslationResult]:
+        """One batch unit: terms through translate_packed (or the single term through
+        _translate_single), retrying transient failures with backoff. Open breakers
+        are not waited out; those rows are left for a rerun."""
+        if packed:
+            results = self.translate_packed(terms, source, target, engine_name)
+        else:
+            results = [self._translate_single(terms[0], source, target, engine_name)]
+        for attempt in range(BATCH_RETRIES):
+            retry = [i for i, r in enumerate(results) if _is_transient(r) and _error_class(r) != "circuit_open"]
+            if not retry:
+                break
+            time.sleep(BATCH_RETRY_DELAY * 2 ** attempt)
+            for i in retry:
+                results[i] = self._translate_single(terms[i], source, target, engine_name)
+        return results
+    
+    # ------------------------------------------------------------
+    # Async API
+    # ------------------------------------------------------------
+    
+    def _engine_semaphore(self, engine_name: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphores = self._async_semaphores.setdefault(loop, {})
+        if engine_name not in semaphores:
+            semaphores[engine_name] = asyncio.Semaphore(self.engine_concurrency)
+        return semaphores[engine_name]
+    
+    async def _translate_single_async(self, text: str, source: str, target: str, engine_name: str) -> TranslationResult:
+        """Run one blocking engine call on the shared executor, bounded per engine."""
+        async with self._engine_semaphore(engine_name):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, _in_current_context(self._translate_single),
+                                              text, source, target, engine_name)
+    
+    async def _translate_async_indexed(self, text: str, source_lang: str, target_lang: str, engine_names: List[str],
+                                       timeout: Optional[float] = None) -> AsyncIterator[Tuple[int, TranslationResult]]:
+        """Yield (index into engine_names, result) in completion order.
+
+        Engines still running when ``timeout`` expires are reported as errors and
+        cancelled; closing the generator early cancels everything still pending.
+        """
+        tasks = {
+            asyncio.ensure_future(self._translate_single_async(text, source_lang, target_lang, name)): i
+            for i, name in enumerate(engine_names)
+        }
+        deadline = None if timeout is None else asyncio.get_running_loop().time() + timeout
+        try:
+            pending = set(tasks)
+            while pending:
+                remaining = None if deadline is None else max(0.0, deadline - asyncio.get_running_loop().time())
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    index = tasks[task]
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        result = self._error_result(engine_names[index], source_lang, target_lang, text, str(e)[:80])
+                    yield index, result
+            for task in pending:
+                task.cancel()
+                index = tasks[task]
+                yield index, self._error_result(engine_names[index], source_lang, target_lang, text,
+                                                 f"Timed out after {timeout:g}s 逾時")
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    async def translate_async(self, text: str, source_lang: str, target_lang: str, engine_names: List[str],
+                              timeout: Optional[float] = None) -> AsyncIterator[TranslationResult]:
+        """Async generator yielding one TranslationResult per engine, in completion order."""
+        if not text or not text.strip():
+            return
+        engine_names = [name for name in engine_names if name in self.engines]
+        async for _, result in self._translate_async_indexed(text.strip(), source_lang, target_lang, engine_names, timeout):
+            yield result
+    
+    async def translate_async_indexed(self, text: str, source_lang: str, target_lang: str, engine_names: List[str],
+                                      timeout: Optional[float] = None) -> AsyncIterator[Tuple[int, TranslationResult]]:
+        """Like translate_async, but yields (index into engine_names, result) so callers can
+        place each result; engine_names must all be registered engines."""
+        if not text or not text.strip():
+            return
+        async for i, result in self._translate_async_indexed(text.strip(), source_lang, target_lang, engine_names, timeout):
+            yield i, result
+    
+    async def translate_streaming_async(self, text: str, source_lang: str, target_lang: str, engine_names: List[str],
+                                        timeout: Optional[float] = None) -> AsyncIterator[Tuple[str, str]]:
+        """Async counterpart of translate_streaming, yielding (html, json) frames."""
+        if not text or not text.strip():
+            yield "<p>❌ Please enter a term to translate. 請輸入要翻譯的術語。</p>", ""
+            return
+        
+        text = text.strip()
+        engine_names = [name for name in engine_names if name in self.engines]
+        results = []
+        for engine_name in engine_names:
+            info = self.engines[engine_name]
+            results.append(TranslationResult(
+                engine=info["name"], engine_zh=info["name_zh"],
+                source_lang=source_lang, target_lang=target_lang,
+                source_text=text, translated_text="", success=False, status="running"
+            ))
+        
+        yield create_status_html(results, self._running_label(results)), ""
         
-        yield create_status_html(results, ""), self._to_json(results)
+        json_renderer = JsonRenderer()
+        async for i, result in self._translate_async_indexed(text, source_lang, target_lang, engine_names, timeout):
+            results[i] = result
+            yield create_status_html(results, self._running_label(results)), self._to_json(results, json_renderer)
+        
+        yield create_status_html(results, ""), self._to_json(results, json_renderer)
+    
+    def _error_result(self, engine_name: str, source: str, target: str, text: str, message: str) -> TranslationResult:
+        info = self.engines.get(engine_name, {})
+        return TranslationResult(
+            engine=info.get("name", engine_name), engine_zh=info.get("name_zh", engine_name),
+            source_lang=source, target_lang=target, source_text=text, translated_text="",
+            success=False, error_message=message, status="error"
+        )
     
-    def _to_json(self, results: List[TranslationResult]) -> str:
-        data = [{"engine": r.engine, "engine_zh": r.engine_zh, "translation": r.translated_text, "time": f"{r.translation_time:.2f}s"} for r in results if r.success]
-        return json.dumps(data, ensure_ascii=False, indent=2)
+    def _to_json(self, results: List[TranslationResult], renderer: Optional[JsonRenderer] = None) -> str:
+        """Results JSON; pass the same JsonRenderer for every frame of a stream to reuse earlier rows."""
+        with trace_span("render.json", rows=len(results)):
+            return (renderer or JsonRenderer()).render(results)
 
 # ============================================================
 # GRADIO INTERFACE
@@ -396,10 +3678,30 @@ def create_gradio_interface(translator: MultiMTTranslator):
     if not GRADIO_AVAILABLE:
         print("❌ Gradio not available")
         return None
+    import gradio as gr
     
     lang_choices = [f"{code} - {name}" for code, name in SUPPORTED_LANGUAGES.items()]
+    defaults = translator.default_engines()
+    
+    def engine_choices():
+        return [(f"{info['name']} {info['name_zh']}" + (" ⛔" if translator.engine_down(key) else ""), key)
+                for key, info in ((k, translator.engines[k]) for k in translator.get_available_engines())]
+    
+    def engine_health_markdown():
+        parts = []
+        for key, snap in translator.get_engine_health().items():
+            name = translator.engines[key]["name"]
+            if translator.engines[key].get("type") == "term_memory":
+                continue
+            if snap["down"]:
+                parts.append(f"🔴 {name} down 暫停")
+            elif snap["p50"] is not None:
+                parts.append(f"🟢 {name} {snap['p50']:.2f}s")
+            else:
+                parts.append(f"⚪ {name}")
+        return "Engine health 引擎狀態 (fastest first 由快至慢): " + " · ".join(parts)
     
-    with gr.Blocks(title="🔤 Multi-MT Term Comparison Tool", theme=gr.themes.Soft()) as demo:
+    with gr.Blocks(title="🔤 Multi-MT Term Comparison Tool", theme=gr.themes.Soft(), css=STATUS_CSS + MATRIX_CSS) as demo:
         gr.Markdown("""
         # 🔤 Multi-MT Term Comparison Tool
         # 多引擎術語翻譯比較工具
@@ -411,112 +3713,313 @@ def create_gradio_interface(translator: MultiMTTranslator):
         ---
         """)
         
-        with gr.Row():
-            with gr.Column(scale=2):
-                input_text = gr.Textbox(
-                    label="🔤 Term / Phrase to Translate 要翻譯的術語/詞組",
-                    placeholder="Enter a term here... 在此輸入術語...\n\nExamples: 衞生署衞生防護中心, blockchain, 碳中和",
-                    lines=3, max_lines=6
-                )
-            with gr.Column(scale=1):
-                source_lang = gr.Dropdown(choices=["auto - Auto Detect"] + lang_choices, value="auto - Auto Detect", label="🌍 Source Language 源語言")
-                target_lang = gr.Dropdown(choices=lang_choices, value="en - English", label="🎯 Target Language 目標語言")
-        
-        gr.Markdown("### 🔧 Select MT Engines 選擇翻譯引擎")
-        with gr.Row():
-            use_google = gr.Checkbox(label="Google 谷歌", value=True)
-            use_bing = gr.Checkbox(label="Bing 必應", value=True)
-            use_alibaba = gr.Checkbox(label="Alibaba 阿里", value=True)
-            use_sogou = gr.Checkbox(label="Sogou 搜狗", value=True)
-        with gr.Row():
-            use_youdao = gr.Checkbox(label="Youdao 有道", value=True)
-            use_tencent = gr.Checkbox(label="Tencent 騰訊", value=True)
-            use_lingvanex = gr.Checkbox(label="Lingvanex", value=False)
-            use_mymemory = gr.Checkbox(label="MyMemory", value=False)
-        
-        translate_btn = gr.Button("🚀 Compare Translations! 比較翻譯結果!", variant="primary", size="lg")
-        
-        gr.Markdown("---")
-        results_html = gr.HTML(value="<p style='text-align:center; color:#888; padding:40px;'>👆 Enter a term and click Compare 輸入術語並點擊比較</p>")
-        
-        with gr.Accordion("📋 JSON Output (for developers)", open=False):
-            results_json = gr.Code(language="json", label="JSON")
-        
-        def do_translate_streaming(text, source, target, g, b, a, s, y, t, l, m):
-            if not text.strip():
-                yield "<p style='text-align:center; color:#f44336;'>❌ Please enter a term! 請輸入術語！</p>", ""
-                return
+        with gr.Tabs():
+            with gr.Tab("🔤 Term Comparison 術語比較"):
+                with gr.Row():
+                    with gr.Column(scale=2):
+                        input_text = gr.Textbox(
+                            label="🔤 Term / Phrase to Translate 要翻譯的術語/詞組",
+                            placeholder="Enter a term here... 在此輸入術語...\n\nExamples: 衞生署衞生防護中心, blockchain, 碳中和",
+                            lines=3, max_lines=6
+                        )
+                    with gr.Column(scale=1):
+                        source_lang = gr.Dropdown(choices=["auto - Auto Detect"] + lang_choices, value="auto - Auto Detect", label="🌍 Source Language 源語言")
+                        target_lang = gr.Dropdown(choices=lang_choices, value="en - English", label="🎯 Target Language 目標語言")
+        
+                gr.Markdown("### 🔧 Select MT Engines 選擇翻譯引擎")
+                engine_health = gr.Markdown(engine_health_markdown())
+                with gr.Row():
+                    use_google = gr.Checkbox(label="Google 谷歌", value="google" in defaults)
+                    use_bing = gr.Checkbox(label="Bing 必應", value="bing" in defaults)
+                    use_alibaba = gr.Checkbox(label="Alibaba 阿里", value="alibaba" in defaults)
+                    use_sogou = gr.Checkbox(label="Sogou 搜狗", value="sogou" in defaults)
+                with gr.Row():
+                    use_youdao = gr.Checkbox(label="Youdao 有道", value="youdao" in defaults)
+                    use_tencent = gr.Checkbox(label="Tencent 騰訊", value="tencent" in defaults)
+                    use_lingvanex = gr.Checkbox(label="Lingvanex", value="lingvanex" in defaults)
+                    use_mymemory = gr.Checkbox(label="MyMemory", value="mymemory" in defaults)
+                engine_boxes = {"google": use_google, "bing": use_bing, "alibaba": use_alibaba, "sogou": use_sogou,
+                                "youdao": use_youdao, "tencent": use_tencent, "lingvanex": use_lingvanex, "mymemory": use_mymemory}
+                engine_labels = {key: box.label for key, box in engine_boxes.items()}
+                use_term_memory = gr.Checkbox(label="📖 Term Memory 術語庫 (approved translations 已核准譯名)", value=True,
+                                              visible="term_memory" in translator.engines)
+                with gr.Row():
+                    quorum = gr.Slider(0, 8, value=0, step=1, label="🤝 Stop when N engines agree 共識即停 (0 = wait for all 全部等待)")
+                    deadline = gr.Number(value=0, minimum=0, label="⏱️ Deadline 時限 (seconds 秒, 0 = none 不限)")
+        
+                translate_btn = gr.Button("🚀 Compare Translations! 比較翻譯結果!", variant="primary", size="lg")
+        
+                gr.Markdown("---")
+                results_html = gr.HTML(value="<p style='text-align:center; color:#888; padding:40px;'>👆 Enter a term and click Compare 輸入術語並點擊比較</p>")
+        
+                with gr.Accordion("📋 JSON Output (for developers)", open=False):
+                    results_json = gr.Code(language="json", label="JSON")
+                # Row-level patches for the results page; applied client-side by STATUS_PATCH_JS.
+                results_patch = gr.JSON(visible=False)
+                results_patch.change(fn=None, inputs=results_patch, outputs=None, js=STATUS_PATCH_JS)
+        
+                def do_translate_streaming(text, source, target, g, b, a, s, y, t, l, m, tm, quorum, deadline, request: gr.Request = None):
+                    if not text.strip():
+                        yield "<p style='text-align:center; color:#f44336;'>❌ Please enter a term! 請輸入術語！</p>", "", None
+                        return
             
-            src = source.split(" - ")[0] if " - " in source else source
-            tgt = target.split(" - ")[0] if " - " in target else target
+                    src = source.split(" - ")[0] if " - " in source else source
+                    tgt = target.split(" - ")[0] if " - " in target else target
             
-            engines = []
-            if g and "google" in translator.engines: engines.append("google")
-            if b and "bing" in translator.engines: engines.append("bing")
-            if a and "alibaba" in translator.engines: engines.append("alibaba")
-            if s and "sogou" in translator.engines: engines.append("sogou")
-            if y and "youdao" in translator.engines: engines.append("youdao")
-            if t and "tencent" in translator.engines: engines.append("tencent")
-            if l and "lingvanex" in translator.engines: engines.append("lingvanex")
-            if m and "mymemory" in translator.engines: engines.append("mymemory")
+                    engines = []
+                    if tm and "term_memory" in translator.engines: engines.append("term_memory")
+                    if g and "google" in translator.engines: engines.append("google")
+                    if b and "bing" in translator.engines: engines.append("bing")
+                    if a and "alibaba" in translator.engines: engines.append("alibaba")
+                    if s and "sogou" in translator.engines: engines.append("sogou")
+                    if y and "youdao" in translator.engines: engines.append("youdao")
+                    if t and "tencent" in translator.engines: engines.append("tencent")
+                    if l and "lingvanex" in translator.engines: engines.append("lingvanex")
+                    if m and "mymemory" in translator.engines: engines.append("mymemory")
             
-            if not engines:
-                yield "<p style='color:#f44336;'>❌ Please select at least one engine! 請選擇至少一個引擎！</p>", ""
-                return
+                    if not engines:
+                        yield "<p style='color:#f44336;'>❌ Please select at least one engine! 請選擇至少一個引擎！</p>", "", None
+                        return
             
-            for html, json_out in translator.translate_streaming(text, src, tgt, engines):
-                yield html, json_out
+                    # Send the page once, then only the rows that changed.
+                    renderer = StatusRenderer()
+                    json_renderer = JsonRenderer()
+                    last_json = ""
+                    frames = translator.translate_results_streaming(text, src, tgt, engines, quorum=int(quorum or 0) or None,
+                                                                    deadline=float(deadline or 0) or None,
+                                                                    client_id=getattr(request, "session_hash", None))
+                    results, current = next(frames)
+                    yield renderer.full(results, current), last_json, None
+                    for results, current in frames:
+                        json_out = last_json
+                        if any(r.status not in ('pending', 'running') for r in results):
+                            json_out = translator._to_json(results, json_renderer)
+                        yield gr.update(), (gr.update() if json_out is last_json else json_out), renderer.delta(results, current)
+                        last_json = json_out
         
-        translate_btn.click(
-            fn=do_translate_streaming,
-            inputs=[input_text, source_lang, target_lang, use_google, use_bing, use_alibaba, use_sogou, use_youdao, use_tencent, use_lingvanex, use_mymemory],
-            outputs=[results_html, results_json]
-        )
+                translate_btn.click(
+                    fn=do_translate_streaming,
+                    inputs=[input_text, source_lang, target_lang, use_google, use_bing, use_alibaba, use_sogou, use_youdao, use_tencent, use_lingvanex, use_mymemory, use_term_memory, quorum, deadline],
+                    outputs=[results_html, results_json, results_patch]
+                )
+        
+                # Examples Section
+                gr.Markdown("---\n## 📚 Terminology Examples 術語範例\nClick on any term below to load it for comparison.\n點擊下方任意術語即可載入比較。")
+        
+                gr.Markdown("### 🏥 Medical & Health 醫療健康")
+                gr.Examples(examples=[
+                    ["衞生署衞生防護中心", "auto - Auto Detect", "en - English"],
+                    ["基孔肯雅熱", "auto - Auto Detect", "en - English"],
+                    ["polymerase chain reaction", "en - English", "zh-TW - 繁體中文 (Traditional Chinese)"],
+                ], inputs=[input_text, source_lang, target_lang], label="")
+        
+                gr.Markdown("### ⚖️ Legal & Government 法律政府")
+                gr.Examples(examples=[
+                    ["立法會", "auto - Auto Detect", "en - English"],
+                    ["司法覆核", "auto - Auto Detect", "en - English"],
+                    ["habeas corpus", "en - English", "zh-TW - 繁體中文 (Traditional Chinese)"],
+                ], inputs=[input_text, source_lang, target_lang], label="")
+        
+                gr.Markdown("### 💰 Finance & Business 財經商業")
+                gr.Examples(examples=[
+                    ["恒生指數", "auto - Auto Detect", "en - English"],
+                    ["量化寬鬆", "auto - Auto Detect", "en - English"],
+                    ["blockchain", "en - English", "zh-TW - 繁體中文 (Traditional Chinese)"],
+                ], inputs=[input_text, source_lang, target_lang], label="")
+        
+                gr.Markdown("### 💻 Technology 科技")
+                gr.Examples(examples=[
+                    ["人工智能", "auto - Auto Detect", "en - English"],
+                    ["機器學習", "auto - Auto Detect", "en - English"],
+                    ["natural language processing", "en - English", "zh-TW - 繁體中文 (Traditional Chinese)"],
+                ], inputs=[input_text, source_lang, target_lang], label="")
         
-        # Examples Section
-        gr.Markdown("---\n## 📚 Terminology Examples 術語範例\nClick on any term below to load it for comparison.\n點擊下方任意術語即可載入比較。")
-        
-        gr.Markdown("### 🏥 Medical & Health 醫療健康")
-        gr.Examples(examples=[
-            ["衞生署衞生防護中心", "auto - Auto Detect", "en - English"],
-            ["基孔肯雅熱", "auto - Auto Detect", "en - English"],
-            ["polymerase chain reaction", "en - English", "zh-TW - 繁體中文 (Traditional Chinese)"],
-        ], inputs=[input_text, source_lang, target_lang], label="")
-        
-        gr.Markdown("### ⚖️ Legal & Government 法律政府")
-        gr.Examples(examples=[
-            ["立法會", "auto - Auto Detect", "en - English"],
-            ["司法覆核", "auto - Auto Detect", "en - English"],
-            ["habeas corpus", "en - English", "zh-TW - 繁體中文 (Traditional Chinese)"],
-        ], inputs=[input_text, source_lang, target_lang], label="")
-        
-        gr.Markdown("### 💰 Finance & Business 財經商業")
-        gr.Examples(examples=[
-            ["恒生指數", "auto - Auto Detect", "en - English"],
-            ["量化寬鬆", "auto - Auto Detect", "en - English"],
-            ["blockchain", "en - English", "zh-TW - 繁體中文 (Traditional Chinese)"],
-        ], inputs=[input_text, source_lang, target_lang], label="")
-        
-        gr.Markdown("### 💻 Technology 科技")
-        gr.Examples(examples=[
-            ["人工智能", "auto - Auto Detect", "en - English"],
-            ["機器學習", "auto - Auto Detect", "en - English"],
-            ["natural language processing", "en - English", "zh-TW - 繁體中文 (Traditional Chinese)"],
-        ], inputs=[input_text, source_lang, target_lang], label="")
-        
-        gr.Markdown("### 🌍 Environment 環境")
-        gr.Examples(examples=[
-            ["碳中和", "auto - Auto Detect", "en - English"],
-            ["可再生能源", "auto - Auto Detect", "en - English"],
-            ["carbon footprint", "en - English", "zh-TW - 繁體中文 (Traditional Chinese)"],
-        ], inputs=[input_text, source_lang, target_lang], label="")
-        
-        gr.Markdown("### 📚 Education 教育")
-        gr.Examples(examples=[
-            ["通識教育", "auto - Auto Detect", "en - English"],
-            ["持續進修", "auto - Auto Detect", "en - English"],
-            ["blended learning", "en - English", "zh-TW - 繁體中文 (Traditional Chinese)"],
-        ], inputs=[input_text, source_lang, target_lang], label="")
+                gr.Markdown("### 🌍 Environment 環境")
+                gr.Examples(examples=[
+                    ["碳中和", "auto - Auto Detect", "en - English"],
+                    ["可再生能源", "auto - Auto Detect", "en - English"],
+                    ["carbon footprint", "en - English", "zh-TW - 繁體中文 (Traditional Chinese)"],
+                ], inputs=[input_text, source_lang, target_lang], label="")
+        
+                gr.Markdown("### 📚 Education 教育")
+                gr.Examples(examples=[
+                    ["通識教育", "auto - Auto Detect", "en - English"],
+                    ["持續進修", "auto - Auto Detect", "en - English"],
+                    ["blended learning", "en - English", "zh-TW - 繁體中文 (Traditional Chinese)"],
+                ], inputs=[input_text, source_lang, target_lang], label="")
+
+            with gr.Tab("🌐 Multi-target 多語言矩陣"):
+                gr.Markdown(
+                    "Translate one term into many languages at once: every selected engine × every target language, "
+                    "filled in as cells finish.\n\n"
+                    "一次將術語翻譯成多種語言：所選引擎 × 目標語言的結果矩陣會逐格顯示。"
+                )
+                with gr.Row():
+                    with gr.Column(scale=2):
+                        matrix_text = gr.Textbox(label="🔤 Term / Phrase 術語/詞組", placeholder="e.g. 碳中和", lines=2)
+                    with gr.Column(scale=1):
+                        matrix_source = gr.Dropdown(choices=["auto - Auto Detect"] + lang_choices, value="auto - Auto Detect", label="🌍 Source Language 源語言")
+                matrix_targets = gr.CheckboxGroup(
+                    choices=[(f"{code} {name}", code) for code, name in SUPPORTED_LANGUAGES.items()],
+                    value=["en", "zh-CN", "zh-TW", "ja", "ko"],
+                    label="🎯 Target Languages 目標語言"
+                )
+                matrix_engines = gr.CheckboxGroup(
+                    choices=engine_choices(),
+                    value=defaults[:3],
+                    label="🔧 MT Engines 翻譯引擎"
+                )
+                matrix_btn = gr.Button("🌐 Translate into All Targets 翻譯成所有目標語言", variant="primary")
+                matrix_html = gr.HTML()
+                matrix_patch = gr.JSON(visible=False)
+                matrix_patch.change(fn=None, inputs=matrix_patch, outputs=None, js=STATUS_PATCH_JS)
+                with gr.Accordion("📋 Matrix JSON 矩陣 JSON", open=False):
+                    matrix_json = gr.Code(language="json", label="JSON")
+                matrix_file = gr.File(label="📥 Matrix JSON download 下載矩陣 JSON")
+                
+                def do_translate_matrix(text, source, targets, engines, request: gr.Request = None):
+                    if not text.strip():
+                        yield "<p style='color:#f44336;'>❌ Please enter a term! 請輸入術語！</p>", None, "", None
+                        return
+                    if not targets or not engines:
+                        yield "<p style='color:#f44336;'>❌ Please select target languages and engines! 請選擇目標語言與引擎！</p>", None, "", None
+                        return
+                    
+                    src = source.split(" - ")[0] if " - " in source else source
+                    renderer = MatrixRenderer()
+                    frames = translator.translate_matrix_streaming(text, src, targets, engines,
+                                                                   client_id=getattr(request, "session_hash", None))
+                    results, current = next(frames)
+                    if not results:
+                        yield "<p style='color:#f44336;'>❌ Every target is the source language 目標語言與源語言相同</p>", None, "", None
+                        return
+                    yield renderer.full(results, current), None, "", None
+                    for results, current in frames:
+                        yield gr.update(), renderer.delta(results, current), gr.update(), gr.update()
+                    
+                    json_out = translator._matrix_json(text, src, results)
+                    path = os.path.join(tempfile.mkdtemp(prefix="mt-matrix-"), "matrix.json")
+                    with open(path, "w", encoding="utf-8") as f:
+                        f.write(json_out)
+                    yield gr.update(), None, json_out, path
+                
+                matrix_btn.click(
+                    fn=do_translate_matrix,
+                    inputs=[matrix_text, matrix_source, matrix_targets, matrix_engines],
+                    outputs=[matrix_html, matrix_patch, matrix_json, matrix_file]
+                )
+
+            with gr.Tab("📄 Document 文件模式"):
+                gr.Markdown(
+                    "Paste a longer text: it is split into sentences, every engine translates the sentences in parallel, "
+                    "and the results are put back together in order. Recurring terms in the text are listed with each "
+                    "engine's translation for comparison.\n\n"
+                    "貼上較長的文本：系統會按句切分，各引擎並行翻譯各句後依序重組，並列出文中重複出現的術語及各引擎的譯法。"
+                )
+                with gr.Row():
+                    with gr.Column(scale=2):
+                        doc_text = gr.Textbox(label="📄 Text 文本", placeholder="Paste a paragraph or a whole document... 貼上段落或整份文件...",
+                                              lines=10, max_lines=40)
+                    with gr.Column(scale=1):
+                        doc_source = gr.Dropdown(choices=["auto - Auto Detect"] + lang_choices, value="auto - Auto Detect", label="🌍 Source Language 源語言")
+                        doc_target = gr.Dropdown(choices=lang_choices, value="en - English", label="🎯 Target Language 目標語言")
+                        doc_terms = gr.Slider(0, 40, value=15, step=1, label="Term candidates 術語候選數")
+                doc_engines = gr.CheckboxGroup(
+                    choices=engine_choices(),
+                    value=defaults[:3],
+                    label="🔧 MT Engines 翻譯引擎"
+                )
+                doc_btn = gr.Button("📄 Translate Document 翻譯文件", variant="primary")
+                doc_html = gr.HTML()
+                doc_patch = gr.JSON(visible=False)
+                doc_patch.change(fn=None, inputs=doc_patch, outputs=None, js=STATUS_PATCH_JS)
+                gr.Markdown("### 🔎 Recurring Terms 重複術語")
+                doc_terms_html = gr.HTML()
+                with gr.Accordion("📋 Document JSON 文件 JSON", open=False):
+                    doc_json = gr.Code(language="json", label="JSON")
+                
+                def do_translate_document(text, source, target, max_terms, engines, request: gr.Request = None):
+                    if not text.strip():
+                        yield "<p style='color:#f44336;'>❌ Please enter some text! 請輸入文本！</p>", None, "", ""
+                        return
+                    if not engines:
+                        yield "<p style='color:#f44336;'>❌ Please select at least one engine! 請選擇至少一個引擎！</p>", None, "", ""
+                        return
+                    
+                    src = source.split(" - ")[0] if " - " in source else source
+                    tgt = target.split(" - ")[0] if " - " in target else target
+                    renderer = DocumentRenderer()
+                    frames = translator.translate_document_streaming(text, src, tgt, engines, max_terms=int(max_terms or 0),
+                                                                     client_id=getattr(request, "session_hash", None))
+                    doc, current = next(frames)
+                    terms_seen = 0
+                    yield renderer.full(doc.results, current), None, create_terms_html(doc, include_css=False), ""
+                    for doc, current in frames:
+                        # The terms table only changes when another engine's term lookups come back.
+                        terms_done = sum(t is not None for t in doc.term_results)
+                        terms_out = create_terms_html(doc, include_css=False) if terms_done != terms_seen else gr.update()
+                        terms_seen = terms_done
+                        yield gr.update(), renderer.delta(doc.results, current), terms_out, gr.update()
+                    yield gr.update(), None, gr.update(), json.dumps(doc.to_dict(), ensure_ascii=False, indent=2)
+                
+                doc_btn.click(
+                    fn=do_translate_document,
+                    inputs=[doc_text, doc_source, doc_target, doc_terms, doc_engines],
+                    outputs=[doc_html, doc_patch, doc_terms_html, doc_json]
+                )
+
+            with gr.Tab("📑 Batch Glossary 批量術語表"):
+                gr.Markdown(
+                    "Upload a glossary (CSV/TSV/TBX, or a .txt file with one term per line) and translate every term "
+                    "with the selected engines. Results are written incrementally and can be downloaded when done.\n\n"
+                    "上傳術語表（CSV/TSV/TBX 或每行一個術語的 .txt 檔），以所選引擎翻譯所有術語。"
+                )
+                with gr.Row():
+                    with gr.Column(scale=2):
+                        batch_file = gr.File(label="📁 Glossary file 術語表檔案", file_types=list(GLOSSARY_FORMATS))
+                        with gr.Row():
+                            batch_column = gr.Textbox(label="Term column (index or header name) 術語欄位", value="0")
+                            batch_header = gr.Checkbox(label="First row is a header 首行為標題", value=False)
+                    with gr.Column(scale=1):
+                        batch_source = gr.Dropdown(choices=["auto - Auto Detect"] + lang_choices, value="auto - Auto Detect", label="🌍 Source Language 源語言")
+                        batch_target = gr.Dropdown(choices=lang_choices, value="en - English", label="🎯 Target Language 目標語言")
+                        batch_format = gr.Radio(choices=[".csv", ".jsonl"], value=".csv", label="Output format 輸出格式")
+                batch_engines = gr.CheckboxGroup(
+                    choices=engine_choices(),
+                    value=defaults[:2],
+                    label="🔧 MT Engines 翻譯引擎"
+                )
+                batch_btn = gr.Button("📑 Translate Glossary 翻譯術語表", variant="primary")
+                batch_status = gr.Markdown()
+                batch_output = gr.File(label="📥 Results 結果")
+                
+                def do_translate_batch(file, column, header, source, target, fmt, engines, request: gr.Request = None):
+                    if not file:
+                        yield "❌ Please upload a glossary file! 請上傳術語表！", None
+                        return
+                    if not engines:
+                        yield "❌ Please select at least one engine! 請選擇至少一個引擎！", None
+                        return
+                    
+                    input_path = file if isinstance(file, str) else file.name
+                    src = source.split(" - ")[0] if " - " in source else source
+                    tgt = target.split(" - ")[0] if " - " in target else target
+                    col = int(column) if column.strip().isdigit() else column.strip()
+                    output_path = os.path.join(tempfile.mkdtemp(prefix="mt-batch-"),
+                                               os.path.splitext(os.path.basename(input_path))[0] + f"_{tgt}{fmt}")
+                    try:
+                        for progress in translator.translate_batch(input_path, output_path, src, tgt, engines,
+                                                                   column=col, has_header=header,
+                                                                   client_id=getattr(request, "session_hash", None)):
+                            yield progress.describe(), (output_path if progress.finished else None)
+                    except (ValueError, OSError, ET.ParseError) as e:
+                        yield f"❌ {e}", None
+                
+                batch_btn.click(
+                    fn=do_translate_batch,
+                    inputs=[batch_file, batch_column, batch_header, batch_source, batch_target, batch_format, batch_engines],
+                    outputs=[batch_status, batch_output]
+                )
         
         gr.Markdown("""
         ---
@@ -528,5 +4031,19 @@ def create_gradio_interface(translator: MultiMTTranslator):
         🔤 **Multi-MT Term Comparison Tool** | 多引擎術語翻譯比較工具
         *Built for Terminology Management Education 專為術語管理教育而設*
         """)
+        
+        # Each page load picks defaults from current health (see start_probing) and marks engines that are down.
+        def refresh_engines():
+            current = translator.default_engines()
+            updates = []
+            for key, box_label in engine_labels.items():
+                down = key in translator.engines and translator.engine_down(key)
+                updates.append(gr.update(label=box_label + (" ⛔ down 暫停" if down else ""), value=key in current))
+            choices = engine_choices()
+            return updates + [engine_health_markdown(), gr.update(choices=choices, value=current[:3]),
+                              gr.update(choices=choices, value=current[:3]), gr.update(choices=choices, value=current[:2])]
+        
+        demo.load(fn=refresh_engines, inputs=None,
+                  outputs=list(engine_boxes.values()) + [engine_health, matrix_engines, doc_engines, batch_engines])
     
     return demo
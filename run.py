@@ -7,20 +7,60 @@ Usage:
     python run.py
     python run.py --share    # Create public link
     python run.py --local    # Local only (no public link)
+    python run.py batch glossary.csv results.csv --target en   # Bulk glossary translation
+    python run.py --api --api-port 8000                        # Headless HTTP/JSON API
+    python run.py --api --workers 4                            # API on 4 processes, one port
+    python run.py tm-import approved.csv --source zh-TW --target en --term-memory tm/   # Load approved terms
 """
 
+import time
+
+_PROCESS_START = time.perf_counter()
+
 import subprocess
 import sys
 import argparse
+import importlib.metadata
+import urllib.request
+
+REQUIRED_PACKAGES = ["deep-translator", "translators", "gradio"]
+
+class StartupProfile:
+    """Records how long each startup stage takes (--profile-startup)."""
+    
+    def __init__(self):
+        self.stages = []
+        self._last = _PROCESS_START
+    
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages.append((stage, now - self._last))
+        self._last = now
+    
+    def report(self):
+        print("\n" + "=" * 60)
+        print("⏱️ Startup profile 啟動時間分析")
+        print("=" * 60)
+        for stage, seconds in self.stages:
+            print(f"   {stage:<36} {seconds * 1000:9.1f} ms")
+        print(f"   {'total':<36} {(self._last - _PROCESS_START) * 1000:9.1f} ms")
+
+def missing_requirements():
+    """Return the required packages that are not installed (checked via package metadata, no imports)."""
+    missing = []
+    for pkg in REQUIRED_PACKAGES:
+        try:
+            importlib.metadata.version(pkg)
+        except importlib.metadata.PackageNotFoundError:
+            missing.append(pkg)
+    return missing
 
-def install_requirements():
+def install_requirements(packages):
     """Install required packages."""
     print("=" * 60)
     print("🔧 Installing required packages... 正在安裝套件...")
     print("=" * 60)
     
-    packages = ["deep-translator", "translators", "gradio"]
-    
     for pkg in packages:
         try:
             print(f"   📦 Installing {pkg}...")
@@ -31,27 +71,174 @@ def install_requirements():
     
     print("\n✅ Installation complete!\n")
 
+def run_batch(translator, args):
+    """Run a glossary batch job from the command line."""
+    column = int(args.column) if args.column.isdigit() else args.column
+    checkpoint = args.checkpoint or args.output + ".checkpoint"
+    engines = [e.strip() for e in args.engines.split(",") if e.strip()]
+    
+    print(f"\n📑 Batch: {args.input} → {args.output} ({args.source} → {args.target})")
+    print(f"   Engines: {', '.join(engines)}")
+    job = translator.translate_batch(
+        args.input, args.output, args.source, args.target, engines,
+        checkpoint_path=checkpoint, max_concurrency=args.concurrency,
+        column=column, has_header=args.header, pack=args.pack, pack_size=args.pack_size
+    )
+    try:
+        for progress in job:
+            print(f"\r   {progress.describe()}", end="", flush=True)
+        print()
+        if progress.retry_pending:
+            print(f"🔁 Some engines were busy or down. Rerun the same command to retry from {checkpoint}")
+    except KeyboardInterrupt:
+        job.close()  # saves the checkpoint
+        print(f"\n⏸️ Interrupted. Rerun the same command to resume from {checkpoint}")
+
+def run_tm_import(args):
+    """Import approved term pairs into the term memory."""
+    from term_memory import TermMemory
+    
+    source_column = int(args.source_column) if args.source_column.isdigit() else args.source_column
+    target_column = int(args.target_column) if args.target_column.isdigit() else args.target_column
+    memory = TermMemory(args.term_memory)
+    print(f"\n📖 Importing {args.input} into {args.term_memory} ({args.source} → {args.target})...")
+    start = time.perf_counter()
+    count = memory.import_file(args.input, args.source, args.target, source_column, target_column, args.header)
+    print(f"✅ {count} entries for {args.source} → {args.target} ({time.perf_counter() - start:.1f}s)")
+
+def build_translator(args, worker: int = 0):
+    """Set up tracing, cache, term memory, prober and metrics for this process and return its translator.
+
+    With --workers each API process calls this for itself (worker = its index).
+    """
+    from mt_term_tool import (MultiMTTranslator, ProcessCoordinator, TranslationCache, configure_tracing,
+                              set_coordinator, start_metrics_server)
+    
+    if args.trace_file or args.profile_slow:
+        configure_tracing(args.trace_file, args.profile_slow, args.slow_threshold)
+    coordinator_path = args.coordinator or ("mt_coord.sqlite3" if args.workers > 1 else None)
+    if coordinator_path:
+        set_coordinator(ProcessCoordinator(coordinator_path))
+    
+    cache = None if args.no_cache else TranslationCache(args.cache_path, ttl=args.cache_ttl)
+    term_memory = None
+    if args.term_memory:
+        from term_memory import TermMemory
+        term_memory = TermMemory(args.term_memory)
+    translator = MultiMTTranslator(verbose=worker == 0, cache=cache, term_memory=term_memory,
+                                   term_memory_min_score=args.tm_min_score)
+    if not translator.engines:
+        return translator
+    
+    if args.probe_interval > 0:
+        # Workers take turns, so probe traffic does not grow with the worker count.
+        translator.start_probing(args.probe_interval * max(1, args.workers), args.probe_budget)
+        if worker == 0:
+            print(f"🩺 Probing engine health every {args.probe_interval:g}s (at most {args.probe_budget} engines each time)")
+    
+    if args.metrics_port:
+        start_metrics_server(translator, args.metrics_port + worker)
+        if worker == 0:
+            ports = f"{args.metrics_port}-{args.metrics_port + args.workers - 1}" if args.workers > 1 else args.metrics_port
+            print(f"📈 Metrics: http://localhost:{ports}/metrics")
+    return translator
+
+def run_api_worker(args, sock, worker):
+    """Entry point of one --workers API process (spawned, so it builds its own translator)."""
+    from api_server import run_api_server
+    
+    translator = build_translator(args, worker)
+    translator.warm_up()
+    run_api_server(translator, args.api_host, args.api_port, sock=sock)
+
 def main():
     parser = argparse.ArgumentParser(description="Multi-MT Term Comparison Tool")
     parser.add_argument("--share", action="store_true", help="Create public shareable link")
     parser.add_argument("--local", action="store_true", help="Local only (default creates public link)")
     parser.add_argument("--no-install", action="store_true", help="Skip package installation")
+    parser.add_argument("--cache-path", default="mt_cache.sqlite3", help="Translation cache file (default: mt_cache.sqlite3)")
+    parser.add_argument("--cache-ttl", type=float, default=7 * 24 * 3600, help="Seconds a cached translation stays valid")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the persistent translation cache")
+    parser.add_argument("--profile-startup", action="store_true", help="Report time spent in each startup stage")
+    parser.add_argument("--api", action="store_true", help="Serve the HTTP/JSON API instead of the web interface")
+    parser.add_argument("--api-host", default="127.0.0.1", help="API bind address (default: 127.0.0.1)")
+    parser.add_argument("--api-port", type=int, default=8000, help="API port (default: 8000)")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics (/metrics) and JSON stats (/stats) on this port")
+    parser.add_argument("--trace-file", help="Append per-stage spans (OTLP JSON lines) to this file")
+    parser.add_argument("--profile-slow", metavar="DIR", help="Write flame-graph stacks of slow engine calls to DIR")
+    parser.add_argument("--slow-threshold", type=float, default=2.0, help="Seconds after which --profile-slow keeps a call (default: 2)")
+    parser.add_argument("--term-memory", metavar="DIR", help="Term memory directory; adds the Term Memory engine")
+    parser.add_argument("--probe-interval", type=float, default=0, metavar="SECONDS",
+                        help="Probe engine health in the background every SECONDS (default: off)")
+    parser.add_argument("--probe-budget", type=int, default=4, help="Most engines probed per interval (default: 4)")
+    parser.add_argument("--workers", type=int, default=1, help="API worker processes sharing --api-port (with --api)")
+    parser.add_argument("--coordinator", metavar="PATH",
+                        help="SQLite file through which processes share rate limits and in-flight calls "
+                             "(default with --workers: mt_coord.sqlite3)")
+    parser.add_argument("--tm-min-score", type=float, default=0.6, help="Lowest fuzzy term-memory similarity shown (default: 0.6)")
+    
+    subparsers = parser.add_subparsers(dest="command")
+    batch = subparsers.add_parser("batch", help="Translate a whole glossary file (CSV/TSV/TBX)")
+    batch.add_argument("input", help="Glossary file: .csv, .tsv, .txt (one term per line) or .tbx")
+    batch.add_argument("output", help="Results file: .csv or .jsonl")
+    batch.add_argument("--source", default="auto", help="Source language code (default: auto)")
+    batch.add_argument("--target", default="en", help="Target language code (default: en)")
+    batch.add_argument("--engines", default="google,bing,alibaba,sogou,youdao,tencent",
+                       help="Comma-separated engine keys")
+    batch.add_argument("--column", default="0", help="CSV/TSV column index or header name holding the terms")
+    batch.add_argument("--header", action="store_true", help="Skip the first CSV/TSV row")
+    batch.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint)")
+    batch.add_argument("--concurrency", type=int, default=8, help="Max engine calls in flight")
+    batch.add_argument("--pack", action="store_true", help="Send several terms per upstream request where the engine allows it")
+    batch.add_argument("--pack-size", type=int, default=50, help="Terms read per packed block (default: 50)")
+    tm_import = subparsers.add_parser("tm-import", help="Import approved term pairs (CSV/TSV/TBX) into the term memory")
+    tm_import.add_argument("input", help="CSV/TSV with source and target columns, or TBX")
+    tm_import.add_argument("--source", required=True, help="Source language code")
+    tm_import.add_argument("--target", required=True, help="Target language code")
+    tm_import.add_argument("--source-column", default="0", help="CSV/TSV source column index or header name")
+    tm_import.add_argument("--target-column", default="1", help="CSV/TSV target column index or header name")
+    tm_import.add_argument("--header", action="store_true", help="Skip the first CSV/TSV row")
+    tm_import.add_argument("--term-memory", metavar="DIR", default=argparse.SUPPRESS, help="Term memory directory")
     args = parser.parse_args()
     
-    # Install packages
+    profile = StartupProfile() if args.profile_startup else None
+    
+    # Install packages that are missing
     if not args.no_install:
-        install_requirements()
+        missing = missing_requirements()
+        if missing:
+            install_requirements(missing)
+    if profile:
+        profile.mark("dependency check")
     
     # Import after installation
-    from mt_term_tool import MultiMTTranslator, create_gradio_interface
+    from mt_term_tool import create_gradio_interface
+    if profile:
+        profile.mark("import mt_term_tool")
     
     print("\n" + "=" * 60)
     print("🔤 MULTI-MT TERM COMPARISON TOOL")
     print("   多引擎術語翻譯比較工具")
     print("=" * 60)
     
+    if args.command == "tm-import":
+        if not args.term_memory:
+            parser.error("tm-import needs --term-memory DIR")
+        run_tm_import(args)
+        return
+    
+    if args.workers > 1:
+        if args.api and args.command is None:
+            from api_server import serve_workers
+            serve_workers(run_api_worker, (args,), args.workers, args.api_host, args.api_port)
+            return
+        print("⚠️ --workers applies to --api only; running in one process 僅適用於 --api，改以單一程序執行")
+        args.workers = 1
+    
     # Initialize translator
-    translator = MultiMTTranslator()
+    translator = build_translator(args)
+    if profile:
+        profile.mark("translator init")
     
     if not translator.engines:
         print("\n❌ No translation engines available!")
@@ -59,15 +246,40 @@ def main():
     
     print(f"\n✅ Available engines: {', '.join(translator.get_available_engines())}")
     
+    if args.command == "batch":
+        run_batch(translator, args)
+        return
+    
+    if args.api:
+        from api_server import run_api_server
+        translator.warm_up()
+        run_api_server(translator, args.api_host, args.api_port)
+        return
+    
     # Create and launch interface
     print("\n🚀 Starting web interface...")
     demo = create_gradio_interface(translator)
+    if profile:
+        profile.mark("build interface")
     
     if demo:
         share = not args.local  # Default to share=True unless --local
         if args.share:
             share = True
-        demo.launch(share=share, debug=False)
+        if not profile:
+            # Import engine backends while the server starts instead of on the first click.
+            translator.warm_up()
+            demo.launch(share=share, debug=False)
+            return
+        
+        demo.launch(share=share, debug=False, prevent_thread_lock=True)
+        profile.mark("launch server")
+        urllib.request.urlopen(demo.local_url, timeout=60).read()
+        profile.mark("first served request")
+        translator.warm_up(background=False)
+        profile.mark("engine backends (lazy, first use)")
+        profile.report()
+        demo.block_thread()
     else:
         print("❌ Could not create interface. Please install gradio.")
 
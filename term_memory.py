@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+📖 Multi-MT Term Comparison Tool - Term Memory
+Approved term pairs with exact and fuzzy lookup, listed as a "Term Memory" engine.
+
+Each language pair gets an on-disk index of flat binary arrays that are
+memory-mapped for lookups, so even a term base of millions of entries costs
+little resident memory and answers in milliseconds:
+
+    entries.bin        UTF-8 "source\\x1ftarget" records
+    entry_offsets.bin  uint64 start of each record (+ end)
+    entry_grams.bin    uint16 number of distinct bigrams per source term
+    gram_keys.bin      uint64 sorted bigram keys (two code points packed)
+    gram_offsets.bin   uint64 start of each bigram's postings (+ end)
+    postings.bin       uint32 entry ids, ascending per bigram
+    exact_keys.bin     uint64 sorted hashes of normalized source terms
+    exact_ids.bin      uint32 entry id per exact key
+
+Fuzzy similarity is the Dice coefficient over character bigrams of the
+normalized, case-folded source term.
+
+Usage:
+    python run.py tm-import approved.csv --source zh-TW --target en --term-memory tm/
+    python run.py --term-memory tm/     # adds "Term Memory 術語庫" to the engines
+"""
+
+import array
+import bisect
+import csv
+import hashlib
+import heapq
+import itertools
+import json
+import math
+import mmap
+import os
+import shutil
+import threading
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from mt_term_tool import detect_language_simple, normalize_term
+
+_SEPARATOR = "\x1f"
+_BEGIN, _END = "\x02", "\x03"
+
+
+@dataclass
+class TermMatch:
+    source: str
+    target: str
+    score: float
+    exact: bool = False
+
+
+def _term_key(text: str) -> str:
+    return normalize_term(text).replace(_SEPARATOR, " ").casefold()
+
+
+def _grams(key: str) -> set:
+    """Distinct character bigrams of a term, with begin/end markers, packed as ints."""
+    padded = _BEGIN + key + _END
+    return {(ord(a) << 21) | ord(b) for a, b in zip(padded, padded[1:])}
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+# ============================================================
+# READERS
+# ============================================================
+
+def read_pairs_csv(path: str, source_column=0, target_column=1, has_header: bool = False) -> Iterator[Tuple[str, str]]:
+    """Stream (source, target) pairs from a CSV/TSV file; columns are indices or header names."""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f, delimiter="\t" if ext in (".tsv", ".txt") else ",")
+        columns = [source_column, target_column]
+        if any(isinstance(c, str) for c in columns):
+            header = next(reader, [])
+            for i, c in enumerate(columns):
+                if isinstance(c, str):
+                    if c not in header:
+                        raise ValueError(f"Column '{c}' not found in {path} header")
+                    columns[i] = header.index(c)
+        elif has_header:
+            next(reader, None)
+        src_i, tgt_i = columns
+        for row in reader:
+            if len(row) > max(src_i, tgt_i) and row[src_i].strip() and row[tgt_i].strip():
+                yield row[src_i].strip(), row[tgt_i].strip()
+
+
+def read_pairs_tbx(path: str, source_lang: str, target_lang: str) -> Iterator[Tuple[str, str]]:
+    """Stream (source, target) pairs from TBX entries that have terms in both languages."""
+    lang_attr = "{http://www.w3.org/XML/1998/namespace}lang"
+
+    def local(tag):
+        return tag.rsplit("}", 1)[-1]
+
+    def matches(lang, want):
+        # "zh" matches "zh-TW" and vice versa, but "zh-CN" does not match "zh-TW".
+        lang, want = lang.lower(), want.lower()
+        return lang == want or (lang.split("-")[0] == want.split("-")[0] and ("-" not in lang or "-" not in want))
+
+    for _, elem in ET.iterparse(path, events=("end",)):
+        if local(elem.tag) not in ("termEntry", "conceptEntry"):
+            continue
+        terms: Dict[str, List[str]] = {}
+        for lang_set in elem.iter():
+            if local(lang_set.tag) != "langSet":
+                continue
+            lang = lang_set.get(lang_attr) or lang_set.get("lang") or ""
+            found = [t.text.strip() for t in lang_set.iter() if local(t.tag) == "term" and t.text and t.text.strip()]
+            terms.setdefault(lang, []).extend(found)
+        sources = [t for lang, ts in terms.items() if matches(lang, source_lang) for t in ts]
+        targets = [t for lang, ts in terms.items() if matches(lang, target_lang) for t in ts]
+        if targets:
+            for source in sources:
+                yield source, targets[0]
+        elem.clear()
+
+# ============================================================
+# INDEX
+# ============================================================
+
+def _write_array(path: str, typecode: str, values):
+    with open(path, "wb") as f:
+        array.array(typecode, values).tofile(f)
+
+
+def build_index(directory: str, pairs: Iterable[Tuple[str, str]], source_lang: str, target_lang: str) -> int:
+    """Write a pair index for (source, target) pairs into a new directory; returns the entry count.
+
+    Pairs with the same normalized source and identical target are stored once.
+    """
+    os.makedirs(directory)
+    postings: Dict[int, array.array] = {}
+    exact = []
+    offsets = array.array("Q", [0])
+    gram_counts = array.array("H")
+    seen = set()
+    with open(os.path.join(directory, "entries.bin"), "wb") as f:
+        for source, target in pairs:
+            key = _term_key(source)
+            target = target.replace(_SEPARATOR, " ").strip()
+            if not key or not target or (key, target) in seen:
+                continue
+            seen.add((key, target))
+            entry_id = len(gram_counts)
+            record = (source.replace(_SEPARATOR, " ") + _SEPARATOR + target).encode("utf-8")
+            f.write(record)
+            offsets.append(offsets[-1] + len(record))
+            grams = _grams(key)
+            gram_counts.append(min(len(grams), 0xFFFF))
+            for gram in grams:
+                plist = postings.get(gram)
+                if plist is None:
+                    plist = postings[gram] = array.array("I")
+                plist.append(entry_id)
+            exact.append((_hash(key), entry_id))
+    del seen
+
+    keys = sorted(postings)
+    gram_offsets = array.array("Q", [0])
+    with open(os.path.join(directory, "postings.bin"), "wb") as f:
+        for gram in keys:
+            plist = postings.pop(gram)
+            plist.tofile(f)
+            gram_offsets.append(gram_offsets[-1] + len(plist))
+    exact.sort()
+
+    _write_array(os.path.join(directory, "entry_offsets.bin"), "Q", offsets)
+    _write_array(os.path.join(directory, "entry_grams.bin"), "H", gram_counts)
+    _write_array(os.path.join(directory, "gram_keys.bin"), "Q", keys)
+    _write_array(os.path.join(directory, "gram_offsets.bin"), "Q", gram_offsets)
+    _write_array(os.path.join(directory, "exact_keys.bin"), "Q", (k for k, _ in exact))
+    _write_array(os.path.join(directory, "exact_ids.bin"), "I", (i for _, i in exact))
+    with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"source": source_lang, "target": target_lang, "entries": len(gram_counts),
+                   "grams": len(keys), "built": time.time()}, f)
+    return len(gram_counts)
+
+
+class PairIndex:
+    """Read-only, memory-mapped index of one language pair."""
+
+    FILES = {"entries": "B", "entry_offsets": "Q", "entry_grams": "H", "gram_keys": "Q",
+             "gram_offsets": "Q", "postings": "I", "exact_keys": "Q", "exact_ids": "I"}
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self._maps = []
+        for name, typecode in self.FILES.items():
+            setattr(self, name, self._map(os.path.join(directory, name + ".bin"), typecode))
+
+    def _map(self, path: str, typecode: str) -> memoryview:
+        if os.path.getsize(path) == 0:
+            return memoryview(b"").cast(typecode)
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return memoryview(mapped).cast(typecode)
+
+    def __len__(self) -> int:
+        return len(self.entry_grams)
+
+    def entry(self, entry_id: int) -> Tuple[str, str]:
+        record = bytes(self.entries[self.entry_offsets[entry_id]:self.entry_offsets[entry_id + 1]]).decode("utf-8")
+        source, _, target = record.partition(_SEPARATOR)
+        return source, target
+
+    def iter_entries(self) -> Iterator[Tuple[str, str]]:
+        for entry_id in range(len(self)):
+            yield self.entry(entry_id)
+
+    def _postings(self, gram: int) -> Optional[memoryview]:
+        i = bisect.bisect_left(self.gram_keys, gram)
+        if i == len(self.gram_keys) or self.gram_keys[i] != gram:
+            return None
+        return self.postings[self.gram_offsets[i]:self.gram_offsets[i + 1]]
+
+    def exact(self, key: str) -> List[int]:
+        digest = _hash(key)
+        i = bisect.bisect_left(self.exact_keys, digest)
+        found = []
+        while i < len(self.exact_keys) and self.exact_keys[i] == digest:
+            entry_id = self.exact_ids[i]
+            if _term_key(self.entry(entry_id)[0]) == key:
+                found.append(entry_id)
+            i += 1
+        return found
+
+    def fuzzy(self, key: str, min_score: float, limit: int, max_candidates: int = 200_000) -> List[Tuple[float, int]]:
+        """(score, entry id) of the best entries with Dice similarity >= min_score.
+
+        Prefix filtering: an entry reaching min_score must share at least ``need``
+        bigrams with the query, so it appears in at least one of the
+        ``len(lists) - need + 1`` shortest posting lists. Only those lists are
+        scanned for candidates; the longer ones are probed by binary search.
+        """
+        grams = _grams(key)
+        q = len(grams)
+        need = max(1, math.ceil(min_score * q / (2 - min_score) - 1e-9))
+        lists = [p for p in map(self._postings, grams) if p is not None]
+        if len(lists) < need:
+            return []
+        lists.sort(key=len)
+        split = len(lists) - need + 1
+        counts: Dict[int, int] = {}
+        scanned = 0
+        for plist in lists[:split]:
+            scanned += len(plist)
+            if scanned > max_candidates:
+                break
+            for entry_id in plist:
+                counts[entry_id] = counts.get(entry_id, 0) + 1
+
+        # Dice >= s also bounds the candidate's own bigram count.
+        low, high = q * min_score / (2 - min_score), q * (2 - min_score) / min_score
+        entry_grams = self.entry_grams
+        candidates = {i: n for i, n in counts.items() if low - 1e-9 <= entry_grams[i] <= high + 1e-9}
+        for plist in lists[split:]:
+            size = len(plist)
+            for entry_id in candidates:
+                j = bisect.bisect_left(plist, entry_id)
+                if j < size and plist[j] == entry_id:
+                    candidates[entry_id] += 1
+
+        scored = ((2 * n / (q + entry_grams[i]), i) for i, n in candidates.items())
+        return heapq.nlargest(limit, (item for item in scored if item[0] >= min_score))
+
+    def close(self):
+        for name in self.FILES:
+            getattr(self, name).release()
+        for mapped in self._maps:
+            mapped.close()
+        self._maps = []
+
+# ============================================================
+# TERM MEMORY
+# ============================================================
+
+class TermMemory:
+    """Approved term pairs under ``root``, one versioned PairIndex per language pair.
+
+    Imports merge with the existing entries and build a new index version next to
+    the current one, then switch to it; lookups running meanwhile keep using the
+    old (already mapped) files, which are unmapped once the last of them drops its
+    reference. Imports by other processes are picked up on the next lookup.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        # (source, target) -> ((inode, mtime) of CURRENT when loaded, index)
+        self._indexes: Dict[Tuple[str, str], Tuple[Tuple[int, int], PairIndex]] = {}
+        self._lock = threading.Lock()
+
+    def _pair_dir(self, source_lang: str, target_lang: str) -> str:
+        return os.path.join(self.root, f"{source_lang}__{target_lang}")
+
+    def pairs(self) -> List[Tuple[str, str]]:
+        found = []
+        for name in sorted(os.listdir(self.root)):
+            if "__" in name and os.path.exists(os.path.join(self.root, name, "CURRENT")):
+                found.append(tuple(name.split("__", 1)))
+        return found
+
+    def index(self, source_lang: str, target_lang: str) -> Optional[PairIndex]:
+        key = (source_lang, target_lang)
+        pointer = os.path.join(self._pair_dir(*key), "CURRENT")
+        with self._lock:
+            try:
+                st = os.stat(pointer)
+            except FileNotFoundError:
+                self._indexes.pop(key, None)
+                return None
+            stamp = (st.st_ino, st.st_mtime_ns)
+            cached = self._indexes.get(key)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+            with open(pointer, encoding="utf-8") as f:
+                version = f.read().strip()
+            # The replaced index is not closed here: lookups in other threads may
+            # still be reading it, and its maps are released when they finish.
+            index = PairIndex(os.path.join(self._pair_dir(*key), version))
+            self._indexes[key] = (stamp, index)
+            return index
+
+    def import_pairs(self, pairs: Iterable[Tuple[str, str]], source_lang: str, target_lang: str) -> int:
+        """Add (source, target) pairs to the language pair's index; returns its new entry count."""
+        pair_dir = self._pair_dir(source_lang, target_lang)
+        os.makedirs(pair_dir, exist_ok=True)
+        current = self.index(source_lang, target_lang)
+        version = f"v{time.time_ns()}"
+        existing = current.iter_entries() if current is not None else iter(())
+        count = build_index(os.path.join(pair_dir, version), itertools.chain(existing, pairs), source_lang, target_lang)
+
+        tmp = os.path.join(pair_dir, "CURRENT.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(tmp, os.path.join(pair_dir, "CURRENT"))
+        with self._lock:
+            self._indexes.pop((source_lang, target_lang), None)
+        # Mapped files stay readable after removal, so old versions can go right away.
+        for name in os.listdir(pair_dir):
+            if name.startswith("v") and name != version:
+                shutil.rmtree(os.path.join(pair_dir, name), ignore_errors=True)
+        return count
+
+    def import_file(self, path: str, source_lang: str, target_lang: str, source_column=0, target_column=1,
+                    has_header: bool = False) -> int:
+        """Import a CSV/TSV (two columns) or TBX file of approved pairs."""
+        if os.path.splitext(path)[1].lower() == ".tbx":
+            pairs = read_pairs_tbx(path, source_lang, target_lang)
+        else:
+            pairs = read_pairs_csv(path, source_column, target_column, has_header)
+        return self.import_pairs(pairs, source_lang, target_lang)
+
+    def lookup(self, text: str, source_lang: str, target_lang: str, limit: int = 5,
+               min_score: float = 0.6) -> List[TermMatch]:
+        """Exact matches first (score 1.0), then fuzzy matches by descending similarity.
+
+        With source_lang 'auto' the detected language is tried first, then any
+        other indexed source language with the same target.
+        """
+        key = _term_key(text)
+        if not key:
+            return []
+        if source_lang == "auto":
+            detected = detect_language_simple(text)
+            sources = [detected] + [s for s, t in self.pairs() if t == target_lang and s != detected]
+        else:
+            sources = [source_lang]
+
+        matches: List[TermMatch] = []
+        for source in sources:
+            index = self.index(source, target_lang)
+            if index is None:
+                continue
+            exact_ids = index.exact(key)
+            for entry_id in exact_ids:
+                matches.append(TermMatch(*index.entry(entry_id), score=1.0, exact=True))
+            if len(matches) < limit:
+                for score, entry_id in index.fuzzy(key, min_score, limit + len(exact_ids)):
+                    if entry_id not in exact_ids:
+                        matches.append(TermMatch(*index.entry(entry_id), score=round(score, 3)))
+            if matches:
+                break
+        matches.sort(key=lambda m: (not m.exact, -m.score))
+        return matches[:limit]
+
+    def stats(self) -> Dict[str, dict]:
+        stats = {}
+        for source, target in self.pairs():
+            index = self.index(source, target)
+            stats[f"{source}→{target}"] = {"entries": len(index), "grams": index.meta.get("grams", 0)}
+        return stats
+
+    def close(self):
+        with self._lock:
+            for _, index in self._indexes.values():
+                index.close()
+            self._indexes.clear()